@@ -0,0 +1,220 @@
+"""
+Renderização em lote (mala direta) sem interface gráfica.
+
+Renderiza um template do TemplateManager para cada linha de um CSV ou JSONL,
+com as mesmas regras do botão Copiar (condicionais, campos inteligentes e
+placeholders automáticos do placeholder_engine).
+
+Exemplos:
+    python batch_render.py "Suporte / Abertura de Chamado" chamados.csv
+    python batch_render.py "Suporte / Conclusão" chamados.jsonl -o saida.jsonl --workers 4
+
+As linhas são lidas e escritas em fluxo; entradas grandes são divididas em
+blocos e distribuídas entre processos, mantendo a ordem da entrada.
+"""
+
+import argparse
+import csv
+import datetime
+import json
+import logging
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from linxfast.core import SQLiteStorage, TemplateManager, placeholder_engine, template_compiler
+
+# Get the module logger
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 500
+
+# Estado de cada processo do pool (definido por _init_worker)
+_worker_template = None
+_worker_fields = ()
+_worker_now = None
+
+
+def read_rows(path, encoding="utf-8"):
+    """Lê as linhas de um CSV ou JSONL (pela extensão), uma de cada vez."""
+    if path == "-":
+        stream = sys.stdin
+        is_jsonl = True
+    else:
+        stream = open(path, "r", encoding=encoding, newline="")
+        is_jsonl = os.path.splitext(path)[1].lower() in (".jsonl", ".ndjson")
+    try:
+        if is_jsonl:
+            for line_number, line in enumerate(stream, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"JSON inválido na linha {line_number}: {e}")
+                if not isinstance(row, dict):
+                    raise ValueError(f"Linha {line_number} não é um objeto JSON")
+                yield row
+        else:
+            yield from csv.DictReader(stream)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def _to_value(value):
+    # Mesmos valores que a interface gera para cada tipo de campo
+    if value is None:
+        return ""
+    if value is True:
+        return "Sim"
+    if value is False:
+        return "Não"
+    return str(value)
+
+
+def render_row(template, fields, row, context=None):
+    """Renderiza uma linha; campos ausentes ficam vazios, como na interface."""
+    field_values = {field: _to_value(row.get(field)) for field in fields}
+    return template_compiler.render(template, field_values, context)
+
+
+def _context(now):
+    # Um contexto por linha: handlers podem depender dos campos da linha
+    return placeholder_engine.context(now) if now is not None else None
+
+
+def _init_worker(template, fields, now):
+    global _worker_template, _worker_fields, _worker_now
+    _worker_template = template
+    _worker_fields = fields
+    _worker_now = now
+
+
+def _render_chunk(rows):
+    return [
+        render_row(_worker_template, _worker_fields, row, _context(_worker_now))
+        for row in rows
+    ]
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def render_rows(template, fields, rows, workers=None, chunk_size=CHUNK_SIZE, now=None):
+    """
+    Gera o texto renderizado de cada linha, na ordem da entrada.
+
+    Se a entrada couber em um bloco, renderiza no próprio processo. Caso
+    contrário, usa um pool com no máximo 2 blocos pendentes por processo,
+    para não carregar a entrada inteira na memória. Com 'now', todos os
+    placeholders automáticos usam esse horário.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(rows, chunk_size)
+    first = next(chunks, None)
+    if first is None:
+        return
+    second = next(chunks, None) if workers > 1 else None
+    if second is None:
+        for row in first:
+            yield render_row(template, fields, row, _context(now))
+        for chunk in chunks:
+            for row in chunk:
+                yield render_row(template, fields, row, _context(now))
+        return
+
+    logger.info(f"Renderizando em lote com {workers} processos")
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(template, fields, now)
+    ) as executor:
+        pending = deque(
+            [executor.submit(_render_chunk, first), executor.submit(_render_chunk, second)]
+        )
+        for chunk in chunks:
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+            pending.append(executor.submit(_render_chunk, chunk))
+        while pending:
+            yield from pending.popleft().result()
+
+
+def write_outputs(outputs, stream, output_format, separator):
+    count = 0
+    for index, text in enumerate(outputs, 1):
+        if output_format == "jsonl":
+            stream.write(json.dumps({"row": index, "text": text}, ensure_ascii=False))
+            stream.write("\n")
+        else:
+            if index > 1:
+                stream.write(separator)
+            stream.write(text)
+        count = index
+    if output_format == "text" and count:
+        stream.write("\n")
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Renderiza um template para cada linha de um CSV ou JSONL."
+    )
+    parser.add_argument("template", help='Nome completo, ex.: "Suporte / Conclusão"')
+    parser.add_argument("input", help="Arquivo .csv ou .jsonl ('-' lê JSONL da entrada padrão)")
+    parser.add_argument("-o", "--output", default="-", help="Arquivo de saída (padrão: saída padrão)")
+    parser.add_argument("-f", "--format", choices=("text", "jsonl"), default="text")
+    parser.add_argument(
+        "--separator", default="\n\n---\n\n", help="Separador entre textos no formato text"
+    )
+    parser.add_argument("--templates", default="templates", help="Diretório dos templates")
+    parser.add_argument("--sqlite", default=None, help="Lê os templates deste banco SQLite")
+    parser.add_argument("--workers", type=int, default=None, help="Processos (padrão: CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--encoding", default="utf-8", help="Codificação do arquivo de entrada")
+    parser.add_argument(
+        "--now",
+        type=datetime.datetime.fromisoformat,
+        default=None,
+        help="Horário fixo para $Agora$, $Hoje$... (ISO, ex.: 2025-01-31T14:30)",
+    )
+    args = parser.parse_args(argv)
+
+    storage = SQLiteStorage(args.sqlite) if args.sqlite else None
+    manager = TemplateManager(
+        args.templates, automatic_names=placeholder_engine.handlers, storage=storage
+    )
+    template = manager.get_template(args.template)
+    if not template:
+        print(f"Template não encontrado: {args.template}", file=sys.stderr)
+        return 2
+
+    fields = manager.get_template_info(args.template).input_fields
+    rows = read_rows(args.input, args.encoding)
+    outputs = render_rows(
+        template, fields, rows, args.workers, max(1, args.chunk_size), args.now
+    )
+
+    try:
+        if args.output == "-":
+            count = write_outputs(outputs, sys.stdout, args.format, args.separator)
+        else:
+            with open(args.output, "w", encoding="utf-8", newline="") as stream:
+                count = write_outputs(outputs, stream, args.format, args.separator)
+    except (OSError, ValueError, csv.Error) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+
+    logger.info(f"{count} linhas renderizadas com o template '{args.template}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
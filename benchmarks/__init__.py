@@ -0,0 +1 @@
+"""Benchmarks do Linx Fast (executar da raiz do projeto com python -m)."""
@@ -0,0 +1,94 @@
+"""
+Memória e tempo de exportar/validar/importar a biblioteca (archive.py).
+
+    python -m benchmarks.archive [--templates 2000] [--size 2048] [--max-peak-mb 8]
+
+Grava N templates sintéticos numa pasta temporária, exporta para .jsonl.gz,
+valida o arquivo e importa numa pasta vazia, medindo o tempo e o pico de
+memória (tracemalloc) de exportar e validar, que passam um template (ou um
+bloco de linhas) por vez: o pico não cresce com a biblioteca. A importação só
+tem o tempo medido (a memória dela é a dos índices da biblioteca nova). Sai
+com código 1 se o pico de exportar ou validar passar de --max-peak-mb, ou se
+a importação não recriar todos os templates com o mesmo conteúdo.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from linxfast.core import TemplateManager, export_library, import_library, validate_archive
+
+from .pack import _write_library
+from .search import build_library
+
+MAX_PEAK_MB = 8.0
+CACHE_SIZE = 256 * 1024  # cache de conteúdo pequeno, para medir o fluxo e não o LRU
+
+
+def _user_dirs(tmp, name):
+    # Cache e histórico na pasta temporária, não nas pastas do usuário
+    return {"cache_dir": os.path.join(tmp, f"cache-{name}"), "data_dir": os.path.join(tmp, f"data-{name}")}
+
+
+def _measure(function, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = function(*args)
+    finally:
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--templates", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=2048, help="Bytes por template")
+    parser.add_argument("--max-peak-mb", type=float, default=MAX_PEAK_MB)
+    args = parser.parse_args(argv)
+
+    library = build_library(args.templates, args.size)
+    library_bytes = sum(len(content.encode("utf-8")) for _, content in library)
+    with tempfile.TemporaryDirectory() as tmp:
+        source_dir = os.path.join(tmp, "origem")
+        _write_library(source_dir, library)
+        source = TemplateManager(source_dir, cache_size=CACHE_SIZE, **_user_dirs(tmp, "origem"))
+        path = os.path.join(tmp, "biblioteca.jsonl.gz")
+
+        count, export_s, export_peak = _measure(export_library, source, path)
+        _, validate_s, validate_peak = _measure(validate_archive, path)
+        target = TemplateManager(
+            os.path.join(tmp, "destino"), cache_size=CACHE_SIZE, **_user_dirs(tmp, "destino")
+        )
+        start = time.perf_counter()
+        result = import_library(target, path)
+        import_s = time.perf_counter() - start
+        size = os.path.getsize(path)
+        imported = all(target.get_template(name) == content for name, content in library)
+
+    print(f"biblioteca: {count} templates, {library_bytes / 1e6:.1f} MB; "
+          f"arquivo .jsonl.gz: {size / 1e6:.1f} MB")
+    print(f"exportar {export_s * 1000:8.0f} ms   pico {export_peak / 1e6:6.2f} MB")
+    print(f"validar  {validate_s * 1000:8.0f} ms   pico {validate_peak / 1e6:6.2f} MB")
+    print(f"importar {import_s * 1000:8.0f} ms   ({import_s * 1e3 / max(count, 1):.2f} ms por template)")
+    print(result)
+
+    ok = True
+    for label, peak in (("exportar", export_peak), ("validar", validate_peak)):
+        if peak > args.max_peak_mb * 1e6:
+            print(f"FALHA: pico de memória ao {label} ({peak / 1e6:.2f} MB) passou de "
+                  f"{args.max_peak_mb} MB")
+            ok = False
+    if not imported or len(result.added) != count:
+        print("FALHA: a importação não recriou a biblioteca")
+        ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""
+Fuzz do renderizador de templates, com limite de tempo por caso.
+
+    python -m benchmarks.fuzz [--cases 2000] [--seed 1] [--budget-ms 250]
+                              [--fixtures benchmarks/fuzz_fixtures]
+
+Dois geradores de casos:
+    compat       só a gramática que a implementação antiga (regex) entendia;
+                 o render novo tem que produzir exatamente o mesmo texto que
+                 benchmarks/legacy_reference.py.
+    adversarial  '$', '?', '|', '[', quebras de linha e condicionais
+                 aninhadas colados em qualquer ordem. Verifica que os tokens
+                 cobrem o texto inteiro e que o LivePreview incremental bate
+                 com o render completo.
+
+Em todos os casos o render a frio (análise + render) precisa caber em
+--budget-ms, e o tempo de 8 cópias do template não pode crescer mais que
+linearmente. Casos que falham são salvos como JSON em --fixtures e
+reexecutados primeiro nas próximas rodadas. Um caso que trava (WATCHDOG
+vezes o orçamento) é salvo e o processo termina com código 2.
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+from linxfast.core import (
+    CompiledTemplate,
+    LivePreview,
+    extract_fields,
+    parse,
+    placeholder_engine,
+    template_compiler,
+    tokenize,
+)
+
+from . import legacy_reference
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fuzz_fixtures")
+NOW = datetime.datetime(2025, 1, 31, 14, 30, 15)
+
+SCALE = 8  # O template é repetido SCALE vezes no teste de crescimento
+SCALE_SLACK = 3.0  # Tolerância sobre o crescimento linear (ruído de medição)
+SCALE_FLOOR = 0.005  # Abaixo disso (s) a medição é ruído demais para concluir algo
+WATCHDOG = 100  # Múltiplo do orçamento após o qual o caso é dado como travado
+
+# Caracteres aceitos nos nomes e ramos pela regex antiga
+_NAME_ALPHABET = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-çãéõ"
+_BRANCH_ALPHABET = _NAME_ALPHABET + " :/%[]"
+_TEXT_ALPHABET = _BRANCH_ALPHABET + ",.!()\n\t𝐃"
+_AUTOMATIC = ("$Hoje$", "$Agora$", "$DiaSemana$", "$HoraMinuto$", "$Agora[%d/%m/%Y %H:%M]$")
+
+_SNIPPETS = (
+    "$", "$", "$", "?", "|", "[", "]", "\n", " ", "x", "Nome", "R$ 10,00",
+    "$Nome$", "$A?", "$B?sim|não$", "$[checkbox]Ok?", "$[radio:a|b]Op$",
+    "$Agora[", "$Agora[%H$", "$Hoje$", "$$", "$ ", "$\n", "|$", "?|", "𝐃𝐚𝐝𝐨𝐬",
+)
+
+
+def _word(rng, alphabet, low=1, high=8):
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(low, high)))
+
+
+def _name(rng):
+    name = _word(rng, _NAME_ALPHABET, 1, 10)
+    return f"[checkbox]{name}" if rng.random() < 0.2 else name
+
+
+def compat_case(rng):
+    """Template e valores dentro da gramática que a regex antiga trata igual."""
+    names = [_name(rng) for _ in range(rng.randint(1, 8))]
+    pieces = []
+    for _ in range(rng.randint(1, 30)):
+        roll = rng.random()
+        if roll < 0.35:
+            pieces.append(_word(rng, _TEXT_ALPHABET, 0, 20))
+        elif roll < 0.65:
+            pieces.append(f"${rng.choice(names)}$")
+        elif roll < 0.75:
+            pieces.append(rng.choice(_AUTOMATIC))
+        else:
+            pieces.append(
+                f"${rng.choice(names)}?{_word(rng, _BRANCH_ALPHABET, 0, 12)}"
+                f"|{_word(rng, _BRANCH_ALPHABET, 0, 12)}$"
+            )
+    # Espaço entre as peças: na regex antiga "$A$B$" poderia casar "$B$"
+    template = " ".join(pieces)
+    values = {}
+    for name in names:
+        if rng.random() < 0.8:
+            values[name] = rng.choice(
+                ("", "Sim", "Não", _word(rng, _TEXT_ALPHABET, 1, 15))
+            )
+    return {"mode": "compat", "template": template, "values": values}
+
+
+def adversarial_case(rng):
+    """Sequência aleatória de trechos problemáticos; às vezes bem grande."""
+    count = rng.randint(2000, 6000) if rng.random() < 0.05 else rng.randint(1, 120)
+    template = "".join(rng.choice(_SNIPPETS) for _ in range(count))
+    fields, _ = extract_fields(template)
+    values = {}
+    for name in fields:
+        values[name] = rng.choice(("", "Sim", "Não", "$Hoje$", "a|b?c", "valor"))
+    return {"mode": "adversarial", "template": template, "values": values}
+
+
+def _cold_render(template, values):
+    compiled = CompiledTemplate(parse(template, placeholder_engine.handlers), placeholder_engine)
+    return compiled.render(values, placeholder_engine.context(NOW))
+
+
+def _best_time(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def check_tokens(template):
+    """Os tokens precisam cobrir o texto inteiro, em ordem e sem buracos."""
+    tokens, _ = tokenize(template, placeholder_engine.handlers)
+    position = 0
+    for token in tokens:
+        if token.start != position or token.end < token.start:
+            return f"tokens não contíguos em {position} ({token!r})"
+        position = token.end
+    if position != len(template):
+        return f"tokens terminam em {position}, texto tem {len(template)}"
+    return None
+
+
+def check_preview(template, values, rng):
+    """Atualizações incrementais do LivePreview == render completo."""
+    compiled = template_compiler.compile(template)
+    preview = LivePreview(compiled)
+    preview.render(values, placeholder_engine.context(NOW))
+    current = dict(values)
+    for _ in range(5):
+        if current:
+            key = rng.choice(sorted(current))
+            current[key] = rng.choice(("", "Sim", "x", "Não"))
+        preview.update(current, placeholder_engine.context(NOW))
+        expected = compiled.render(current, placeholder_engine.context(NOW))
+        if preview.text() != expected:
+            return "LivePreview diverge do render completo"
+    return None
+
+
+def check_case(case, budget, rng):
+    """Retorna a lista de problemas encontrados (vazia se o caso passou)."""
+    template, values = case["template"], case["values"]
+    problems = []
+
+    start = time.perf_counter()
+    try:
+        rendered = _cold_render(template, values)
+    except Exception as e:
+        return [f"exceção no render: {e!r}"]
+    elapsed = time.perf_counter() - start
+    if elapsed > budget:
+        problems.append(f"render levou {elapsed * 1000:.1f} ms (limite {budget * 1000:.0f} ms)")
+
+    if case["mode"] == "compat":
+        expected = legacy_reference.render(template, values, NOW)
+        if rendered != expected:
+            problems.append("diverge da implementação antiga")
+
+    for problem in (check_tokens(template), check_preview(template, values, rng)):
+        if problem:
+            problems.append(problem)
+
+    # Crescimento: SCALE cópias não podem custar muito mais que SCALE vezes
+    repeated = template * SCALE
+    single = _best_time(lambda: _cold_render(template, values))
+    scaled = _best_time(lambda: _cold_render(repeated, values))
+    if scaled > SCALE_FLOOR and scaled > single * SCALE * SCALE_SLACK:
+        problems.append(
+            f"crescimento superlinear: {single * 1000:.2f} ms -> "
+            f"{scaled * 1000:.2f} ms com {SCALE}x o tamanho"
+        )
+    return problems
+
+
+def save_fixture(case, problems, fixtures_dir):
+    os.makedirs(fixtures_dir, exist_ok=True)
+    payload = json.dumps([case["template"], case["values"]], sort_keys=True)
+    digest = hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+    path = os.path.join(fixtures_dir, f"{case['mode']}-{digest}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dict(case, problems=problems), f, ensure_ascii=False, indent=2)
+    return path
+
+
+def load_fixtures(fixtures_dir):
+    if not os.path.isdir(fixtures_dir):
+        return []
+    cases = []
+    for filename in sorted(os.listdir(fixtures_dir)):
+        if filename.endswith(".json"):
+            with open(os.path.join(fixtures_dir, filename), "r", encoding="utf-8") as f:
+                case = json.load(f)
+            case["fixture"] = filename
+            cases.append(case)
+    return cases
+
+
+def _run_with_watchdog(case, budget, rng, fixtures_dir):
+    def on_hang():
+        path = save_fixture(case, ["travou (watchdog)"], fixtures_dir)
+        print(f"\nCaso travou por mais de {budget * WATCHDOG:.1f} s; salvo em {path}", flush=True)
+        os._exit(2)
+
+    watchdog = threading.Timer(budget * WATCHDOG, on_hang)
+    watchdog.daemon = True
+    watchdog.start()
+    try:
+        return check_case(case, budget, rng)
+    finally:
+        watchdog.cancel()
+
+
+def run(cases=2000, seed=None, budget_ms=250.0, fixtures_dir=FIXTURES_DIR, save=True):
+    seed = seed if seed is not None else random.randrange(1 << 30)
+    rng = random.Random(seed)
+    budget = budget_ms / 1000
+    failures = 0
+
+    fixtures = load_fixtures(fixtures_dir)
+    for case in fixtures:
+        problems = _run_with_watchdog(case, budget, rng, fixtures_dir)
+        if problems:
+            failures += 1
+            print(f"FIXTURE {case['fixture']}: {'; '.join(problems)}")
+
+    for index in range(cases):
+        make = compat_case if index % 2 == 0 else adversarial_case
+        case = make(rng)
+        problems = _run_with_watchdog(case, budget, rng, fixtures_dir)
+        if problems:
+            failures += 1
+            path = save_fixture(case, problems, fixtures_dir) if save else "-"
+            print(f"FALHA caso {index} ({case['mode']}): {'; '.join(problems)} -> {path}")
+
+    print(
+        f"{cases} casos gerados (seed {seed}) e {len(fixtures)} fixtures: "
+        f"{failures} falha(s)"
+    )
+    return failures == 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fuzz do renderizador de templates.")
+    parser.add_argument("--cases", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=None, help="Semente (padrão: aleatória)")
+    parser.add_argument("--budget-ms", type=float, default=250.0,
+                        help="Tempo máximo do render a frio por caso")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Diretório das fixtures")
+    parser.add_argument("--no-save", action="store_true", help="Não grava novas fixtures")
+    args = parser.parse_args(argv)
+    ok = run(args.cases, args.seed, args.budget_ms, args.fixtures, not args.no_save)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
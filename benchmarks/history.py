@@ -0,0 +1,94 @@
+"""
+Custo do histórico de revisões (RevisionStore) por gravação.
+
+    python -m benchmarks.history [--templates 50] [--saves 200] [--size 2048] [--budget-ms 1]
+
+Simula edições pequenas e sucessivas em N templates (um trecho trocado ou
+acrescentado por gravação) e mede: o tempo de record() por gravação, o
+tamanho do histórico em disco comparado ao texto das revisões guardadas e a
+leitura da revisão mais antiga (a cadeia mais longa) num RevisionStore
+recém-aberto. Sai com código 1 se o record() (p95) passar do orçamento ou se
+alguma revisão lida diferir da gravada.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from linxfast.core import RevisionStore
+
+from .search import build_library
+
+BUDGET_MS = 1.0
+
+
+def _edit(rng, text):
+    """Uma edição pequena: troca uma linha ou acrescenta uma no fim."""
+    lines = text.split("\n")
+    line = f"Linha editada {rng.randrange(10**6)} {{campo_{rng.randrange(20)}}}"
+    if rng.random() < 0.5:
+        lines[rng.randrange(len(lines))] = line
+    else:
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--templates", type=int, default=50)
+    parser.add_argument("--saves", type=int, default=200, help="Gravações por template")
+    parser.add_argument("--size", type=int, default=2048, help="Bytes por template")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    library = build_library(args.templates, args.size)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = RevisionStore(tmp)
+        timings, expected = [], {}
+        for name, content in library:
+            revisions = [content]
+            for _ in range(args.saves):
+                revisions.append(_edit(rng, revisions[-1]))
+            for text in revisions:
+                start = time.perf_counter()
+                store.record(name, text)
+                timings.append((time.perf_counter() - start) * 1000)
+            expected[name] = revisions
+
+        fresh = RevisionStore(tmp)
+        same = True
+        stored = raw = 0
+        read_timings = []
+        for name, revisions in expected.items():
+            kept = fresh.revisions(name)
+            raw += sum(len(text.encode("utf-8")) for text in revisions[-len(kept):])
+            stored += os.path.getsize(fresh.path(name))
+            start = time.perf_counter()
+            oldest = fresh.get(name, 0)
+            read_timings.append((time.perf_counter() - start) * 1000)
+            texts = [fresh.get(name, index) for index, _ in kept]
+            if texts != revisions[-len(kept):] or oldest != texts[0]:
+                same = False
+
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95)]
+    print(f"{len(timings)} gravações: record() mediana {statistics.median(timings):.3f} ms, "
+          f"p95 {p95:.3f} ms, máx {timings[-1]:.2f} ms")
+    print(f"histórico em disco: {stored / 1e3:.0f} kB para {raw / 1e3:.0f} kB de revisões "
+          f"({raw / max(stored, 1):.1f}x)")
+    print(f"revisão mais antiga (arquivo recém-aberto): mediana {statistics.median(read_timings):.3f} ms")
+    ok = same and p95 <= args.budget_ms
+    if p95 > args.budget_ms:
+        print(f"FALHA: record() p95 {p95:.3f} ms (orçamento {args.budget_ms} ms)")
+    if not same:
+        print("FALHA: revisão lida difere da gravada")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
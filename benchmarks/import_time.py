@@ -0,0 +1,106 @@
+"""
+Mede o tempo de importação de linxfast.core em um interpretador novo.
+
+    python -m benchmarks.import_time [--runs 15] [--budget-ms 50] [--detail]
+
+Também confere que nenhum módulo de interface (customtkinter, tkinter,
+pyperclip, requests) é carregado. Sai com código 1 se a mediana passar do
+orçamento ou se algum desses módulos aparecer.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULE = "linxfast.core"
+GUI_MODULES = ("customtkinter", "tkinter", "pyperclip", "requests")
+BUDGET_MS = 50.0
+
+_PROBE = f"""
+import sys, time
+start = time.perf_counter()
+import {MODULE}
+elapsed = time.perf_counter() - start
+print(elapsed * 1000)
+print(",".join(m for m in {GUI_MODULES!r} if m in sys.modules))
+"""
+
+
+def measure_once():
+    """Retorna (ms, módulos_de_interface_carregados) de uma importação a frio."""
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    lines = result.stdout.splitlines()
+    loaded = lines[1] if len(lines) > 1 else ""
+    return float(lines[0]), [m for m in loaded.split(",") if m]
+
+
+def import_breakdown(limit=10):
+    """Módulos mais lentos segundo -X importtime (tempo próprio, em ms)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {MODULE}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[0].split(":")[-1].strip().isdigit():
+            continue
+        self_us = int(parts[0].split(":")[-1])
+        cumulative_us = int(parts[1])
+        rows.append((self_us / 1000, cumulative_us / 1000, parts[2].strip()))
+    rows.sort(reverse=True)
+    return rows[:limit]
+
+
+def run(runs=15, budget_ms=BUDGET_MS, detail=False):
+    # A primeira execução grava os .pyc; não entra na estatística
+    measure_once()
+    timings = []
+    loaded_gui = set()
+    for _ in range(runs):
+        elapsed, loaded = measure_once()
+        timings.append(elapsed)
+        loaded_gui.update(loaded)
+
+    median = statistics.median(timings)
+    print(f"import {MODULE}: mediana {median:.1f} ms "
+          f"(mín {min(timings):.1f}, máx {max(timings):.1f}, {runs} execuções)")
+    print(f"orçamento: {budget_ms:.0f} ms")
+    if detail:
+        print("\nmódulos mais lentos (próprio / acumulado, ms):")
+        for self_ms, cumulative_ms, name in import_breakdown():
+            print(f"  {self_ms:7.2f} {cumulative_ms:8.2f}  {name}")
+
+    ok = True
+    if loaded_gui:
+        print(f"FALHA: módulos de interface importados: {', '.join(sorted(loaded_gui))}")
+        ok = False
+    if median > budget_ms:
+        print("FALHA: acima do orçamento")
+        ok = False
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--detail", action="store_true", help="Mostra -X importtime")
+    args = parser.parse_args(argv)
+    return 0 if run(args.runs, args.budget_ms, args.detail) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Implementação antiga (por regex) do render, usada como referência no fuzz.
+
+Copiada do main_window.py anterior ao compilador de templates: condicionais
+por re.sub recursivo, campos por str.replace e automáticos por outra regex.
+Só o relógio é injetado (parâmetro 'now') para a comparação ser determinística.
+Não use em produção: o comportamento com '$' soltos e condicionais aninhadas
+é justamente o que o scanner novo corrige.
+"""
+
+import re
+
+DIAS_SEMANA_PT = {
+    "Monday": "segunda-feira",
+    "Tuesday": "terça-feira",
+    "Wednesday": "quarta-feira",
+    "Thursday": "quinta-feira",
+    "Friday": "sexta-feira",
+    "Saturday": "sábado",
+    "Sunday": "domingo",
+}
+
+# Classe de caracteres das regex antigas
+NAME_CHARS = r"a-zA-Z0-9 _\-çÇáéíóúãõâêîôûÀ-ÿ\[\]%:/"
+_CONDITIONAL_RE = re.compile(r"\$([" + NAME_CHARS + r"\?\|]+)\$")
+_PLACEHOLDER_RE = re.compile(r"\$([" + NAME_CHARS + r"]+)\$")
+
+
+def default_handlers(now):
+    weekday = now.strftime("%A")
+    return {
+        "Hoje": lambda: now.strftime("%d/%m/%Y"),
+        "DiaSemana": lambda: DIAS_SEMANA_PT.get(weekday, weekday),
+        "HoraMinuto": lambda: now.strftime("%H:%M"),
+        "HoraMinutoSegundo": lambda: now.strftime("%H:%M:%S"),
+    }
+
+
+def process_conditionals(template, field_values):
+    def cond_replacer(match):
+        field = match.group(1)
+        if "?" in field and "|" in field:
+            # Suporte a aninhamento acidental, pega só o primeiro ?
+            field_name, rest = field.split("?", 1)
+            if "|" in rest:
+                text_true, text_false = rest.split("|", 1)
+            else:
+                text_true, text_false = rest, ""
+            value = field_values.get(field_name, "")
+            # Se for checkbox, só considera "Sim" como verdadeiro
+            if field_name.startswith("[checkbox]"):
+                is_true = value == "Sim"
+            else:
+                is_true = bool(value)
+            if is_true:
+                return process_conditionals(text_true, field_values)
+            return process_conditionals(text_false, field_values)
+        return match.group(0)
+
+    return _CONDITIONAL_RE.sub(cond_replacer, template)
+
+
+def process(text, now, handlers):
+    def replacer(match):
+        ph = match.group(1)
+        if ph == "Agora" or (ph.startswith("Agora[") and ph.endswith("]")):
+            fmt = "%H:%M" if ph == "Agora" else ph[6:-1]
+            try:
+                return now.strftime(fmt)
+            except Exception:
+                return match.group(0)
+        handler = handlers.get(ph)
+        if handler:
+            return handler()
+        return match.group(0)
+
+    return _PLACEHOLDER_RE.sub(replacer, text)
+
+
+def render(template, field_values, now):
+    """Pipeline do antigo copy_template: condicionais, campos e automáticos."""
+    template = process_conditionals(template, field_values)
+    for key, value in field_values.items():
+        template = template.replace(f"${key}$", value if value else "")
+    return process(template, now, default_handlers(now))
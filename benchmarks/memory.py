@@ -0,0 +1,203 @@
+"""
+Memória por template de uma biblioteca grande.
+
+    python -m benchmarks.memory [--templates 10000] [--size 1024] [--budget 600]
+                                [--baseline REV]
+
+Grava N templates sintéticos (e um meta.json com favorito, protegido e
+nocodb_id para cada um) numa pasta temporária e mede com tracemalloc, em
+bytes por template, o que fica vivo:
+    - o TemplateManager recém-aberto (sem cache de conteúdo, se a versão tem);
+    - + o índice de placeholders de todos os templates pelo manager (inclui o
+      cache de análise);
+    - + a busca no texto;
+    - só os TemplateInfo (build_info) de todos os templates.
+Com --baseline REV as mesmas medidas rodam num processo separado sobre o
+código da revisão REV do git (extraída com git archive), ou seja, com os
+objetos daquela versão e não com uma cópia deles. Na primeira revisão, por
+exemplo, templates era um dict nome -> conteúdo e o meta um dict de dicts.
+Etapas que a versão não tem aparecem como "-".
+
+Sai com código 1 se o TemplateInfo passar de --budget bytes por template ou,
+com --baseline numa revisão que já tinha TemplateInfo, se ele não ficar menor
+que o da revisão. O restante da comparação é só informativo: a primeira
+revisão guardava o conteúdo inteiro, mas não tinha nenhum dos índices.
+"""
+
+import argparse
+import gc
+import io
+import json
+import logging
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import tracemalloc
+
+BUDGET = 600  # bytes por template
+STEPS = (
+    ("manager", "manager aberto"),
+    ("placeholders", "+ placeholders"),
+    ("search", "+ busca no texto"),
+    ("info", "TemplateInfo"),
+)
+
+# Roda measure_tree() na árvore extraída: só a pasta dela no sys.path
+_CHILD = (
+    "import importlib.util, json, sys\n"
+    "spec = importlib.util.spec_from_file_location('memory', sys.argv[1])\n"
+    "module = importlib.util.module_from_spec(spec)\n"
+    "spec.loader.exec_module(module)\n"
+    "print(json.dumps(module.measure_tree(sys.argv[2])))\n"
+)
+
+
+def _traced(function):
+    """(resultado, bytes alocados por 'function' que continuam vivos)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = function()
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return result, after - before
+
+
+def _open_manager(TemplateManager, base_dir, handlers):
+    # Versões antigas não têm cache LRU nem nomes automáticos
+    for kwargs in ({"automatic_names": handlers, "cache_size": 0}, {"automatic_names": handlers}, {}):
+        try:
+            return TemplateManager(base_dir, **kwargs)
+        except TypeError as e:
+            if "unexpected keyword argument" not in str(e):
+                raise
+    raise TypeError("TemplateManager sem construtor conhecido")
+
+
+def measure_tree(base_dir):
+    """
+    {etapa: bytes vivos} com o código importável neste processo (a árvore
+    atual ou a de --baseline). Só usa a biblioteca padrão no topo do módulo
+    para poder rodar sobre revisões antigas.
+    """
+    # O auto_log de algumas versões não deve entrar na medida
+    logging.disable(logging.CRITICAL)
+    try:
+        from linxfast.core import TemplateManager
+    except ImportError:
+        # Antes do pacote linxfast.core
+        from template_manager import TemplateManager
+    try:
+        from linxfast.core import build_info, placeholder_engine
+
+        handlers = placeholder_engine.handlers
+    except ImportError:
+        build_info, handlers = None, ()
+
+    contents = []
+    for root, _, files in os.walk(base_dir):
+        for file in files:
+            if file.endswith(".txt"):
+                with open(os.path.join(root, file), encoding="utf-8") as f:
+                    contents.append(f.read())
+
+    result = {"count": len(contents)}
+    manager, result["manager"] = _traced(lambda: _open_manager(TemplateManager, base_dir, handlers))
+    if hasattr(manager, "get_template_info"):
+        _, result["placeholders"] = _traced(
+            lambda: [manager.get_template_info(name) for name in manager.templates]
+        )
+    search_index = getattr(manager, "search_index", None)
+    if search_index is not None and hasattr(search_index, "refresh"):
+        _, result["search"] = _traced(lambda: search_index.refresh(manager.templates.load))
+    if build_info is not None:
+        infos, result["info"] = _traced(lambda: [build_info(c, handlers) for c in contents])
+        result["fields"] = sum(len(info.fields) for info in infos)
+    return result
+
+
+def _measure_revision(revision, base_dir, tmp):
+    """measure_tree() sobre o código da revisão 'revision' do git."""
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    label = subprocess.run(
+        ["git", "rev-parse", "--short", revision], cwd=repo, check=True, capture_output=True, text=True
+    ).stdout.strip()
+    archive = subprocess.run(
+        ["git", "archive", "--format=tar", revision], cwd=repo, check=True, capture_output=True
+    ).stdout
+    tree = os.path.join(tmp, f"rev-{label}")
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(tree)
+    output = subprocess.run(
+        [sys.executable, "-c", _CHILD, os.path.abspath(__file__), base_dir],
+        cwd=tree, check=True, capture_output=True, text=True,
+    ).stdout
+    return label, json.loads(output.strip().splitlines()[-1])
+
+
+def _write_meta(base_dir, library):
+    meta = {
+        name: {"favorito": index % 10 == 0, "protegido": index % 25 == 0, "nocodb_id": 1000 + index}
+        for index, (name, _) in enumerate(library)
+    }
+    with open(os.path.join(base_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+def _column(result, key):
+    if key not in result:
+        return f"{'-':>9}"
+    return f"{result[key] / result['count']:9.0f}"
+
+
+def main(argv=None):
+    from .pack import _write_library
+    from .search import build_library
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--templates", type=int, default=10000)
+    parser.add_argument("--size", type=int, default=1024, help="Bytes por template")
+    parser.add_argument("--budget", type=int, default=BUDGET, help="Bytes por TemplateInfo")
+    parser.add_argument("--baseline", help="Revisão do git a comparar (ex.: a primeira, HEAD~1)")
+    args = parser.parse_args(argv)
+
+    library = build_library(args.templates, args.size)
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir = os.path.join(tmp, "templates")
+        _write_library(base_dir, library)
+        _write_meta(base_dir, library)
+        current = measure_tree(base_dir)
+        baseline = None
+        if args.baseline:
+            label, baseline = _measure_revision(args.baseline, base_dir, tmp)
+
+    count = current["count"]
+    print(f"{count} templates, {current['fields'] / count:.1f} campos por template "
+          f"(B/template; o manager não inclui o cache de conteúdo quando a versão tem um)")
+    header = f"{'':18}{'atual':>9}"
+    if baseline:
+        header += f"{label:>12}"
+    print(header)
+    for key, title in STEPS:
+        line = f"{title:18}{_column(current, key)}"
+        if baseline:
+            line += f"   {_column(baseline, key)}"
+        print(line)
+
+    ok = True
+    if current["info"] / count > args.budget:
+        print(f"FALHA: TemplateInfo passou de {args.budget} B/template")
+        ok = False
+    if baseline and "info" in baseline and current["info"] >= baseline["info"]:
+        print(f"FALHA: TemplateInfo não ficou menor que na revisão {label}")
+        ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
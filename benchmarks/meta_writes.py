@@ -0,0 +1,84 @@
+"""
+Quantas gravações do meta custam N alterações seguidas (write-behind).
+
+    python -m benchmarks.meta_writes [--toggles 1000] [--entries 1000]
+
+Para cada backend (meta.json e SQLite), alterna o favorito de templates
+aleatórios N vezes e conta as chamadas a storage.save_meta (cada uma
+serializa o meta inteiro ou compara todas as linhas) e as gravações em disco
+do meta.json. Compara com o modo síncrono (save_delay=None, o comportamento
+antigo: uma gravação por alteração). Sai com código 1 se o write-behind
+gravar mais de uma vez.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from linxfast.core import FileStorage, SQLiteStorage, TemplateMeta, background_writer
+
+
+def _count_saves(storage):
+    calls = [0]
+    save_meta = storage.save_meta
+
+    def counting(meta):
+        calls[0] += 1
+        save_meta(meta)
+
+    storage.save_meta = counting
+    return calls
+
+
+def run_once(kind, toggles, entries, save_delay, seed=0):
+    """(segundos das alterações, chamadas a save_meta, gravações do meta.json)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        if kind == "file":
+            storage = FileStorage(tmp)
+        else:
+            storage = SQLiteStorage(os.path.join(tmp, "templates.db"))
+        names = [f"Cat {i % 20} / Template {i}" for i in range(entries)]
+        storage.save_meta({name: {"favorito": False, "nocodb_id": str(i)}
+                           for i, name in enumerate(names)})
+        background_writer.flush()
+
+        meta = TemplateMeta(storage=storage, save_delay=save_delay)
+        calls = _count_saves(storage)
+        writes = background_writer.writes
+        rng = random.Random(seed)
+        start = time.perf_counter()
+        for _ in range(toggles):
+            meta.toggle_favorite(rng.choice(names))
+        elapsed = time.perf_counter() - start
+        meta.flush()
+        background_writer.flush()
+        disk_writes = background_writer.writes - writes
+        storage.close()
+        return elapsed, calls[0], disk_writes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--toggles", type=int, default=1000)
+    parser.add_argument("--entries", type=int, default=1000, help="Entradas no meta")
+    args = parser.parse_args(argv)
+
+    ok = True
+    for kind in ("file", "sqlite"):
+        for label, delay in (("síncrono", None), ("write-behind", 0.5)):
+            elapsed, saves, disk = run_once(kind, args.toggles, args.entries, delay)
+            disk_info = f", {disk} gravações do meta.json" if kind == "file" else ""
+            print(f"{kind:6s} {label:12s} {args.toggles} alterações em {elapsed * 1000:8.1f} ms: "
+                  f"{saves} save_meta{disk_info}")
+            if delay is not None and saves > 1:
+                ok = False
+    if not ok:
+        print("FALHA: write-behind gravou mais de uma vez")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Abertura de uma biblioteca grande pelo pack (.lfpack) em vez dos .txt.
+
+    python -m benchmarks.pack [--templates 10000] [--size 1024] [--budget-ms 10]
+
+Grava N templates sintéticos numa pasta temporária, monta o pack
+(prepare_pack, que no app roda numa thread), mede o save_pack que o instala
+ao fechar e mede: abrir o pack (mmap + diretório de nomes), ler o conteúdo e a tabela de
+placeholders de uma amostra pelo pack e pelos .txt. Sai com código 1 se a
+abertura (mediana) passar do orçamento ou se algum conteúdo lido do pack
+diferir do .txt.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from linxfast.core import LibraryPack, TemplateManager, build_info
+
+from .search import build_library
+
+BUDGET_MS = 10.0
+SAMPLE = 500
+
+
+def _write_library(base_dir, library):
+    for name, content in library:
+        category, title = name.split(" / ", 1)
+        os.makedirs(os.path.join(base_dir, category), exist_ok=True)
+        with open(os.path.join(base_dir, category, f"{title}.txt"), "w", encoding="utf-8") as f:
+            f.write(content)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--templates", type=int, default=10000)
+    parser.add_argument("--size", type=int, default=1024, help="Bytes por template")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    library = build_library(args.templates, args.size)
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir = os.path.join(tmp, "templates")
+        _write_library(base_dir, library)
+        manager = TemplateManager(
+            base_dir, cache_dir=os.path.join(tmp, "cache"), data_dir=os.path.join(tmp, "data")
+        )
+        # No app o prepare_pack roda numa thread; ao fechar, save_pack só troca o arquivo
+        start = time.perf_counter()
+        manager.prepare_pack()
+        build_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        manager.save_pack()
+        close_ms = (time.perf_counter() - start) * 1000
+        manager.templates.pack.close()
+        size = os.path.getsize(manager.pack_path)
+        print(f"{args.templates} templates: pack de {size / 1e6:.1f} MB montado em {build_ms:.0f} ms "
+              f"(prepare_pack); save_pack ao fechar: {close_ms:.1f} ms")
+
+        timings = []
+        for _ in range(15):
+            start = time.perf_counter()
+            pack = LibraryPack.open(manager.pack_path)
+            timings.append((time.perf_counter() - start) * 1000)
+            pack.close()
+        open_ms = statistics.median(timings)
+        print(f"abrir o pack: mediana {open_ms:.2f} ms (mín {min(timings):.2f}, máx {max(timings):.2f})")
+
+        pack = LibraryPack.open(manager.pack_path)
+        index = manager.templates.index
+        sample = random.Random(0).sample(library, min(SAMPLE, len(library)))
+        start = time.perf_counter()
+        from_pack = [(pack.content(n, index[n]), pack.info(n, index[n])) for n, _ in sample]
+        pack_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        from_files = [manager.storage.read(n) for n, _ in sample]
+        from_files = [(content, build_info(content)) for content in from_files]
+        file_ms = (time.perf_counter() - start) * 1000
+        pack.close()
+        print(f"{len(sample)} templates (conteúdo + placeholders): pack {pack_ms:.1f} ms, "
+              f".txt {file_ms:.1f} ms")
+
+    ok = open_ms <= args.budget_ms
+    if not ok:
+        print(f"FALHA: abrir o pack levou {open_ms:.2f} ms (orçamento {args.budget_ms} ms)")
+    if any(p[0] != f[0] or p[1].fields != f[1].fields for p, f in zip(from_pack, from_files)):
+        print("FALHA: conteúdo do pack difere dos .txt")
+        ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
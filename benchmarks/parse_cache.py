@@ -0,0 +1,85 @@
+"""
+Primeira troca de template com e sem o cache de análise (ParseCache).
+
+    python -m benchmarks.parse_cache [--templates 2000] [--size 1024]
+
+Simula a troca de template logo após abrir o app: TemplateInfo (campos) e
+árvore compilada (pré-visualização) de cada template, uma vez, com o
+TemplateCompiler vazio. Compara analisar do zero com usar o arquivo do
+ParseCache gravado numa execução anterior e mede a carga do arquivo. Sai com
+código 1 se o resultado com o cache diferir ou não for mais rápido.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from linxfast.core import (
+    ParseCache,
+    TemplateCompiler,
+    background_writer,
+    build_info,
+    placeholder_engine,
+)
+
+from .search import build_library
+
+
+def first_switch(library, parse_cache=None):
+    """(segundos, resultados) de montar info + árvore de cada template uma vez."""
+    compiler = TemplateCompiler(placeholder_engine)
+    compiler.parse_cache = parse_cache
+    handlers = placeholder_engine.handlers
+    results = []
+    start = time.perf_counter()
+    for _, content in library:
+        if parse_cache is not None:
+            info = parse_cache.info(content, handlers)
+        else:
+            info = build_info(content, handlers)
+        compiled = compiler.compile(content)
+        results.append((info.fields, info.kinds, len(compiled.nodes)))
+    return time.perf_counter() - start, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--templates", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=1024, help="Bytes por template")
+    args = parser.parse_args(argv)
+
+    library = build_library(args.templates, args.size)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "parse_cache.bin")  # no app: pasta de cache do usuário
+        # "Execução anterior": analisa tudo e grava o cache
+        cache = ParseCache(path)
+        first_switch(library, cache)
+        cache.save()
+        background_writer.flush()
+
+        start = time.perf_counter()
+        cache = ParseCache(path)
+        load_ms = (time.perf_counter() - start) * 1000
+        cold, expected = first_switch(library)
+        warm, results = first_switch(library, cache)
+        size = os.path.getsize(path)
+
+    count = len(library)
+    print(f"arquivo do cache: {size / 1e6:.1f} MB, {count} entradas, carregado em {load_ms:.1f} ms")
+    print(f"sem cache: {cold * 1e6 / count:7.1f} µs por template")
+    print(f"com cache: {warm * 1e6 / count:7.1f} µs por template "
+          f"({cache.hits} acertos, {cache.misses} faltas)")
+    ok = True
+    if results != expected:
+        print("FALHA: o cache mudou o resultado da análise")
+        ok = False
+    if warm >= cold:
+        print("FALHA: o cache não acelerou a primeira troca")
+        ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""
+Micro-benchmarks de renderização com templates sintéticos.
+
+    python -m benchmarks [--output atual.json] [--baseline anterior.json]
+                         [--threshold 20] [--quick] [--filter copy]
+
+Mede PlaceholderEngine.process, process_conditionals (o que
+TemplateApp.process_conditionals chama), TemplateManager.extract_placeholders
+e o pipeline completo do botão Copiar (índice do template + render). Os
+templates variam de 10 a 1.000 campos, 1 a 10 níveis de aninhamento e de
+1 KB a 1 MB.
+
+Com --baseline, compara com um JSON anterior e sai com código 1 se algum
+caso ficar mais de --threshold % mais lento.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from linxfast.core import (
+    TemplateManager,
+    placeholder_engine,
+    process_conditionals,
+    template_compiler,
+)
+
+from .synthetic import make_template, make_values
+
+KB = 1024
+MB = 1024 * KB
+
+# (campos, profundidade, tamanho)
+SHAPES = [
+    (10, 1, 1 * KB),
+    (100, 1, 10 * KB),
+    (1000, 1, 100 * KB),
+    (100, 1, 1 * MB),
+    (1000, 1, 1 * MB),
+    (100, 2, 10 * KB),
+    (100, 5, 10 * KB),
+    (100, 10, 10 * KB),
+    (100, 10, 1 * MB),
+]
+QUICK_SHAPES = [(10, 1, 1 * KB), (100, 5, 10 * KB), (1000, 1, 100 * KB)]
+
+# Fixa o horário: $Agora$ e $Hoje$ não mudam entre execuções
+NOW = datetime.datetime(2025, 1, 31, 14, 30)
+
+
+def shape_id(fields, depth, size):
+    size_label = f"{size // MB}MB" if size >= MB else f"{size // KB}KB"
+    return f"f{fields}-d{depth}-{size_label}"
+
+
+def measure(func, min_time=0.2, repeat=5):
+    """Melhor tempo por chamada (s), calibrando o número de chamadas como o timeit."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / repeat or number >= 1 << 20:
+            break
+        number *= 2 if elapsed <= 0 else max(2, int(min_time / repeat / elapsed) + 1)
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best, number
+
+
+def build_cases(shapes, workdir):
+    """Gera (id_do_caso, função) para cada template e operação."""
+    manager = TemplateManager(
+        os.path.join(workdir, "templates"), automatic_names=placeholder_engine.handlers,
+        cache_dir=os.path.join(workdir, "cache"), data_dir=os.path.join(workdir, "data"),
+    )
+    for fields, depth, size in shapes:
+        sid = shape_id(fields, depth, size)
+        content = make_template(fields, depth, size, seed=fields * 31 + depth)
+        name = f"Bench / {sid}"
+        manager.add_template(name, content)
+        values = make_values(manager.get_template_info(name).input_fields, seed=depth)
+
+        def process(content=content):
+            placeholder_engine.process(content, placeholder_engine.context(NOW))
+
+        def conditionals(content=content, values=values):
+            process_conditionals(content, values)
+
+        def extract(content=content):
+            manager.extract_placeholders(content)
+
+        # Valores filtrados como no copy_template, fora da medida: o caso mede o render
+        info = manager.get_template_info(name)
+        field_values = {k: v for k, v in values.items() if info.uses(k)}
+
+        def copy(name=name, field_values=field_values):
+            # Mesmo caminho do copy_template: conteúdo do manager + render em cache
+            template_compiler.render(
+                manager.get_template(name), field_values, placeholder_engine.context(NOW)
+            )
+
+        def copy_cold(content=content, values=values):
+            # Primeira cópia de um template: análise + render, sem cache
+            template_compiler.clear()
+            template_compiler.render(content, values, placeholder_engine.context(NOW))
+
+        yield f"process/{sid}", process
+        yield f"process_conditionals/{sid}", conditionals
+        yield f"extract_placeholders/{sid}", extract
+        yield f"copy/{sid}", copy
+        yield f"copy_cold/{sid}", copy_cold
+
+
+def git_commit():
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(shapes, name_filter=None, min_time=0.2, repeat=5):
+    workdir = tempfile.mkdtemp(prefix="linxfast-bench-")
+    results = {}
+    try:
+        for case_id, func in build_cases(shapes, workdir):
+            if name_filter and name_filter not in case_id:
+                continue
+            seconds, loops = measure(func, min_time, repeat)
+            results[case_id] = {"seconds": seconds, "loops": loops}
+            print(f"{case_id:45s} {seconds * 1e6:12.1f} µs  ({loops} loops)")
+    finally:
+        template_compiler.clear()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Lista (caso, antes, depois, variação %) dos casos acima do limite."""
+    regressions = []
+    old_results = baseline.get("results", {})
+    for case_id, result in current["results"].items():
+        old = old_results.get(case_id)
+        if not old or old["seconds"] <= 0:
+            continue
+        change = (result["seconds"] / old["seconds"] - 1) * 100
+        if change > threshold:
+            regressions.append((case_id, old["seconds"], result["seconds"], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de renderização de templates.")
+    parser.add_argument("-o", "--output", help="Salva os resultados neste JSON")
+    parser.add_argument("-b", "--baseline", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("-t", "--threshold", type=float, default=20.0,
+                        help="Lentidão máxima aceita por caso, em %% (padrão: 20)")
+    parser.add_argument("--quick", action="store_true", help="Só alguns formatos pequenos")
+    parser.add_argument("--filter", help="Roda só os casos cujo id contém este texto")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="Tempo mínimo de medição por caso (s)")
+    args = parser.parse_args(argv)
+
+    shapes = QUICK_SHAPES if args.quick else SHAPES
+    current = run(shapes, args.filter, args.min_time)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"\nResultados salvos em {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressões acima de {args.threshold:.0f}%:")
+            for case_id, before, after, change in regressions:
+                print(f"  {case_id:45s} {before * 1e6:10.1f} -> {after * 1e6:10.1f} µs ({change:+.0f}%)")
+            return 1
+        print(f"\nSem regressões acima de {args.threshold:.0f}% "
+              f"(base: {baseline.get('meta', {}).get('commit')})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Latência da busca de templates (SearchIndex) numa biblioteca sintética.
+
+    python -m benchmarks.search [--templates 10000] [--size 1024] [--budget-ms 5]
+
+Monta o índice com N templates (nome, categoria e ~size bytes de conteúdo),
+mede cada consulta e sai com código 1 se o p95 passar do orçamento. O
+orçamento vale para a consulta "quente" (melhor de várias, como ao digitar);
+a primeira, que monta os vetores em cache dos trigramas, aparece como "fria".
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from linxfast.core import SearchIndex
+
+from .synthetic import _WORDS, make_template
+
+BUDGET_MS = 5.0
+QUERIES = (
+    "suporte",
+    "chamado",
+    "configuracao servidor",
+    "Configuração",
+    "relatório usuário",
+    "nota fiscal",
+    "cad",
+    "senha acesso",
+    "protocolo retorno cliente",
+    "Template 1234",
+    "cat 7",
+    "xyz",
+)
+
+
+def build_library(count, size, seed=0):
+    """[(nome, conteúdo)] com categorias e nomes variados."""
+    rng = random.Random(seed)
+    library = []
+    for index in range(count):
+        category = f"Cat {index % 40}"
+        title = f"Template {index} {rng.choice(_WORDS)} {rng.choice(_WORDS)}"
+        content = make_template(fields=8, depth=1, size=size, seed=index)
+        library.append((f"{category} / {title}", content))
+    return library
+
+
+def run(count, size, k=50, repeat=20):
+    library = build_library(count, size)
+    index = SearchIndex()
+    start = time.perf_counter()
+    for name, content in library:
+        index.index(name, content)
+    build = time.perf_counter() - start
+
+    timings = []
+    for query in QUERIES:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results = index.search(query, k)
+            samples.append(time.perf_counter() - start)
+        best = min(samples)
+        timings.append(best)
+        top = results[0][0] if results else "-"
+        print(f"{query!r:30s} {best * 1000:7.2f} ms (fria {samples[0] * 1000:6.2f} ms)  "
+              f"{len(results):3d} resultados  1º: {top}")
+    return build, timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark da busca de templates.")
+    parser.add_argument("--templates", type=int, default=10000)
+    parser.add_argument("--size", type=int, default=1024, help="Bytes de conteúdo por template")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    build, timings = run(args.templates, args.size)
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000
+    print(f"\níndice: {args.templates} templates em {build:.2f} s")
+    print(f"consulta: mediana {statistics.median(timings) * 1000:.2f} ms, p95 {p95:.2f} ms "
+          f"(orçamento {args.budget_ms:.0f} ms)")
+    if p95 > args.budget_ms:
+        print("FALHA: acima do orçamento")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
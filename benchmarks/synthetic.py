@@ -0,0 +1,72 @@
+"""Geração determinística de templates sintéticos para os benchmarks."""
+
+import random
+
+_WORDS = (
+    "atendimento cliente sistema chamado protocolo suporte retorno acesso "
+    "configuração servidor relatório usuário senha cadastro nota fiscal"
+).split()
+
+
+def field_name(index):
+    return f"Campo {index}"
+
+
+def _conditional(rng, depth, index):
+    """Condicional com 'depth' níveis; o nível mais interno é a forma simples."""
+    condition = f"[checkbox]Cond {index}" if index % 2 else field_name(index)
+    if depth <= 1:
+        return f"${condition}?{rng.choice(_WORDS)}|{rng.choice(_WORDS)}$"
+    inner = _conditional(rng, depth - 1, index + 1)
+    return f"${condition}?{rng.choice(_WORDS)} {inner} ${field_name(index)}$|{rng.choice(_WORDS)}$"
+
+
+def _filler(rng, size):
+    words = []
+    total = 0
+    while total < size:
+        word = rng.choice(_WORDS)
+        words.append(word)
+        total += len(word) + 1
+    return " ".join(words)[:size]
+
+
+def make_template(fields=10, depth=1, size=1024, seed=0):
+    """
+    Monta um template com 'fields' campos distintos, condicionais com até
+    'depth' níveis de aninhamento e aproximadamente 'size' bytes.
+
+    Cerca de 1 a cada 5 placeholders é uma condicional; o restante são campos
+    simples, com alguns automáticos ($Hoje$, $Agora$) no meio.
+    """
+    rng = random.Random(seed)
+    pieces = []
+    for index in range(fields):
+        if index % 5 == 4:
+            pieces.append(_conditional(rng, depth, index))
+        elif index % 17 == 16:
+            pieces.append(rng.choice(("$Hoje$", "$Agora$", "$Agora[%d/%m %H:%M]$")))
+        else:
+            pieces.append(f"${field_name(index)}$")
+
+    used = sum(len(p.encode("utf-8")) for p in pieces)
+    gap = max(1, (size - used) // max(1, len(pieces)))
+    lines = []
+    for index, piece in enumerate(pieces):
+        text = _filler(rng, gap)
+        lines.append(f"{text} {piece}" if index % 3 else f"{piece}\n{text}")
+    return "\n".join(lines)
+
+
+def make_values(template_fields, seed=0, fill_ratio=0.8):
+    """Valores para os campos: a maioria preenchida, checkboxes com Sim/Não."""
+    rng = random.Random(seed)
+    values = {}
+    for name in template_fields:
+        if name.startswith("[checkbox]"):
+            values[name] = rng.choice(("Sim", "Não"))
+        elif rng.random() < fill_ratio:
+            values[name] = f"valor {rng.randint(0, 9999)}"
+        else:
+            values[name] = ""
+    return values
@@ -1,8 +1,7 @@
-import json
-import os
-from datetime import date, datetime
+from datetime import date
 import logging
 from logger_config import auto_log_functions
+from linxfast.core import ConfigStore
 
 # Get the module logger
 logger = logging.getLogger(__name__)
@@ -12,40 +11,21 @@ logger = logging.getLogger(__name__)
 class DailyPasswordManager:
     def __init__(self, file_path="config.json"):
         self.file_path = file_path
+        # Mesmo ConfigStore do app: escrita atômica e só da chave "daily_password"
+        self.config_store = ConfigStore(file_path)
         self.today = str(date.today())
         self.password = None
-        self._config_cache = None
         self._load_password()
 
     def _log(self, msg):
         logger.info(msg)
 
     def _read_config(self):
-        if self._config_cache is not None:
-            return self._config_cache
-
-        if not os.path.exists(self.file_path):
-            self._log(f"Arquivo de configuração '{self.file_path}' não encontrado. Criando novo.")
-            self._config_cache = {}
-            return self._config_cache
+        return self.config_store.load()
 
+    def _write_password(self, password):
         try:
-            with open(self.file_path, "r", encoding="utf-8") as f:
-                self._config_cache = json.load(f)
-                return self._config_cache
-        except json.JSONDecodeError:
-            self._log(f"Arquivo '{self.file_path}' está corrompido. Substituindo por um novo.")
-            self._config_cache = {}
-            return self._config_cache
-        except Exception as e:
-            self._log(f"Erro ao ler config: {e}")
-            self._config_cache = {}
-            return self._config_cache
-
-    def _write_config(self):
-        try:
-            with open(self.file_path, "w", encoding="utf-8") as f:
-                json.dump(self._config_cache, f, indent=4)
+            self.config_store.update(daily_password={"date": self.today, "password": password})
         except Exception as e:
             self._log(f"Erro ao salvar config: {e}")
 
@@ -57,24 +37,15 @@ class DailyPasswordManager:
             self.password = dp.get("password")
         else:
             # Atualiza somente se necessário
-            config["daily_password"] = {
-                "date": self.today,
-                "password": None
-            }
             self.password = None
-            self._write_config()
+            self._write_password(None)
 
     def get_today_password(self):
         return self.password
 
     def set_today_password(self, password):
-        config = self._read_config()
         self.password = password
-        config["daily_password"] = {
-            "date": self.today,
-            "password": password
-        }
-        self._write_config()
+        self._write_password(password)
 
     def reset_daily_password(self):
         self.set_today_password(None)
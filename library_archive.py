@@ -0,0 +1,67 @@
+"""
+Exporta ou importa a biblioteca de templates inteira num arquivo só.
+
+Exemplos:
+    python library_archive.py export biblioteca.jsonl.gz
+    python library_archive.py import biblioteca.jsonl.gz --on-conflict skip
+    python library_archive.py check biblioteca.jsonl.gz
+
+Leva os templates, o meta (favorito, protegido, nocodb_id) e a ordem dos
+campos (config.json). Na importação, templates com o mesmo nocodb_id são
+atualizados, os de mesmo conteúdo só recebem o meta e nomes já usados com
+outro conteúdo seguem --on-conflict. Feche o app antes de importar.
+"""
+
+import argparse
+import sys
+
+from linxfast.core import (
+    ConfigStore,
+    TemplateManager,
+    export_library,
+    import_library,
+    open_storage,
+    validate_archive,
+)
+from linxfast.core.archive import CONFLICT_POLICIES
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta/importa a biblioteca de templates.")
+    parser.add_argument("action", choices=("export", "import", "check"))
+    parser.add_argument("archive", help="Arquivo .jsonl (ou .jsonl.gz)")
+    parser.add_argument("--templates", default="templates", help="Diretório dos templates")
+    parser.add_argument("--config", default="config.json", help="Arquivo de configuração do app")
+    parser.add_argument("--on-conflict", choices=CONFLICT_POLICIES, default="rename",
+                        help="Mesmo nome com outro conteúdo (padrão: rename)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.action == "check":
+            count = validate_archive(args.archive)
+            print(f"{args.archive}: {count} templates, arquivo válido")
+            return 0
+        config_store = ConfigStore(args.config)
+        storage = open_storage(config_store.get("storage"), args.templates)
+        manager = TemplateManager(args.templates, storage=storage)
+        try:
+            if args.action == "export":
+                count = export_library(manager, args.archive, config_store)
+                print(f"{count} templates exportados para {args.archive}")
+            else:
+                result = import_library(manager, args.archive, config_store, args.on_conflict)
+                print(result)
+                for old, new in result.renamed:
+                    print(f"  renomeado: {old} -> {new}")
+            manager.meta.flush()
+            config_store.flush()
+        finally:
+            storage.close()
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
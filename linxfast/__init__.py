@@ -0,0 +1 @@
+"""Linx Fast: templates de atendimento."""
@@ -0,0 +1,105 @@
+"""
+Núcleo do Linx Fast, sem dependências de interface gráfica.
+
+Reúne o modelo de templates (scanner, compilador, engine de placeholders),
+o gerenciador de arquivos, os metadados e o acesso ao config.json. Pode ser
+importado por scripts e pelo modo em lote sem carregar customtkinter.
+"""
+
+from .scanner import (
+    FieldKind,
+    ScanError,
+    TemplateInfo,
+    build_info,
+    check,
+    extract_fields,
+    field_kind,
+    is_automatic_name,
+    tokenize,
+)
+from .compiler import (
+    CompiledTemplate,
+    RenderContext,
+    TemplateCompiler,
+    is_truthy,
+    parse,
+)
+from .engine import (
+    PlaceholderEngine,
+    placeholder_engine,
+    process_conditionals,
+    template_compiler,
+)
+from .atomic import CoalescingWriter, atomic_open, atomic_write, background_writer
+from .paths import user_cache_dir, user_data_dir
+from .storage import FileStorage, SQLiteStorage, migrate_to_sqlite, open_storage
+from .meta import TemplateMeta
+from .store import DEFAULT_CACHE_SIZE, TemplateChanges, TemplateStore
+from .search import SearchIndex
+from .indexes import CategoryTree, ContentIndex
+from .pack import LibraryPack, build_pack, write_pack
+from .parse_cache import ParseCache
+from .history import RevisionStore
+from .fuzzy import FuzzyMatcher
+from .manager import TemplateManager
+from .archive import ImportResult, export_library, import_library, validate_archive
+from .watcher import LibraryWatcher
+from .config import ConfigStore
+from .external import ExternalDataService, TTLCache, http_fetcher, sqlite_fetcher
+from .preview import LivePreview
+
+__all__ = [
+    "FieldKind",
+    "ScanError",
+    "TemplateInfo",
+    "build_info",
+    "check",
+    "extract_fields",
+    "field_kind",
+    "is_automatic_name",
+    "tokenize",
+    "CompiledTemplate",
+    "RenderContext",
+    "TemplateCompiler",
+    "is_truthy",
+    "parse",
+    "PlaceholderEngine",
+    "placeholder_engine",
+    "process_conditionals",
+    "template_compiler",
+    "CoalescingWriter",
+    "atomic_open",
+    "atomic_write",
+    "background_writer",
+    "user_cache_dir",
+    "user_data_dir",
+    "FileStorage",
+    "SQLiteStorage",
+    "migrate_to_sqlite",
+    "open_storage",
+    "TemplateMeta",
+    "DEFAULT_CACHE_SIZE",
+    "TemplateChanges",
+    "TemplateStore",
+    "SearchIndex",
+    "CategoryTree",
+    "ContentIndex",
+    "LibraryPack",
+    "build_pack",
+    "write_pack",
+    "ParseCache",
+    "RevisionStore",
+    "FuzzyMatcher",
+    "TemplateManager",
+    "ImportResult",
+    "export_library",
+    "import_library",
+    "validate_archive",
+    "LibraryWatcher",
+    "ConfigStore",
+    "ExternalDataService",
+    "TTLCache",
+    "http_fetcher",
+    "sqlite_fetcher",
+    "LivePreview",
+]
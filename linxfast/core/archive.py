@@ -0,0 +1,369 @@
+"""
+Exportação e importação da biblioteca inteira num arquivo só.
+
+Para levar a biblioteca para outra máquina sem copiar a pasta e juntar o
+meta.json e as ordens de campos do config.json à mão. O arquivo é JSONL
+(comprimido com gzip se o nome terminar em .gz), uma linha por registro:
+
+    {"format": "linxfast-library", "version": 1, "exported_at": "..."}
+    {"name": "Categoria / Nome", "content": "...", "hash": "...",
+     "meta": {...}, "field_order": [...]}
+    ...
+    {"end": true, "templates": N}
+
+Exportar e importar leem e gravam um template por vez, sem montar a
+biblioteca em memória. A importação passa duas vezes pelo arquivo: a
+primeira valida todas as linhas (em paralelo, em blocos) e a segunda aplica
+tudo dentro de TemplateManager.transaction(), então um arquivo com qualquer
+linha inválida ou truncado não altera nada. Conflitos são resolvidos como no
+importar_template, sem perguntar: mesmo nocodb_id atualiza o template local,
+mesmo conteúdo só junta o meta, e mesmo nome com outro conteúdo segue
+'on_conflict' ("rename", "overwrite" ou "skip").
+"""
+
+import datetime
+import json
+import logging
+import os
+
+from .atomic import atomic_open
+from .storage import content_hash, split_name
+
+# Get the module logger
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMAT = "linxfast-library"
+ARCHIVE_VERSION = 1
+VALIDATE_CHUNK = 256  # linhas validadas por bloco (limita a memória da 1ª passada)
+MAX_PROBLEMS = 10  # problemas listados na mensagem de erro
+CONFLICT_POLICIES = ("rename", "overwrite", "skip")
+
+_INVALID_CHARS = frozenset('<>:"\\|?*/') | frozenset(map(chr, range(32)))
+
+
+def _is_gzip(path):
+    return str(path).endswith(".gz")
+
+
+def _dumps(record):
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def export_library(manager, path, config_store=None):
+    """
+    Grava em 'path' (atômico) todos os templates do 'manager', com o meta e a
+    ordem dos campos (do config_store, se informado). Retorna quantos.
+    """
+    field_orders = config_store.get("field_orders", {}) if config_store else {}
+    names = sorted(manager.templates.index)
+    count = 0
+    with atomic_open(path, "wb") as raw:
+        out = raw
+        if _is_gzip(path):
+            import gzip
+
+            out = gzip.GzipFile(fileobj=raw, mode="wb", mtime=0)
+        out.write(_dumps({
+            "format": ARCHIVE_FORMAT,
+            "version": ARCHIVE_VERSION,
+            "exported_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        }))
+        for name in names:
+            # load(): sem passar pelo LRU, para não expulsar os templates em uso
+            content = manager.templates.load(name)
+            if content is None:
+                raise OSError(f"Não foi possível ler o template {name}")
+            record = {"name": name, "content": content, "hash": content_hash(content)}
+            entry = manager.meta._entry(name)
+            if entry:
+                record["meta"] = dict(entry)
+            order = field_orders.get(name)
+            if order:
+                record["field_order"] = list(order)
+            out.write(_dumps(record))
+            count += 1
+        out.write(_dumps({"end": True, "templates": count}))
+        if out is not raw:
+            out.close()
+    logger.info(f"Biblioteca exportada para {path}: {count} templates")
+    return count
+
+
+def _open_archive(path):
+    if _is_gzip(path):
+        import gzip
+
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def name_problem(name):
+    """Por que 'name' não pode virar um template (pasta/arquivo), ou None."""
+    if not isinstance(name, str) or not name.strip():
+        return "nome vazio"
+    category, title = split_name(name)
+    parts = [title] if category is None else [*category.split("/"), title]
+    for part in parts:
+        if not part.strip() or part.startswith(".") or part.endswith((".", " ")):
+            return f"nome inválido: {name!r}"
+        if not _INVALID_CHARS.isdisjoint(part):
+            return f"caractere inválido no nome: {name!r}"
+    return None
+
+
+def _check_line(item):
+    """
+    (linha, nome, problema, total) de uma linha do arquivo; no registro final,
+    nome None e o total de templates que ele declara.
+    """
+    number, line = item
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        return number, None, f"JSON inválido ({e})", None
+    if not isinstance(record, dict):
+        return number, None, "registro não é um objeto", None
+    if record.get("end") is True:
+        count = record.get("templates")
+        if not isinstance(count, int):
+            return number, None, "registro final sem contagem", None
+        return number, None, None, count
+    name = record.get("name")
+    problem = name_problem(name)
+    if problem:
+        return number, None, problem, None
+    content = record.get("content")
+    if not isinstance(content, str):
+        problem = "sem conteúdo"
+    elif record.get("hash") != content_hash(content):
+        problem = "hash não confere com o conteúdo"
+    elif not isinstance(record.get("meta", {}), dict):
+        problem = "meta não é um objeto"
+    else:
+        order = record.get("field_order", [])
+        if not isinstance(order, list) or not all(isinstance(f, str) for f in order):
+            problem = "field_order não é uma lista de nomes"
+    return number, name, problem, None
+
+
+def _chunks(lines, size):
+    chunk = []
+    for item in lines:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _read_header(f):
+    line = f.readline()
+    try:
+        header = json.loads(line) if line else None
+    except ValueError:
+        header = None
+    if not isinstance(header, dict) or header.get("format") != ARCHIVE_FORMAT:
+        raise ValueError("Não é um arquivo de biblioteca do Linx Fast")
+    if header.get("version") != ARCHIVE_VERSION:
+        raise ValueError(f"Versão de arquivo não suportada: {header.get('version')}")
+    return header
+
+
+def validate_archive(path, workers=None):
+    """
+    Confere o arquivo inteiro sem aplicar nada; ValueError com os problemas
+    encontrados. Retorna quantos templates ele tem.
+    """
+    # Importado só quando há um arquivo para validar (tempo de import do pacote)
+    from concurrent.futures import ThreadPoolExecutor
+
+    workers = workers or min(4, os.cpu_count() or 1)
+    problems = []
+    names = set()
+    records = 0
+    count = None
+    with _open_archive(path) as f, ThreadPoolExecutor(workers) as pool:
+        _read_header(f)
+        lines = ((number, line) for number, line in enumerate(f, start=2) if line.strip())
+        # Um bloco de cada vez (VALIDATE_CHUNK linhas por thread): a memória não cresce com o arquivo
+        for chunk in _chunks(lines, VALIDATE_CHUNK * workers):
+            checked = pool.map(_check_line, chunk, chunksize=VALIDATE_CHUNK)
+            for number, name, problem, declared in checked:
+                if count is not None:
+                    problems.append(f"linha {number}: registro depois do fim do arquivo")
+                    continue
+                if name is None and problem is None:
+                    count = records
+                    if declared != count:
+                        problems.append(f"registro final diz {declared} templates, há {count}")
+                    continue
+                records += 1
+                if problem:
+                    problems.append(f"linha {number}: {problem}")
+                elif name.lower() in names:
+                    problems.append(f"linha {number}: template repetido: {name}")
+                else:
+                    names.add(name.lower())
+    if count is None:
+        problems.append("arquivo incompleto (sem o registro final)")
+    if problems:
+        more = len(problems) - MAX_PROBLEMS
+        summary = "; ".join(problems[:MAX_PROBLEMS]) + (f"; e mais {more}" if more > 0 else "")
+        raise ValueError(f"Arquivo de biblioteca inválido: {summary}")
+    return count
+
+
+def _records(path):
+    with _open_archive(path) as f:
+        _read_header(f)
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("end") is True:
+                return
+            yield record
+
+
+class ImportResult:
+    """O que a importação fez com cada template do arquivo."""
+
+    __slots__ = ("added", "updated", "unchanged", "merged", "renamed", "skipped")
+
+    def __init__(self):
+        self.added = []  # nomes novos
+        self.updated = []  # templates locais com o conteúdo do arquivo (nocodb_id ou overwrite)
+        self.unchanged = []  # mesmo nocodb_id e mesmo conteúdo
+        self.merged = []  # (nome no arquivo, template local de mesmo conteúdo)
+        self.renamed = []  # (nome no arquivo, nome usado)
+        self.skipped = []  # nomes em conflito não importados
+
+    def __repr__(self):
+        return (
+            f"ImportResult({len(self.added)} novos, {len(self.updated)} atualizados, "
+            f"{len(self.unchanged)} sem mudança, {len(self.merged)} já existentes, "
+            f"{len(self.renamed)} renomeados, {len(self.skipped)} ignorados)"
+        )
+
+
+class _Importer:
+    """Aplica os registros, um por vez, sobre a biblioteca do manager."""
+
+    def __init__(self, manager, on_conflict, field_orders):
+        self.manager = manager
+        self.on_conflict = on_conflict
+        self.local_orders = field_orders
+        self.orders = {}  # ordens de campos a gravar no config.json
+        self.result = ImportResult()
+        # No Windows, "Nome" e "nome" são o mesmo arquivo
+        self.lowered = {name.lower(): name for name in manager.templates.index}
+
+    def _local_name(self, meta_key):
+        """Template da chave do meta ("Geral / Nome" é o template "Nome" da raiz)."""
+        if meta_key.startswith("Geral / "):
+            return self.lowered.get(meta_key[len("Geral / "):].lower())
+        return self.lowered.get(meta_key.lower())
+
+    def apply(self, record):
+        manager = self.manager
+        name, content = record["name"], record["content"]
+        meta = record.get("meta") or {}
+        nocodb_id = meta.get("nocodb_id")
+        if nocodb_id not in (None, "", "-1", -1):
+            local = next(
+                filter(None, map(self._local_name, manager.find_by_nocodb_id(nocodb_id))), None
+            )
+            if local is not None:
+                if manager.get_template(local) == content:
+                    self.result.unchanged.append(local)
+                else:
+                    manager.save_template(local, local, content)
+                    self.result.updated.append(local)
+                self._merge(local, record, replace_order=True)
+                manager.remove_nocodb_duplicates(nocodb_id, local)
+                return
+        same_content = manager.find_by_content(content)
+        if same_content:
+            local = sorted(same_content)[0]
+            self.result.merged.append((name, local))
+            self._merge(local, record)
+            return
+        existing = self.lowered.get(name.lower())
+        if existing is not None:
+            if self.on_conflict == "skip":
+                self.result.skipped.append(name)
+                return
+            if self.on_conflict == "overwrite":
+                manager.save_template(existing, existing, content)
+                self.result.updated.append(existing)
+                self._merge(existing, record, replace_order=True)
+                return
+            target = self._free_name(name)
+            self.result.renamed.append((name, target))
+        else:
+            target = name
+            self.result.added.append(name)
+        manager.add_template(target, content)
+        self.lowered[target.lower()] = target
+        self._merge(target, record, replace_order=True)
+
+    def _free_name(self, name):
+        candidate = f"{name} (importado)"
+        number = 2
+        while candidate.lower() in self.lowered:
+            candidate = f"{name} (importado {number})"
+            number += 1
+        return candidate
+
+    def _merge(self, local, record, replace_order=False):
+        """Junta o meta do arquivo ao do template local (sem perder o que já existe)."""
+        order = record.get("field_order")
+        if order and (replace_order or local not in self.local_orders):
+            self.orders[local] = order
+        incoming = record.get("meta")
+        if not incoming:
+            return
+        meta = self.manager.meta
+        key = meta._find_meta_key(local)
+        meta._ensure_entry(key)
+        entry = meta.meta[key]
+        for field, value in incoming.items():
+            if field in ("favorito", "protegido"):
+                if value and not entry.get(field):
+                    entry[field] = True
+            elif field == "nocodb_id":
+                if value not in (None, "") and not entry.get("nocodb_id"):
+                    entry["nocodb_id"] = str(value)
+            elif field not in entry:
+                entry[field] = value
+        meta._save()
+
+
+def import_library(manager, path, config_store=None, on_conflict="rename", workers=None):
+    """
+    Importa o arquivo de export_library() para a biblioteca do 'manager'.
+    Valida tudo antes (ValueError se inválido) e aplica numa transação.
+    Retorna um ImportResult.
+    """
+    if on_conflict not in CONFLICT_POLICIES:
+        raise ValueError(f"on_conflict deve ser um de {CONFLICT_POLICIES}")
+    count = validate_archive(path, workers)
+    field_orders = config_store.get("field_orders", {}) if config_store else {}
+    importer = _Importer(manager, on_conflict, field_orders)
+    try:
+        with manager.transaction():
+            for record in _records(path):
+                importer.apply(record)
+    except BaseException:
+        # No SQLite a transação voltou atrás: o meta em memória também volta
+        # (numa pasta de .txt o que já foi gravado fica, e o meta acompanha)
+        if manager.storage.kind == "sqlite":
+            manager.meta._load()
+        manager.load_templates()
+        raise
+    if config_store is not None:
+        config_store.set_field_orders(importer.orders)
+    manager.load_templates()
+    logger.info(f"Biblioteca importada de {path} ({count} templates): {importer.result}")
+    return importer.result
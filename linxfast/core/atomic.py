@@ -0,0 +1,134 @@
+"""
+Gravação segura de arquivos.
+
+atomic_write() grava num arquivo temporário na mesma pasta, faz fsync e
+troca pelo destino com os.replace: quem lê vê o arquivo antigo ou o novo,
+nunca um pela metade, mesmo se o app cair no meio.
+
+CoalescingWriter faz o mesmo numa thread própria e agrupa as gravações do
+mesmo arquivo que chegam numa janela curta (ex.: várias chaves do
+config.json numa ação da interface): só a última versão vai para o disco.
+Até lá, pending() devolve o conteúdo que ainda não foi gravado, para quem
+lê não ver a versão antiga.
+"""
+
+import atexit
+import contextlib
+import logging
+import os
+import threading
+import time
+
+# Get the module logger
+logger = logging.getLogger(__name__)
+
+COALESCE_DELAY = 0.25  # segundos
+
+
+def _fsync_dir(path):
+    # Garante que o rename chegou ao disco (no Windows não dá para abrir pastas)
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path, data, encoding="utf-8"):
+    """Grava 'data' (texto ou bytes) em 'path' via temporário + fsync + rename."""
+    with atomic_open(path, "wb" if isinstance(data, bytes) else "w", encoding) as f:
+        f.write(data)
+
+
+@contextlib.contextmanager
+def atomic_open(path, mode="w", encoding="utf-8"):
+    """
+    Como atomic_write, para gravar aos poucos (ex.: exportar a biblioteca):
+    o bloco escreve no temporário, que só substitui 'path' se terminar sem erro.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        if "b" in mode:
+            f = open(tmp_path, mode)
+        else:
+            f = open(tmp_path, mode, encoding=encoding)
+        with f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(directory)
+
+
+class CoalescingWriter:
+    """Grava arquivos com atomic_write numa thread, agrupando rajadas por arquivo."""
+
+    def __init__(self, delay=COALESCE_DELAY):
+        self.delay = delay
+        self._pending = {}  # caminho -> texto ainda não entregue à thread
+        self._inflight = {}  # caminho -> texto sendo gravado agora
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._thread = None
+        self.writes = 0  # gravações feitas (para medir o agrupamento)
+
+    def write(self, path, data):
+        """Agenda a gravação; chamadas seguidas para o mesmo arquivo viram uma só."""
+        path = os.path.abspath(path)
+        with self._cond:
+            self._pending[path] = data
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="linxfast-writer", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+
+    def pending(self, path):
+        """Conteúdo agendado e ainda não gravado em 'path', ou None."""
+        path = os.path.abspath(path)
+        with self._cond:
+            data = self._pending.get(path)
+            return data if data is not None else self._inflight.get(path)
+
+    def flush(self):
+        """Grava agora tudo o que está pendente (na thread de quem chamou)."""
+        with self._io_lock:
+            with self._cond:
+                batch, self._pending = self._pending, {}
+                self._inflight.update(batch)
+            for path, data in batch.items():
+                try:
+                    atomic_write(path, data)
+                    self.writes += 1
+                except OSError as e:
+                    logger.error(f"Erro ao gravar {path}: {e}")
+                finally:
+                    with self._cond:
+                        if self._inflight.get(path) is data:
+                            del self._inflight[path]
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            time.sleep(self.delay)  # janela de agrupamento
+            self.flush()
+
+
+# Instância usada pelo ConfigStore e pelo meta.json; o que faltar é gravado na saída
+background_writer = CoalescingWriter()
+atexit.register(background_writer.flush)
@@ -0,0 +1,295 @@
+import hashlib
+import datetime
+import logging
+from collections import OrderedDict
+from .scanner import (
+    tokenize,
+    TEXT,
+    FIELD,
+    AUTOMATIC,
+    COND_OPEN,
+    COND_ELSE,
+)
+
+# Get the module logger
+logger = logging.getLogger(__name__)
+
+
+# --- Nós da árvore compilada ---
+class Literal:
+    __slots__ = ("text",)
+
+    def __init__(self, text):
+        self.text = text
+
+
+class Field:
+    """Campo preenchido pelo usuário: $Nome$."""
+
+    __slots__ = ("name", "raw")
+
+    def __init__(self, name, raw):
+        self.name = name
+        self.raw = raw
+
+
+class Conditional:
+    """Condicional $Campo?Texto|Alternativa$; cada ramo é uma lista de nós."""
+
+    __slots__ = ("field", "if_true", "if_false", "raw")
+
+    def __init__(self, field, if_true, if_false, raw=""):
+        self.field = field
+        self.if_true = if_true
+        self.if_false = if_false
+        self.raw = raw
+
+
+class Automatic:
+    """Placeholder resolvido pela engine: $Agora$, $Agora[formato]$, $Hoje$..."""
+
+    __slots__ = ("name", "raw")
+
+    def __init__(self, name, raw):
+        self.name = name
+        self.raw = raw
+
+
+def is_truthy(field_name, value):
+    # Checkbox e switch só são verdadeiros com "Sim" (desligados valem "Não");
+    # demais campos, se preenchidos
+    if field_name.startswith(("[checkbox]", "[switch]")):
+        return value == "Sim"
+    return bool(value)
+
+
+def parse(content, handlers=()):
+    """Converte o texto do template em uma árvore de nós (ver scanner.py)."""
+    tokens, errors = tokenize(content, handlers)
+    for error in errors:
+        logger.debug(f"Template com erro de sintaxe: {error}")
+
+    root = []
+    current = root
+    stack = []
+    for token in tokens:
+        kind = token.kind
+        if kind is TEXT:
+            current.append(Literal(token.value))
+        elif kind is FIELD:
+            current.append(Field(token.value, content[token.start : token.end]))
+        elif kind is AUTOMATIC:
+            current.append(Automatic(token.value, content[token.start : token.end]))
+        elif kind is COND_OPEN:
+            node = Conditional(token.value, [], [])
+            current.append(node)
+            stack.append((node, current, token.start))
+            current = node.if_true
+        elif kind is COND_ELSE:
+            current = stack[-1][0].if_false
+        else:
+            node, current, start = stack.pop()
+            node.raw = content[start : token.end]
+            node.if_true = tuple(node.if_true)
+            node.if_false = tuple(node.if_false)
+    return root
+
+
+def nodes_from_rows(content, rows):
+    """
+    Mesma árvore de parse(), a partir de tokens já guardados como tuplas
+    (tipo, valor, início, fim) (parse_cache.py). Repete o laço de parse() em
+    vez de criar objetos Token, que custariam quase tanto quanto reanalisar.
+    """
+    root = []
+    current = root
+    stack = []
+    for kind, value, token_start, token_end in rows:
+        if kind is TEXT:
+            current.append(Literal(value))
+        elif kind is FIELD:
+            current.append(Field(value, content[token_start:token_end]))
+        elif kind is AUTOMATIC:
+            current.append(Automatic(value, content[token_start:token_end]))
+        elif kind is COND_OPEN:
+            node = Conditional(value, [], [])
+            current.append(node)
+            stack.append((node, current, token_start))
+            current = node.if_true
+        elif kind is COND_ELSE:
+            current = stack[-1][0].if_false
+        else:
+            node, current, start = stack.pop()
+            node.raw = content[start:token_end]
+            node.if_true = tuple(node.if_true)
+            node.if_false = tuple(node.if_false)
+    return root
+
+
+class RenderContext:
+    """
+    Estado de uma renderização: o horário é lido uma única vez.
+
+    Cada placeholder automático é resolvido no máximo uma vez e cada formato de
+    strftime é calculado uma vez, então todos os $Agora$, $Hoje$, $DiaSemana$...
+    do texto mostram o mesmo instante. Informe 'now' para fixar o horário
+    (modo em lote, benchmarks).
+    """
+
+    __slots__ = ("engine", "now", "field_values", "_formats", "_results")
+
+    def __init__(self, engine=None, now=None):
+        self.engine = engine
+        self.now = now if now is not None else datetime.datetime.now()
+        self.field_values = {}  # Valores da renderização atual (handlers externos)
+        self._formats = {}
+        self._results = {}
+
+    def strftime(self, fmt):
+        value = self._formats.get(fmt)
+        if value is None:
+            value = self._formats[fmt] = self.now.strftime(fmt)
+        return value
+
+    def resolve(self, name, raw):
+        """Valor do placeholder automático 'name'; 'raw' se não houver como resolver."""
+        if name in self._results:
+            return self._results[name]
+        if name == "Agora" or name.startswith("Agora["):
+            fmt = "%H:%M" if name == "Agora" else name[6:-1]
+            try:
+                value = self.strftime(fmt)
+            except Exception:
+                value = raw
+        else:
+            engine = self.engine
+            handler = engine.handlers.get(name) if engine else None
+            if not handler:
+                value = raw
+            elif name in getattr(engine, "context_handlers", ()):
+                value = handler(self)
+            else:
+                value = handler()
+            if value is None:
+                # Handler sem valor no momento (ex.: busca externa pendente)
+                value = raw
+        self._results[name] = value
+        return value
+
+
+def _render_nodes(nodes, field_values, append, resolve_automatic):
+    for node in nodes:
+        kind = node.__class__
+        if kind is Literal:
+            append(node.text)
+        elif kind is Field:
+            if node.name in field_values:
+                append(field_values[node.name] or "")
+            else:
+                append(node.raw)
+        elif kind is Conditional:
+            value = field_values.get(node.field, "")
+            branch = node.if_true if is_truthy(node.field, value) else node.if_false
+            _render_nodes(branch, field_values, append, resolve_automatic)
+        elif node.name in field_values:
+            # Valor digitado tem prioridade sobre o handler automático
+            append(field_values[node.name] or "")
+        else:
+            append(resolve_automatic(node.name, node.raw))
+
+
+def _render_conditionals(nodes, field_values, append):
+    for node in nodes:
+        if node.__class__ is Conditional:
+            value = field_values.get(node.field, "")
+            branch = node.if_true if is_truthy(node.field, value) else node.if_false
+            _render_conditionals(branch, field_values, append)
+        elif node.__class__ is Literal:
+            append(node.text)
+        else:
+            append(node.raw)
+
+
+class CompiledTemplate:
+    """Template já analisado; render() percorre os nós uma única vez."""
+
+    __slots__ = ("nodes", "engine")
+
+    def __init__(self, nodes, engine=None):
+        self.nodes = tuple(nodes)
+        self.engine = engine
+
+    def render(self, field_values, context=None):
+        if context is None:
+            context = RenderContext(self.engine)
+        context.field_values = field_values
+        out = []
+        _render_nodes(self.nodes, field_values, out.append, context.resolve)
+        return "".join(out)
+
+    def render_conditionals(self, field_values):
+        """Resolve só as condicionais; campos e automáticos ficam como no texto."""
+        out = []
+        _render_conditionals(self.nodes, field_values, out.append)
+        return "".join(out)
+
+    def render_automatic(self, context=None):
+        """Resolve só os placeholders automáticos (antigo PlaceholderEngine.process)."""
+        if context is None:
+            context = RenderContext(self.engine)
+        out = []
+        append = out.append
+        for node in self.nodes:
+            kind = node.__class__
+            if kind is Literal:
+                append(node.text)
+            elif kind is Automatic:
+                append(context.resolve(node.name, node.raw))
+            else:
+                append(node.raw)
+        return "".join(out)
+
+
+class TemplateCompiler:
+    """
+    Compila templates em árvores de nós e mantém um cache pelo hash do conteúdo.
+
+    O mesmo texto é analisado uma vez só; trocas de template e cópias seguintes
+    reaproveitam a árvore. O cache também considera a versão da engine, pois um
+    handler registrado depois muda a classificação dos placeholders.
+    """
+
+    def __init__(self, engine=None, max_entries=256):
+        self.engine = engine
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        # ParseCache (parse_cache.py) opcional: tokens guardados entre execuções
+        self.parse_cache = None
+
+    def _cache_key(self, content):
+        digest = hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+        return (digest, getattr(self.engine, "version", 0))
+
+    def compile(self, content):
+        key = self._cache_key(content)
+        compiled = self._cache.get(key)
+        if compiled is not None:
+            self._cache.move_to_end(key)
+            return compiled
+
+        handlers = self.engine.handlers if self.engine else ()
+        if self.parse_cache is not None:
+            nodes = self.parse_cache.nodes(content, handlers)
+        else:
+            nodes = parse(content, handlers)
+        compiled = CompiledTemplate(nodes, self.engine)
+        self._cache[key] = compiled
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return compiled
+
+    def render(self, content, field_values, context=None):
+        return self.compile(content).render(field_values, context)
+
+    def clear(self):
+        self._cache.clear()
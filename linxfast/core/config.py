@@ -0,0 +1,85 @@
+import os
+import json
+import logging
+from logger_config import auto_log_functions
+from .atomic import background_writer
+
+# Get the module logger
+logger = logging.getLogger(__name__)
+
+
+@auto_log_functions
+class ConfigStore:
+    """
+    Acesso ao config.json (geometria, tema, ordem dos campos...).
+
+    Cada escrita relê o arquivo e altera só as chaves informadas, para não
+    apagar o que outras partes do app (ex.: DailyPasswordManager) salvaram.
+    A gravação é atômica e feita em segundo plano (atomic.background_writer):
+    várias escritas seguidas viram uma só, e load() já vê o que está pendente.
+    """
+
+    def __init__(self, path="config.json"):
+        self.path = path
+
+    def load(self):
+        """Retorna o config inteiro; {} se o arquivo não existir ou estiver corrompido."""
+        pending = background_writer.pending(self.path)
+        if pending is not None:
+            return json.loads(pending)
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+            return config if isinstance(config, dict) else {}
+        except json.JSONDecodeError as e:
+            # Guarda uma cópia antes que a próxima escrita substitua o arquivo
+            backup = f"{self.path}.corrompido"
+            logger.error(f"{self.path} corrompido ({e}); cópia salva em {backup}")
+            try:
+                import shutil
+
+                shutil.copyfile(self.path, backup)
+            except OSError:
+                pass
+            return {}
+        except Exception as e:
+            logger.warning(f"Erro ao ler {self.path}: {e}")
+            return {}
+
+    def get(self, key, default=None):
+        return self.load().get(key, default)
+
+    def update(self, **values):
+        """Grava as chaves informadas mantendo o restante do arquivo."""
+        config = self.load()
+        config.update(values)
+        self._write(config)
+
+    def get_field_order(self, template_name):
+        return self.get("field_orders", {}).get(template_name)
+
+    def set_field_order(self, template_name, fields):
+        config = self.load()
+        field_orders = config.get("field_orders", {})
+        field_orders[template_name] = list(fields)
+        config["field_orders"] = field_orders
+        self._write(config)
+
+    def set_field_orders(self, orders):
+        """Várias ordens de campos de uma vez (uma leitura e uma gravação)."""
+        if not orders:
+            return
+        config = self.load()
+        field_orders = config.get("field_orders", {})
+        field_orders.update((name, list(fields)) for name, fields in orders.items())
+        config["field_orders"] = field_orders
+        self._write(config)
+
+    def _write(self, config):
+        background_writer.write(self.path, json.dumps(config, indent=4))
+
+    def flush(self):
+        """Grava já o que estiver pendente (ex.: ao fechar o app)."""
+        background_writer.flush()
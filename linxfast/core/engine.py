@@ -0,0 +1,87 @@
+import logging
+from .compiler import TemplateCompiler, CompiledTemplate, RenderContext, parse
+
+# Get the module logger
+logger = logging.getLogger(__name__)
+
+
+# --- PlaceholderEngine e instância global ---
+# Sem @auto_log_functions: os handlers padrões são registrados na importação, e o
+# log de cada chamada configuraria o logging raiz antes de setup_logging().
+class PlaceholderEngine:
+    """
+    Manages dynamic placeholder substitution in text templates.
+
+    Allows registration of custom handlers for placeholders and provides built-in support for date/time placeholders like $Agora$ and $Agora[formato]$.
+    """
+
+    def __init__(self):
+        self.handlers = {}
+        self.context_handlers = set()  # Handlers que recebem o RenderContext
+        self.version = 0  # Incrementa a cada handler registrado (invalida templates compilados)
+
+    def register_handler(self, name, func, takes_context=False):
+        """
+        Registra $name$. Com takes_context=True, func recebe o RenderContext e
+        deve usar context.now / context.strftime() em vez de datetime.now().
+        """
+        self.handlers[name] = func
+        if takes_context:
+            self.context_handlers.add(name)
+        else:
+            self.context_handlers.discard(name)
+        self.version += 1
+
+    def context(self, now=None):
+        return RenderContext(self, now)
+
+    def process(self, text, context=None):
+        # $Nome$ ou $Agora[...formato...]$ ou $Agora$ (mesmo scanner dos templates)
+        return CompiledTemplate(parse(text, self.handlers), self).render_automatic(
+            context
+        )
+
+
+# Instância global da engine
+placeholder_engine = PlaceholderEngine()
+# Handlers padrões
+placeholder_engine.register_handler(
+    "Hoje", lambda context: context.strftime("%d/%m/%Y"), takes_context=True
+)
+DIAS_SEMANA_PT = {
+    "Monday": "segunda-feira",
+    "Tuesday": "terça-feira",
+    "Wednesday": "quarta-feira",
+    "Thursday": "quinta-feira",
+    "Friday": "sexta-feira",
+    "Saturday": "sábado",
+    "Sunday": "domingo",
+}
+
+
+def _dia_semana(context):
+    weekday = context.strftime("%A")
+    return DIAS_SEMANA_PT.get(weekday, weekday)
+
+
+placeholder_engine.register_handler("DiaSemana", _dia_semana, takes_context=True)
+placeholder_engine.register_handler(
+    "HoraMinuto", lambda context: context.strftime("%H:%M"), takes_context=True
+)
+placeholder_engine.register_handler(
+    "HoraMinutoSegundo",
+    lambda context: context.strftime("%H:%M:%S"),
+    takes_context=True,
+)
+
+# Compilador global: cada template é analisado uma vez e renderizado em uma passada
+template_compiler = TemplateCompiler(placeholder_engine)
+
+
+def process_conditionals(template, field_values):
+    """
+    Resolve só as condicionais $Campo?Texto|Alternativa$ do template.
+
+    Campos e placeholders automáticos continuam no texto, como antes.
+    """
+    return template_compiler.compile(template).render_conditionals(field_values)
@@ -0,0 +1,249 @@
+"""
+Placeholders com dados externos (serviço HTTP local ou banco SQLite).
+
+A busca roda em threads, com timeout, enquanto o atendente preenche o
+formulário (prefetch). Na hora de copiar, o handler só consulta o cache: se o
+valor ainda não chegou, o placeholder fica como está no texto e a cópia não
+espera pela rede.
+
+Configuração no config.json (chave "external_handlers"):
+    {"name": "ClienteNome", "url": "http://127.0.0.1:8765/clientes/{CNPJ}",
+     "key": "nome", "fields": ["CNPJ"], "ttl": 600, "timeout": 2}
+    {"name": "ProximoProtocolo", "sqlite": "dados.db",
+     "query": "SELECT MAX(numero) + 1 FROM protocolos", "ttl": 30}
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Get the module logger
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+_FAILED = object()  # Marca uma busca que falhou (evita repetir a cada tecla)
+
+
+class TTLCache:
+    """Cache LRU em que cada entrada expira após 'ttl' segundos. Seguro entre threads."""
+
+    def __init__(self, max_entries=512, ttl=300.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._data = OrderedDict()  # chave -> (expira_em, valor)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            if item[0] <= self.clock():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return item[1]
+
+    def set(self, key, value, ttl=None):
+        expires = self.clock() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ExternalHandler:
+    """Placeholder externo: fetch(args, timeout) -> texto, com args vindos de 'fields'."""
+
+    __slots__ = ("name", "fetch", "fields", "ttl", "timeout")
+
+    def __init__(self, name, fetch, fields=(), ttl=300.0, timeout=2.0):
+        self.name = name
+        self.fetch = fetch
+        self.fields = tuple(fields)
+        self.ttl = ttl
+        self.timeout = timeout
+
+    def key(self, field_values):
+        """Chave do cache; None se faltar algum campo necessário."""
+        args = []
+        for field in self.fields:
+            value = str(field_values.get(field) or "").strip()
+            if not value:
+                return None
+            args.append(value)
+        return (self.name, tuple(args))
+
+
+def http_fetcher(url, key=None, fields=()):
+    """
+    Busca em um serviço HTTP local. A URL pode usar os campos, ex.: {CNPJ}.
+
+    Se a resposta for JSON e 'key' for informado (ex.: "cliente.nome"), retorna
+    esse valor; caso contrário, o corpo da resposta.
+    """
+
+    def fetch(args, timeout):
+        # Importado aqui para não pesar na importação do núcleo
+        import urllib.parse
+        import urllib.request
+
+        quoted = [urllib.parse.quote(a, safe="") for a in args]
+        target = url.format(*quoted, **dict(zip(fields, quoted)))
+        with urllib.request.urlopen(target, timeout=timeout) as r:
+            body = r.read().decode(r.headers.get_content_charset() or "utf-8")
+        if key is None:
+            return body.strip()
+        value = json.loads(body)
+        for part in key.split("."):
+            value = value[int(part)] if isinstance(value, list) else value[part]
+        return "" if value is None else str(value)
+
+    return fetch
+
+
+def sqlite_fetcher(path, query):
+    """Executa 'query' com os campos como parâmetros e retorna a 1ª coluna da 1ª linha."""
+
+    def fetch(args, timeout):
+        import sqlite3
+
+        connection = sqlite3.connect(path, timeout=timeout)
+        try:
+            row = connection.execute(query, args).fetchone()
+        finally:
+            connection.close()
+        return "" if not row or row[0] is None else str(row[0])
+
+    return fetch
+
+
+class ExternalDataService:
+    """
+    Registra handlers externos na engine e mantém seus resultados em cache.
+
+    prefetch() dispara as buscas em segundo plano; o handler registrado na
+    engine nunca bloqueia (a não ser que wait > 0) e retorna o valor em cache.
+    """
+
+    def __init__(self, engine, max_workers=4, max_entries=512, error_ttl=15.0,
+                 wait=0.0, clock=time.monotonic):
+        self.engine = engine
+        self.cache = TTLCache(max_entries, clock=clock)
+        self.error_ttl = error_ttl
+        self.wait = wait  # Segundos que o render aceita esperar por uma busca em andamento
+        self.max_workers = max_workers
+        self.handlers = {}
+        self._pending = {}  # chave -> Future
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def register(self, name, fetch, fields=(), ttl=300.0, timeout=2.0):
+        handler = ExternalHandler(name, fetch, fields, ttl, timeout)
+        self.handlers[name] = handler
+        self.engine.register_handler(
+            name, lambda context, h=handler: self._resolve(h, context), takes_context=True
+        )
+        return handler
+
+    def load_config(self, entries):
+        """Registra os handlers descritos em config.json; entradas inválidas são ignoradas."""
+        for entry in entries or ():
+            try:
+                name = entry["name"]
+                fields = tuple(entry.get("fields", ()))
+                if "url" in entry:
+                    fetch = http_fetcher(entry["url"], entry.get("key"), fields)
+                elif "sqlite" in entry:
+                    fetch = sqlite_fetcher(entry["sqlite"], entry["query"])
+                else:
+                    raise KeyError("url/sqlite")
+                self.register(
+                    name,
+                    fetch,
+                    fields,
+                    float(entry.get("ttl", 300)),
+                    float(entry.get("timeout", 2)),
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Handler externo inválido em config.json ({entry}): {e}")
+
+    def prefetch(self, field_values, names=None):
+        """Inicia em segundo plano as buscas que ainda não estão em cache."""
+        for name in names if names is not None else list(self.handlers):
+            handler = self.handlers.get(name)
+            if handler is None:
+                continue
+            key = handler.key(field_values)
+            if key is not None:
+                self._submit(handler, key)
+
+    def get(self, name, field_values, wait=None):
+        """Valor em cache (ou None); com wait, espera até esse tempo pela busca."""
+        handler = self.handlers[name]
+        key = handler.key(field_values)
+        if key is None:
+            return None
+        value = self.cache.get(key, _MISSING)
+        if value is _MISSING:
+            future = self._submit(handler, key)
+            wait = self.wait if wait is None else wait
+            if future is None or wait <= 0:
+                return None
+            try:
+                value = future.result(timeout=wait)
+            except Exception:
+                return None
+        return None if value is _FAILED else value
+
+    def _resolve(self, handler, context):
+        return self.get(handler.name, context.field_values)
+
+    def _submit(self, handler, key):
+        if self.cache.get(key, _MISSING) is not _MISSING:
+            return None
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            if self.cache.get(key, _MISSING) is not _MISSING:
+                return None
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="linxfast-external"
+                )
+            future = self._executor.submit(self._run, handler, key)
+            self._pending[key] = future
+        return future
+
+    def _run(self, handler, key):
+        try:
+            value = handler.fetch(key[1], handler.timeout)
+            self.cache.set(key, value, handler.ttl)
+            return value
+        except Exception as e:
+            logger.warning(f"Falha ao buscar ${handler.name}$ {key[1]}: {e}")
+            self.cache.set(key, _FAILED, self.error_ttl)
+            return _FAILED
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._pending.clear()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
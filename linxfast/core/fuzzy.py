@@ -0,0 +1,102 @@
+"""
+Casamento aproximado de nomes para o type-ahead dos seletores de template.
+
+A consulta casa se as letras aparecem na ordem, não necessariamente juntas
+("cnfsrv" acha "Configuração / Servidor"), sem acentos e sem diferenciar
+maiúsculas ("Conclusão" casa com "conclusao"). A pontuação favorece letras
+seguidas, inícios de palavra e trechos contíguos; favoritos ganham um bônus.
+"""
+
+import heapq
+import logging
+
+from .search import fold
+
+# Get the module logger
+logger = logging.getLogger(__name__)
+
+CONSECUTIVE_BONUS = 3
+WORD_START_BONUS = 2
+GAP_PENALTY = 1
+SUBSTRING_BONUS = 5
+PREFIX_BONUS = 5
+FAVORITE_BONUS = 8
+
+
+def subsequence_score(key, query, compact=None):
+    """
+    Pontuação de 'query' em 'key' (ambas com fold; 'compact' é 'key' sem
+    espaços, se já calculada), ou None se não casa.
+    """
+    score = 0
+    pos = prev = -1
+    find = key.find
+    for char in query:
+        pos = find(char, pos + 1)
+        if pos < 0:
+            return None
+        if pos == prev + 1:
+            score += CONSECUTIVE_BONUS
+        elif prev >= 0:
+            score -= GAP_PENALTY
+        if pos == 0 or key[pos - 1] == " ":
+            score += WORD_START_BONUS
+        prev = pos
+    if compact is None:
+        compact = key.replace(" ", "")
+    if query in compact:
+        score += SUBSTRING_BONUS
+        if compact.startswith(query):
+            score += PREFIX_BONUS
+    return score
+
+
+class FuzzyMatcher:
+    """
+    Chaves pré-calculadas (fold) de uma lista de nomes.
+
+    match() reaproveita os candidatos da consulta anterior quando a nova só
+    acrescenta letras: quem não casava com "conf" não casa com "confi", então
+    cada tecla testa cada vez menos nomes.
+    """
+
+    def __init__(self, names=(), favorites=()):
+        self.set_items(names, favorites)
+
+    def set_items(self, names, favorites=()):
+        favorites = set(favorites)
+        self._names = list(names)
+        self._keys = [fold(name) for name in self._names]
+        self._compact = [key.replace(" ", "") for key in self._keys]
+        self._boosts = [FAVORITE_BONUS if name in favorites else 0 for name in self._names]
+        self._last_query = ""
+        self._last_hits = range(len(self._names))
+
+    def __len__(self):
+        return len(self._names)
+
+    def match(self, query, limit=None):
+        """Nomes que casam com 'query', do melhor para o pior (vazia: todos, favoritos antes)."""
+        query = fold(query).replace(" ", "")
+        if not query:
+            order = sorted(range(len(self._names)), key=lambda i: -self._boosts[i])
+            return [self._names[i] for i in order[:limit]]
+
+        if self._last_query and query.startswith(self._last_query):
+            candidates = self._last_hits
+        else:
+            candidates = range(len(self._names))
+        keys, compact, boosts = self._keys, self._compact, self._boosts
+        hits = []
+        scored = []
+        for i in candidates:
+            score = subsequence_score(keys[i], query, compact[i])
+            if score is not None:
+                hits.append(i)
+                scored.append((-(score + boosts[i]), i))
+        self._last_query, self._last_hits = query, hits
+        if limit is None:
+            scored.sort()
+        else:
+            scored = heapq.nsmallest(limit, scored)
+        return [self._names[i] for _, i in scored]
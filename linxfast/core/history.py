@@ -0,0 +1,346 @@
+"""
+Histórico de revisões dos templates.
+
+Cada template tem um arquivo só de acréscimo (nome = hash do nome do
+template) na pasta de dados do usuário (paths.user_data_dir), fora da pasta
+de templates versionada e sincronizada. Cada revisão é o texto comprimido
+com zlib usando a revisão anterior como dicionário: o que repete da versão
+anterior vira referências curtas, então uma edição pequena custa poucos
+bytes. A cada SNAPSHOT_EVERY revisões vai uma cópia completa (sem
+dicionário), o que limita a cadeia a descomprimir para ler uma revisão.
+
+Layout do arquivo:
+    cabeçalho   MAGIC, versão, tamanho do nome, nome do template (UTF-8)
+    revisões    tipo (completa/delta), data (epoch), tamanho, dados zlib
+
+O histórico é limitado por quantidade (max_revisions) e idade (max_age):
+compact() reescreve o arquivo só com as revisões que ficam (a primeira vira
+completa); record() compacta sozinho quando o arquivo passa do dobro do
+limite, e compact_all() percorre todos (numa thread, na abertura do app),
+inclusive os de templates excluídos.
+"""
+
+import hashlib
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+
+from .atomic import atomic_write
+
+# Get the module logger
+logger = logging.getLogger(__name__)
+
+HISTORY_DIRNAME = "history"  # dentro da pasta de dados do usuário (paths.py)
+LEGACY_HISTORY_DIRNAME = ".history"  # antes ficava dentro da pasta de templates
+MAGIC = b"LFRV"
+VERSION = 1
+HEADER = struct.Struct("<4sBH")
+RECORD = struct.Struct("<BdI")  # tipo, data, tamanho dos dados
+FULL, DELTA = 0, 1
+
+MAX_REVISIONS = 50
+MAX_AGE = 90 * 24 * 3600  # segundos
+SNAPSHOT_EVERY = 16
+COMPRESS_LEVEL = 6
+
+
+def _compress(text, base=None):
+    data = text.encode("utf-8")
+    if base is None:
+        return zlib.compress(data, COMPRESS_LEVEL)
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zdict=base.encode("utf-8"))
+    return compressor.compress(data) + compressor.flush()
+
+
+def _decompress(data, base=None):
+    if base is None:
+        return zlib.decompress(data).decode("utf-8")
+    decompressor = zlib.decompressobj(zdict=base.encode("utf-8"))
+    return (decompressor.decompress(data) + decompressor.flush()).decode("utf-8")
+
+
+class _Log:
+    """Índice de um arquivo de histórico: (tipo, data, offset, tamanho) por revisão."""
+
+    __slots__ = ("records", "end", "last_text", "since_full")
+
+    def __init__(self):
+        self.records = []
+        self.end = 0  # fim da última revisão válida no arquivo
+        self.last_text = None  # texto da última revisão, quando já conhecido
+        self.since_full = 0  # revisões desde a última completa
+
+
+class RevisionStore:
+    """
+    Revisões de cada template, da mais antiga (0) para a mais recente.
+
+    Os métodos são seguros entre threads (compact_all pode rodar em segundo
+    plano enquanto a interface grava).
+    """
+
+    def __init__(self, directory, max_revisions=MAX_REVISIONS, max_age=MAX_AGE,
+                 snapshot_every=SNAPSHOT_EVERY):
+        self.directory = directory
+        self.max_revisions = max_revisions
+        self.max_age = max_age
+        self.snapshot_every = snapshot_every
+        self._logs = {}  # nome -> _Log
+        self._lock = threading.RLock()
+
+    def path(self, name):
+        digest = hashlib.blake2b(name.encode("utf-8"), digest_size=16).hexdigest()
+        return os.path.join(self.directory, f"{digest}.lfrev")
+
+    # --- leitura do arquivo ---
+
+    def _log(self, name):
+        log = self._logs.get(name)
+        if log is None:
+            log = self._logs[name] = self._read_index(self.path(name))
+        return log
+
+    @staticmethod
+    def _read_index(path):
+        log = _Log()
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return log
+        except OSError as e:
+            logger.warning(f"Erro ao ler histórico {path}: {e}")
+            return log
+        if len(data) < HEADER.size:
+            return log
+        magic, version, name_size = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            logger.warning(f"Histórico em formato desconhecido, ignorado: {path}")
+            return log
+        offset = HEADER.size + name_size
+        log.end = offset
+        # Uma gravação interrompida deixa uma revisão pela metade no fim; é descartada
+        while offset + RECORD.size <= len(data):
+            kind, stamp, size = RECORD.unpack_from(data, offset)
+            start = offset + RECORD.size
+            if start + size > len(data):
+                break
+            log.records.append((kind, stamp, start, size))
+            log.since_full = 0 if kind == FULL else log.since_full + 1
+            offset = log.end = start + size
+        return log
+
+    def _read_payloads(self, name, indexes):
+        with open(self.path(name), "rb") as f:
+            records = self._log(name).records
+            payloads = {}
+            for index in indexes:
+                _, _, start, size = records[index]
+                f.seek(start)
+                payloads[index] = f.read(size)
+            return payloads
+
+    def _texts(self, name, first, last):
+        """Textos das revisões first..last, descomprimindo a cadeia uma vez só."""
+        log = self._log(name)
+        # Volta até a última revisão completa e descomprime a cadeia para frente
+        start = first
+        while log.records[start][0] != FULL:
+            start -= 1
+        payloads = self._read_payloads(name, range(start, last + 1))
+        texts = []
+        text = None
+        for position in range(start, last + 1):
+            text = _decompress(payloads[position], text)
+            if position >= first:
+                texts.append(text)
+        if last == len(log.records) - 1:
+            log.last_text = text
+        return texts
+
+    def _text(self, name, index):
+        log = self._log(name)
+        if index == len(log.records) - 1 and log.last_text is not None:
+            return log.last_text
+        return self._texts(name, index, index)[0]
+
+    # --- consulta ---
+
+    def revisions(self, name):
+        """[(índice, data epoch)] das revisões de 'name', da mais antiga para a mais recente."""
+        with self._lock:
+            return [(index, record[1]) for index, record in enumerate(self._log(name).records)]
+
+    def get(self, name, index=-1):
+        """Texto da revisão 'index' (negativo conta do fim); IndexError se não existe."""
+        with self._lock:
+            count = len(self._log(name).records)
+            if index < 0:
+                index += count
+            if not 0 <= index < count:
+                raise IndexError(f"Revisão {index} de {name} não existe")
+            return self._text(name, index)
+
+    def latest(self, name):
+        """Texto da revisão mais recente, ou None sem histórico."""
+        with self._lock:
+            if not self._log(name).records:
+                return None
+            return self.get(name)
+
+    # --- gravação ---
+
+    def record(self, name, content, previous=None):
+        """
+        Acrescenta 'content' como nova revisão (se diferente da última).
+        'previous' é o texto que está sendo substituído: se o histórico não o
+        tem (primeira gravação, ou o arquivo foi editado por fora), entra antes.
+        """
+        with self._lock:
+            last = self.latest(name)
+            if previous is not None and previous != last and previous != content:
+                self._append(name, previous)
+                last = previous
+            if content != last:
+                self._append(name, content)
+            if len(self._log(name).records) > 2 * self.max_revisions:
+                self.compact(name)
+
+    def _append(self, name, content, stamp=None):
+        log = self._log(name)
+        path = self.path(name)
+        full = not log.records or log.since_full + 1 >= self.snapshot_every
+        base = None if full else self._text(name, len(log.records) - 1)
+        payload = _compress(content, base)
+        stamp = time.time() if stamp is None else stamp
+        record = RECORD.pack(FULL if full else DELTA, stamp, len(payload))
+        if not log.records:
+            os.makedirs(self.directory, exist_ok=True)
+            encoded = name.encode("utf-8")
+            prefix = HEADER.pack(MAGIC, VERSION, len(encoded)) + encoded
+            with open(path, "wb") as f:
+                f.write(prefix + record + payload)
+            log.end = len(prefix)
+        else:
+            # Anexa depois da última revisão válida (descarta restos de uma gravação interrompida)
+            with open(path, "r+b") as f:
+                f.seek(log.end)
+                f.write(record + payload)
+                f.truncate()
+        start = log.end + RECORD.size
+        log.records.append((FULL if full else DELTA, stamp, start, len(payload)))
+        log.end = start + len(payload)
+        log.since_full = 0 if full else log.since_full + 1
+        log.last_text = content
+
+    def rename(self, old_name, new_name):
+        """Leva o histórico junto quando o template muda de nome ou de pasta."""
+        with self._lock:
+            if old_name == new_name:
+                return
+            records = self._log(old_name).records
+            if not records:
+                self._logs.pop(old_name, None)
+                return
+            texts = self._texts(old_name, 0, len(records) - 1)
+            stamps = [record[1] for record in records]
+            self._logs.pop(old_name, None)
+            # O nome vai no cabeçalho: reescreve com o nome novo, após o que já houver no destino
+            for text, stamp in zip(texts, stamps):
+                if text != self.latest(new_name):
+                    self._append(new_name, text, stamp)
+            try:
+                os.remove(self.path(old_name))
+            except OSError:
+                pass
+
+    # --- limites ---
+
+    def compact(self, name, now=None):
+        """
+        Mantém as max_revisions mais recentes com menos de max_age (e sempre a
+        última); reescreve o arquivo com a primeira delas completa.
+        """
+        with self._lock:
+            log = self._log(name)
+            if not log.records:
+                return 0
+            now = time.time() if now is None else now
+            count = len(log.records)
+            keep_from = max(0, count - self.max_revisions)
+            while keep_from < count - 1 and now - log.records[keep_from][1] > self.max_age:
+                keep_from += 1
+            if keep_from == 0:
+                return 0
+            texts = self._texts(name, keep_from, count - 1)
+            kept = list(zip(texts, (record[1] for record in log.records[keep_from:])))
+            chunks = []
+            encoded = name.encode("utf-8")
+            chunks.append(HEADER.pack(MAGIC, VERSION, len(encoded)) + encoded)
+            new_log = _Log()
+            new_log.end = len(chunks[0])
+            previous = None
+            for position, (text, stamp) in enumerate(kept):
+                full = position == 0 or new_log.since_full + 1 >= self.snapshot_every
+                payload = _compress(text, None if full else previous)
+                chunks.append(RECORD.pack(FULL if full else DELTA, stamp, len(payload)) + payload)
+                start = new_log.end + RECORD.size
+                new_log.records.append((FULL if full else DELTA, stamp, start, len(payload)))
+                new_log.end = start + len(payload)
+                new_log.since_full = 0 if full else new_log.since_full + 1
+                previous = text
+            new_log.last_text = previous
+            atomic_write(self.path(name), b"".join(chunks))
+            self._logs[name] = new_log
+            return keep_from
+
+    def compact_all(self, existing=None, now=None):
+        """
+        Compacta todos os históricos (pensado para uma thread em segundo
+        plano). Com 'existing' (nomes da biblioteca), apaga o histórico de
+        templates excluídos cuja última revisão passou de max_age.
+        """
+        now = time.time() if now is None else now
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            if not entry.name.endswith(".lfrev"):
+                continue
+            name = self._name_in(entry.path)
+            if name is None:
+                continue
+            with self._lock:
+                cached = name in self._logs
+                if existing is not None and name not in existing:
+                    records = self._log(name).records
+                    if not records or now - records[-1][1] > self.max_age:
+                        self._logs.pop(name, None)
+                        try:
+                            os.remove(entry.path)
+                        except OSError as e:
+                            logger.warning(f"Erro ao remover histórico {entry.path}: {e}")
+                        continue
+                try:
+                    self.compact(name, now)
+                except (OSError, zlib.error) as e:
+                    logger.warning(f"Erro ao compactar histórico de {name}: {e}")
+                if not cached:
+                    # Só passou por aqui: não precisa ficar com o índice em memória
+                    self._logs.pop(name, None)
+
+    @staticmethod
+    def _name_in(path):
+        try:
+            with open(path, "rb") as f:
+                header = f.read(HEADER.size)
+                magic, version, name_size = HEADER.unpack(header)
+                if magic != MAGIC or version != VERSION:
+                    return None
+                return f.read(name_size).decode("utf-8")
+        except (OSError, struct.error, UnicodeDecodeError):
+            return None
@@ -0,0 +1,131 @@
+"""
+Índices secundários da biblioteca, mantidos pelo TemplateManager.
+
+CategoryTree conta os templates por pasta (inclusive as pastas-pai, para
+"A/B" contar em "A"): o seletor de pasta da importação lê daí em vez de
+percorrer a pasta de templates. ContentIndex agrupa os templates pelo hash
+do conteúdo (BLAKE2, o mesmo do SQLite) para achar cópias de um texto sem
+ler e comparar todos; o hash de cada template é calculado na primeira busca
+e refeito só quando ele muda. O índice por nocodb_id fica no próprio meta
+(MetaEntries.by_nocodb).
+"""
+
+import logging
+
+from .storage import content_hash, split_name
+
+# Get the module logger
+logger = logging.getLogger(__name__)
+
+ROOT_CATEGORY = "Geral"
+
+
+class CategoryTree:
+    """Pasta -> quantidade de templates (dela e das subpastas)."""
+
+    def __init__(self, names=()):
+        self._names = set()
+        self._counts = {}
+        self.reset(names)
+
+    @staticmethod
+    def _paths(name):
+        category = split_name(name)[0] or ROOT_CATEGORY
+        parts = category.split("/")
+        return ["/".join(parts[: i + 1]) for i in range(len(parts))]
+
+    def reset(self, names):
+        self._names = set()
+        self._counts = {}
+        for name in names:
+            self.add(name)
+
+    def add(self, name):
+        if name in self._names:
+            return
+        self._names.add(name)
+        for path in self._paths(name):
+            self._counts[path] = self._counts.get(path, 0) + 1
+
+    def remove(self, name):
+        if name not in self._names:
+            return
+        self._names.discard(name)
+        for path in self._paths(name):
+            count = self._counts.get(path, 0) - 1
+            if count > 0:
+                self._counts[path] = count
+            else:
+                self._counts.pop(path, None)
+
+    def rename(self, old_name, new_name):
+        self.remove(old_name)
+        self.add(new_name)
+
+    def update(self, added=(), removed=()):
+        """Aplica um TemplateChanges (added/removed) do scan."""
+        for name in removed:
+            self.remove(name)
+        for name in added:
+            self.add(name)
+
+    def categories(self):
+        """Pastas com algum template, em ordem; "Geral" sempre aparece."""
+        return sorted(self._counts.keys() | {ROOT_CATEGORY})
+
+    def counts(self):
+        return dict(self._counts)
+
+
+class ContentIndex:
+    """Hash do conteúdo -> nomes; 'digest(nome)' calcula o hash de quem ainda não tem."""
+
+    def __init__(self, digest):
+        self._digest = digest
+        self._by_digest = {}  # hash -> {nomes}
+        self._digest_of = {}  # nome -> hash
+        self._stale = set()  # nomes sem hash (novos ou alterados)
+
+    def _unlink(self, name):
+        digest = self._digest_of.pop(name, None)
+        if digest is not None:
+            names = self._by_digest[digest]
+            names.discard(name)
+            if not names:
+                del self._by_digest[digest]
+
+    def _link(self, name, digest):
+        self._digest_of[name] = digest
+        self._by_digest.setdefault(digest, set()).add(name)
+
+    def set(self, name, content):
+        """Registra o conteúdo recém-gravado de 'name'."""
+        self._unlink(name)
+        self._stale.discard(name)
+        self._link(name, content_hash(content))
+
+    def remove(self, name):
+        self._unlink(name)
+        self._stale.discard(name)
+
+    def mark_stale(self, names):
+        """Nomes cujo conteúdo mudou fora do manager; o hash é refeito na próxima busca."""
+        for name in names:
+            self._unlink(name)
+            self._stale.add(name)
+
+    def _refresh(self):
+        stale, self._stale = self._stale, set()
+        for name in stale:
+            try:
+                digest = self._digest(name)
+            except Exception as e:
+                logger.warning(f"Erro ao calcular o hash de {name}: {e}")
+                continue
+            if digest is not None:
+                self._link(name, digest)
+
+    def find(self, content):
+        """Nomes com exatamente esse conteúdo, em ordem alfabética."""
+        self._refresh()
+        return sorted(self._by_digest.get(content_hash(content), ()))
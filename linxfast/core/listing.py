@@ -0,0 +1,147 @@
+"""
+Lista ordenada dos templates para os seletores, mantida em cache.
+
+A ordem é a de TemplateMeta.get_sorted_templates (favoritos de "Geral",
+favoritos, "Geral", resto; depois o nome sem diferenciar maiúsculas). Em vez
+de reordenar e redecorar tudo a cada chamada, TemplateListing guarda a lista
+pronta (nomes, nomes de exibição com ⭐/🔒 e o caminho de volta para o nome
+real) e só mexe no que mudou: templates criados, removidos ou renomeados
+entram e saem por bisect, e quando o meta muda (TemplateMeta.version) só os
+templates cujo favorito/protegido mudou trocam de posição.
+"""
+
+import bisect
+import logging
+
+# Get the module logger
+logger = logging.getLogger(__name__)
+
+# Acima disso, refazer a lista inteira sai mais barato que inserir um a um
+REBUILD_FRACTION = 0.25
+
+
+class TemplateListing:
+    """Nomes ordenados + nomes de exibição, com 'version' incrementada a cada mudança."""
+
+    def __init__(self, meta, names=()):
+        self.meta = meta
+        self.version = 0
+        self._keys = []  # chaves de ordenação, em ordem
+        self._names = []  # mesma ordem de _keys
+        self._display = []  # idem, com ⭐/🔒
+        self._key_of = {}  # nome -> chave de ordenação
+        self._flags = {}  # nome -> (favorito, protegido)
+        self._real = {}  # nome de exibição -> nome
+        self._meta_version = meta.version
+        self.reset(names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        return name in self._key_of
+
+    # --- ordem e decoração ---
+
+    def _flags_for(self, name):
+        entry = self.meta._entry(name)
+        favorite = bool(entry.get("favorito"))
+        return (favorite, bool(entry.get("protegido")) and not favorite)
+
+    @staticmethod
+    def _sort_key(name, favorite):
+        is_geral = name.split(" / ")[0] == "Geral" if " / " in name else True
+        rank = 0 if favorite and is_geral else 1 if favorite else 2 if is_geral else 3
+        return (rank, name.lower(), name)
+
+    @staticmethod
+    def _display_name(name, flags):
+        if flags[0]:
+            return f"⭐ {name}"
+        if flags[1]:
+            return f"🔒 {name}"
+        return name
+
+    # --- alterações ---
+
+    def reset(self, names):
+        """Refaz a lista inteira (carga inicial ou muitas mudanças de uma vez)."""
+        flags = {name: self._flags_for(name) for name in names}
+        keys = sorted(self._sort_key(name, flag[0]) for name, flag in flags.items())
+        self._keys = keys
+        self._names = [key[2] for key in keys]
+        self._display = [self._display_name(name, flags[name]) for name in self._names]
+        self._key_of = {key[2]: key for key in keys}
+        self._flags = flags
+        self._real = dict(zip(self._display, self._names))
+        self._meta_version = self.meta.version
+        self.version += 1
+
+    def add(self, name):
+        if name in self._key_of:
+            return
+        flags = self._flags_for(name)
+        key = self._sort_key(name, flags[0])
+        index = bisect.bisect_left(self._keys, key)
+        display = self._display_name(name, flags)
+        self._keys.insert(index, key)
+        self._names.insert(index, name)
+        self._display.insert(index, display)
+        self._key_of[name] = key
+        self._flags[name] = flags
+        self._real[display] = name
+        self.version += 1
+
+    def remove(self, name):
+        key = self._key_of.pop(name, None)
+        if key is None:
+            return
+        index = bisect.bisect_left(self._keys, key)
+        del self._keys[index]
+        del self._names[index]
+        display = self._display.pop(index)
+        self._real.pop(display, None)
+        del self._flags[name]
+        self.version += 1
+
+    def rename(self, old_name, new_name):
+        self.remove(old_name)
+        self.add(new_name)
+
+    def update(self, added=(), removed=()):
+        """Aplica um TemplateChanges (added/removed) do scan."""
+        if not added and not removed:
+            return
+        if len(added) + len(removed) > REBUILD_FRACTION * max(len(self._names), 1):
+            self.reset((set(self._names) - set(removed)) | set(added))
+            return
+        for name in removed:
+            self.remove(name)
+        for name in added:
+            self.add(name)
+
+    def _sync_meta(self):
+        """Reposiciona só os templates cujo favorito/protegido mudou desde a última vez."""
+        if self._meta_version == self.meta.version:
+            return
+        self._meta_version = self.meta.version
+        changed = [name for name, flags in self._flags.items() if self._flags_for(name) != flags]
+        for name in changed:
+            self.remove(name)
+            self.add(name)
+
+    # --- leitura ---
+
+    def names(self):
+        self._sync_meta()
+        return list(self._names)
+
+    def display_names(self):
+        self._sync_meta()
+        return list(self._display)
+
+    def real_name(self, display_name):
+        """Nome do template para um nome de exibição (ou o próprio texto, se não for um)."""
+        self._sync_meta()
+        name = self._real.get(display_name)
+        return name if name is not None else self.meta.get_real_name(display_name)
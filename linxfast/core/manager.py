@@ -0,0 +1,502 @@
+import contextlib
+import datetime
+import os
+import logging
+import threading
+import zlib
+from .history import HISTORY_DIRNAME, LEGACY_HISTORY_DIRNAME, RevisionStore
+from .indexes import CategoryTree, ContentIndex
+from .listing import TemplateListing
+from .meta import TemplateMeta
+from .atomic import atomic_write
+from .pack import LibraryPack, build_pack
+from .paths import move_legacy_dir, remove_legacy, user_cache_dir, user_data_dir
+from .parse_cache import LEGACY_PARSE_CACHE_FILENAME, PARSE_CACHE_FILENAME, ParseCache
+from .storage import FileStorage, split_name
+from .scanner import extract_fields, build_info, EMPTY_INFO
+from .search import SearchIndex
+from .store import DEFAULT_CACHE_SIZE, TemplateChanges, TemplateStore
+from logger_config import auto_log_functions, no_auto_log
+
+# Get the module logger
+logger = logging.getLogger(__name__)
+
+
+@auto_log_functions
+class TemplateManager:
+    def __init__(self, template_dir="templates", automatic_names=(), cache_size=DEFAULT_CACHE_SIZE,
+                 storage=None, cache_dir=None, data_dir=None):
+        logger.info(f"Iniciando Template Manager com diretório: {template_dir}")
+        self.template_dir = os.path.abspath(template_dir)
+        # Caches desta máquina, fora da pasta de templates (paths.py)
+        self.cache_dir = cache_dir or user_cache_dir(self.template_dir)
+        self.data_dir = data_dir or user_data_dir(self.template_dir)
+        # Backend (storage.py): pasta de .txt por padrão, ou SQLite
+        self.storage = storage or FileStorage(self.template_dir, self.cache_dir)
+        # {"Categoria / Nome": conteúdo}, lido do backend no primeiro acesso
+        self.templates = TemplateStore(self.storage, cache_size)
+        # Pack da pasta (só FileStorage): conteúdo, hash e placeholders sem abrir os .txt
+        self.pack_path = getattr(self.storage, "pack_path", None)
+        if self.pack_path:
+            self.templates.pack = LibraryPack.open(self.pack_path)
+        self._pack_thread = None  # thread do prepare_pack(background=True)
+        # Nomes resolvidos automaticamente (handlers do PlaceholderEngine)
+        self.automatic_names = automatic_names
+        self._infos = {}  # {"Categoria / Nome": TemplateInfo}
+        self._listeners = []  # callbacks(TemplateChanges) das janelas abertas
+        # Busca por nome/categoria/conteúdo; o corpo é indexado sob demanda
+        self.search_index = SearchIndex()
+        self.meta = TemplateMeta(self.template_dir, storage=self.storage)
+        # Nomes ordenados/decorados para os seletores, atualizados só no que muda
+        self.listing = TemplateListing(self.meta)
+        # Tokens dos templates já analisados em execuções anteriores (pelo hash do
+        # conteúdo), na pasta de cache; versões anteriores gravavam na de templates
+        remove_legacy(os.path.join(self.template_dir, LEGACY_PARSE_CACHE_FILENAME))
+        self.parse_cache = ParseCache(os.path.join(self.cache_dir, PARSE_CACHE_FILENAME))
+        # Revisões anteriores de cada template (save_template não perde o texto antigo)
+        # Fica na pasta de dados do usuário, fora da pasta versionada/sincronizada
+        history_dir = os.path.join(self.data_dir, HISTORY_DIRNAME)
+        move_legacy_dir(os.path.join(self.template_dir, LEGACY_HISTORY_DIRNAME), history_dir)
+        self.history = RevisionStore(history_dir)
+        # Pastas e hash do conteúdo, para a importação não varrer a biblioteca
+        self.categories = CategoryTree()
+        self.content_index = ContentIndex(self._digest)
+        self.load_templates()
+
+    def _split_name(self, full_name):
+        # Não há mais tratamento especial para pasta raiz
+        return split_name(full_name)
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        Agrupa operações em lote: uma transação no SQLite e, nos dois backends,
+        uma única gravação do meta no fim do bloco.
+        """
+        with self.storage.transaction(), self.meta.batch():
+            yield
+
+    # Sem log por chamada: o retorno (a lista inteira) iria para o fast.log a cada uso
+
+    @no_auto_log
+    def get_template_names(self):
+        return self.listing.names()
+
+    @no_auto_log
+    def get_display_names(self):
+        return self.listing.display_names()
+
+    @no_auto_log
+    def get_real_name(self, display_name):
+        """Nome do template a partir do que o seletor mostra (com ⭐/🔒)."""
+        return self.listing.real_name(display_name)
+
+    def find_by_nocodb_id(self, nocodb_id):
+        """Nomes (chaves do meta) dos templates importados com esse id do NocoDB."""
+        return self.meta.meta.with_nocodb_id(nocodb_id)
+
+    def find_by_content(self, content):
+        """Nomes dos templates com exatamente esse conteúdo."""
+        return self.content_index.find(content)
+
+    def remove_nocodb_duplicates(self, nocodb_id, keep):
+        """Tira o nocodb_id (a entrada do meta) de todos os templates menos 'keep'."""
+        keep_key = self.meta._find_meta_key(keep)
+        for name in self.find_by_nocodb_id(nocodb_id):
+            if name != keep and name != keep_key:
+                self.meta.remove_meta(name)
+
+    def get_categories(self):
+        """Pastas com templates (e as pastas-pai), em ordem; inclui sempre "Geral"."""
+        return self.categories.categories()
+
+    def category_counts(self):
+        """Pasta -> quantidade de templates, contando as subpastas."""
+        return self.categories.counts()
+
+    def get_template(self, full_name, fresh=False):
+        """Conteúdo do template; fresh=True relê do backend ignorando o cache."""
+        if fresh and full_name in self.templates:
+            self.templates.forget(full_name)
+        return self.templates.get(full_name, "")
+
+    def template_exists(self, full_name):
+        """Se o template existe no backend agora (não só no índice)."""
+        return self.storage.exists(full_name)
+
+    def template_times(self, full_name):
+        """(criação, modificação) como datetime; None se não disponível."""
+        return tuple(
+            datetime.datetime.fromtimestamp(t) if t is not None else None
+            for t in self.storage.times(full_name)
+        )
+
+    def get_template_info(self, full_name):
+        """Índice de placeholders do template (pré-calculado ao carregar/salvar)."""
+        info = self._infos.get(full_name)
+        if info is None:
+            pack = self.templates.pack
+            if pack is not None:
+                info = pack.info(
+                    full_name, self.templates.index.get(full_name), self.automatic_names
+                )
+            if info is None:
+                content = self.templates.get(full_name)
+                if not content:
+                    return EMPTY_INFO
+                info = self.parse_cache.info(content, self.automatic_names)
+            self._infos[full_name] = info
+        return info
+
+    def analyze(self, content):
+        """Índice de placeholders de um conteúdo qualquer (ex.: texto ainda não salvo)."""
+        return build_info(content, self.automatic_names)
+
+    def search(self, query, k=50, budget=0.05):
+        """
+        Nomes dos templates que melhor casam com 'query' (BM25 sobre trigramas
+        de nome, categoria e conteúdo). Antes da busca, indexa o conteúdo
+        pendente por até 'budget' segundos; o que faltar casa só pelo nome.
+        """
+        self.search_index.refresh(self.templates.load, budget)
+        return [name for name, _ in self.search_index.search(query, k)]
+
+    def warm_search_index(self, budget=0.02):
+        """Indexa mais um pouco do conteúdo pendente; retorna quantos faltam."""
+        return self.search_index.refresh(self.templates.load, budget)
+
+    def cache_stats(self):
+        """Acertos/faltas e ocupação do cache de conteúdo dos templates."""
+        return self.templates.stats()
+
+    def _digest(self, full_name):
+        pack = self.templates.pack
+        if pack is not None:
+            digest = pack.digest(full_name, self.templates.index.get(full_name))
+            if digest is not None:
+                return digest
+        return self.storage.digest(full_name)
+
+    @property
+    def prepared_pack_path(self):
+        return f"{self.pack_path}.next" if self.pack_path else None
+
+    @no_auto_log
+    def _pack_items(self, index, sources, max_reads=None):
+        """
+        (nome, assinatura, conteúdo, TemplateInfo) de cada template de 'index'
+        para build_pack. O que ainda bate com algum pack de 'sources' sai dele;
+        o resto é lido do backend, um arquivo por template. Retorna None se
+        precisar ler mais que max_reads templates do backend.
+
+        Pode rodar fora da thread da interface: não usa o cache de conteúdo
+        nem o de análise, só lê os packs e o backend.
+        """
+        items = []
+        reads = 0
+        for name, signature in sorted(index.items()):
+            if signature is None:
+                continue
+            content = info = None
+            for pack in sources:
+                content = pack.content(name, signature)
+                if content is not None:
+                    info = pack.info(name, signature, self.automatic_names)
+                    break
+            if content is None:
+                reads += 1
+                if max_reads is not None and reads > max_reads:
+                    return None
+                try:
+                    content = self.storage.read(name)
+                except Exception as e:
+                    logger.warning(f"Erro ao ler template {name} para o pack: {e}")
+                    continue
+            if info is None:
+                info = self._infos.get(name) or build_info(content, self.automatic_names)
+            items.append((name, signature, content, info))
+        return items
+
+    def prepare_pack(self, background=False):
+        """
+        Monta o pack da biblioteca atual em prepared_pack_path, sem trocar o
+        pack aberto (no Windows não dá para substituir um arquivo mapeado).
+        É a parte cara de save_pack: lê do backend todo template que o pack
+        aberto não tem. Feito aqui, o save_pack ao fechar o app só troca o
+        arquivo ou remonta o que mudou depois. Com background=True roda numa
+        thread e retorna a thread.
+        """
+        if not self.pack_path:
+            return None
+        index = dict(self.templates.index)
+        old = self.templates.pack
+        if old is not None and old.matches(index):
+            return None
+
+        def run():
+            items = self._pack_items(index, [old] if old is not None else [])
+            try:
+                os.makedirs(os.path.dirname(self.pack_path), exist_ok=True)
+                atomic_write(self.prepared_pack_path, build_pack(items, self.automatic_names))
+            except OSError as e:
+                logger.error(f"Erro ao gravar o pack da biblioteca: {e}")
+                return
+            logger.info(f"Pack da biblioteca preparado: {len(items)} templates")
+
+        if not background:
+            run()
+            return None
+        self._pack_thread = threading.Thread(target=run, name="linxfast-pack", daemon=True)
+        self._pack_thread.start()
+        return self._pack_thread
+
+    def save_pack(self, max_reads=None):
+        """
+        Grava o pack se a biblioteca mudou desde que foi gerado (chamado ao
+        fechar o app, na thread da interface). Se o pack do prepare_pack bate
+        com a biblioteca, só troca o arquivo. Senão remonta a partir dele e do
+        pack aberto, lendo do backend o resto; montar custa cerca de 0,1 ms
+        por template (benchmarks/pack.py) mais as leituras. Com max_reads,
+        desiste em vez de ler mais que isso do backend (o pack fica para o
+        prepare_pack da próxima abertura). Também desiste enquanto a thread
+        do prepare_pack estiver rodando, pois ela lê do pack aberto.
+        Retorna True se gravou.
+        """
+        if not self.pack_path:
+            return False
+        if self._pack_thread is not None and self._pack_thread.is_alive():
+            logger.info("Pack da biblioteca ainda sendo preparado; fica para a próxima abertura")
+            return False
+        old = self.templates.pack
+        index = self.templates.index
+        prepared = LibraryPack.open(self.prepared_pack_path)
+        data = None
+        try:
+            if old is not None and old.matches(index):
+                return False
+            if prepared is None or not prepared.matches(index):
+                sources = [pack for pack in (prepared, old) if pack is not None]
+                items = self._pack_items(index, sources, max_reads)
+                if items is None:
+                    logger.info("Pack da biblioteca desatualizado demais para montar ao fechar")
+                    return False
+                data = build_pack(items, self.automatic_names)
+        finally:
+            if prepared is not None:
+                prepared.close()
+        # No Windows não dá para substituir um arquivo mapeado
+        self.templates.pack = None
+        if old is not None:
+            old.close()
+        try:
+            if data is None:
+                os.replace(self.prepared_pack_path, self.pack_path)
+            else:
+                os.makedirs(os.path.dirname(self.pack_path), exist_ok=True)
+                atomic_write(self.pack_path, data)
+        except OSError as e:
+            logger.error(f"Erro ao gravar o pack da biblioteca: {e}")
+            return False
+        finally:
+            self.templates.pack = LibraryPack.open(self.pack_path)
+        if data is not None and os.path.exists(self.prepared_pack_path):
+            try:
+                os.remove(self.prepared_pack_path)
+            except OSError:
+                pass
+        logger.info(f"Pack da biblioteca gravado: {len(index)} templates")
+        return True
+
+    def _update_info(self, full_name, content, previous=None):
+        # Só reanalisa se o conteúdo mudou
+        if previous is not None and previous[0] == content:
+            self._infos[full_name] = previous[1]
+        else:
+            self._infos[full_name] = self.parse_cache.info(content, self.automatic_names)
+
+    def save_template(self, old_name, new_name, content):
+        logger.info(f"Salvando template. Old: {old_name}, New: {new_name}")
+        previous = None
+        old_content = None
+        if old_name in self.templates:
+            old_content = self.templates.get(old_name)
+            if old_name in self._infos:
+                previous = (old_content, self._infos[old_name])
+        if old_name != new_name and old_name in self.templates:
+            self.storage.delete(old_name)
+            self.templates.remove(old_name)
+            self.search_index.remove(old_name)
+            self.content_index.remove(old_name)
+            self._infos.pop(old_name, None)
+            # Copia todos os campos do meta antigo para o novo nome, mantendo a id e outros dados
+            # Garante que não fique duplicado no meta.json ao mover de pasta
+            old_meta_key = self.meta._find_meta_key(old_name)
+            new_meta_key = self.meta._canonical_name(new_name)
+            if old_meta_key in self.meta.meta:
+                old_meta = self.meta.meta[old_meta_key].copy()
+                self.meta.meta[new_meta_key] = old_meta
+                self.meta._save()
+                if old_meta_key != new_meta_key:
+                    self.meta.remove_meta(old_meta_key)
+            else:
+                self.meta.rename_meta(old_name, new_name)
+
+        self.templates.set(new_name, self.storage.write(new_name, content), content)
+        self._record_history(old_name, new_name, content, old_content)
+        self._update_info(new_name, content, previous)
+        self.search_index.index(new_name, content)
+        self.content_index.set(new_name, content)
+        self.listing.rename(old_name, new_name)
+        self.categories.rename(old_name, new_name)
+
+    def add_template(self, full_name, content=""):
+        if full_name not in self.templates:
+            self.templates.set(full_name, self.storage.write(full_name, content), content)
+            self._record_history(full_name, full_name, content)
+            self._update_info(full_name, content)
+            self.search_index.index(full_name, content)
+            self.content_index.set(full_name, content)
+            self.listing.add(full_name)
+            self.categories.add(full_name)
+
+    def delete_template(self, full_name):
+        logger.info(f"Excluindo template: {full_name}")
+        if full_name in self.templates:
+            self.storage.delete(full_name)
+            self.templates.remove(full_name)
+            self._infos.pop(full_name, None)
+            self.search_index.remove(full_name)
+            self.content_index.remove(full_name)
+            self.listing.remove(full_name)
+            self.categories.remove(full_name)
+            self.meta.remove_meta(full_name)
+
+    def _record_history(self, old_name, new_name, content, old_content=None):
+        # O histórico é um extra: um erro nele não pode impedir a gravação
+        try:
+            self.history.rename(old_name, new_name)
+            self.history.record(new_name, content, old_content)
+        except (OSError, ValueError, zlib.error) as e:
+            logger.warning(f"Erro ao gravar o histórico de {new_name}: {e}")
+
+    def get_revisions(self, full_name):
+        """[(índice, datetime)] das revisões salvas, da mais antiga para a mais recente."""
+        return [
+            (index, datetime.datetime.fromtimestamp(stamp))
+            for index, stamp in self.history.revisions(full_name)
+        ]
+
+    def get_revision(self, full_name, index=-1):
+        """Texto de uma revisão (ver get_revisions); IndexError se não existe."""
+        return self.history.get(full_name, index)
+
+    def restore_revision(self, full_name, index):
+        """
+        Grava o texto de uma revisão como conteúdo atual do template (o texto
+        que estava vira mais uma revisão, então dá para desfazer). Retorna o texto.
+        """
+        content = self.get_revision(full_name, index)
+        self.save_template(full_name, full_name, content)
+        return content
+
+    def compact_history(self, background=False):
+        """
+        Aplica os limites do histórico (quantidade e idade) a todos os
+        templates. Com background=True roda numa thread e retorna a thread.
+        """
+        existing = set(self.templates)
+        if not background:
+            self.history.compact_all(existing=existing)
+            return None
+        thread = threading.Thread(
+            target=self.history.compact_all, kwargs={"existing": existing},
+            name="linxfast-history", daemon=True,
+        )
+        thread.start()
+        return thread
+
+    def add_listener(self, callback):
+        """Inscreve callback(TemplateChanges), chamado quando a biblioteca muda."""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def notify(self, changes=None, select=None):
+        """
+        Avisa os inscritos. Sem 'changes', serve para mudanças que não passam
+        pelos arquivos (favoritos, nomes de exibição) ou para sugerir 'select'.
+        """
+        if changes is None:
+            changes = TemplateChanges(select=select)
+        elif select is not None:
+            changes.select = select
+        for callback in list(self._listeners):
+            try:
+                callback(changes)
+            except Exception as e:
+                logger.error(f"Erro ao notificar mudança de templates: {e}")
+
+    def load_templates(self):
+        """
+        Reindexa a pasta de templates (só nomes e stat, sem ler conteúdo) e
+        notifica os inscritos se algo foi criado, removido ou alterado.
+        Índice e conteúdo em cache continuam valendo para arquivos que não mudaram.
+        """
+        return self._reindex(None)
+
+    @no_auto_log
+    def apply_scan(self, snapshot):
+        """
+        Como load_templates(), com um storage.scan() feito em outra thread
+        (LibraryWatcher). Só vale se templates.generation não mudou desde o
+        início do scan. Sem auto log: o snapshot tem um item por template.
+        """
+        return self._reindex(snapshot)
+
+    @no_auto_log
+    def _reindex(self, snapshot):
+        changes = self.templates.scan(snapshot)
+        for full_name in changes.modified | changes.removed:
+            self._infos.pop(full_name, None)
+        for full_name in changes.removed:
+            self.search_index.remove(full_name)
+            self.content_index.remove(full_name)
+        self.search_index.mark_stale(changes.added | changes.modified)
+        self.content_index.mark_stale(changes.added | changes.modified)
+        self.listing.update(changes.added, changes.removed)
+        self.categories.update(changes.added, changes.removed)
+
+        if not self.templates:
+            self.add_template("Template Padrão", self.get_default_template())
+            changes = TemplateChanges(
+                changes.added | {"Template Padrão"}, changes.removed, changes.modified
+            )
+            self.templates.scan()
+
+        if changes:
+            logger.info(f"Templates alterados: {changes}")
+            self.notify(changes)
+        return changes
+
+    def extract_placeholders(self, content):
+        # Suporta campos inteligentes: $[checkbox]Campo$, $[switch]Campo$, $[radio:op1|op2]Campo$
+        # E também extrai corretamente campos usados em condicionais (aninhadas inclusive)
+        # Ordem: primeira ocorrência no template
+        return extract_fields(content)[0]
+
+    def extract_conditional_fields(self, content):
+        # Apenas os campos que controlam condicionais ($Campo?Texto|Alternativa$)
+        return extract_fields(content)[1]
+
+    def get_default_template(self):
+        return (
+            "𝐃𝐚𝐝𝐨𝐬 𝐝𝐞 𝐂𝐨𝐧𝐭𝐚𝐭𝐨: $Nome$ - $Telefone$\n"
+            "𝗖𝗡𝗣𝗝: $CNPJ$\n"
+            "𝗘-𝗺𝗮𝗶𝗹: $Email$\n"
+            "𝐃𝐞𝐬𝐜𝐫𝐢𝐜̧𝐚̃𝐨: $Problema Relatado$\n"
+            "𝐏𝐞𝐬𝐪𝐮𝐢𝐬𝐚 𝐈𝐧𝐭𝐞𝐫𝐧𝐚: Sim.\n\n"
+            "---------------------------------------------------------------------------------------------\n\n"
+        )
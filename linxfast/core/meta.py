@@ -0,0 +1,416 @@
+import atexit
+import contextlib
+import logging
+import threading
+import time
+import weakref
+from .storage import FileStorage
+from logger_config import auto_log_functions, no_auto_log
+
+# Get the module logger
+logger = logging.getLogger(__name__)
+
+SAVE_DELAY = 0.5  # segundos sem alterações antes de gravar o meta
+SAVE_MAX_DELAY = 5.0  # com alterações contínuas, grava no máximo a cada tanto
+
+_instances = weakref.WeakSet()  # para gravar o pendente na saída (o timer é daemon)
+
+
+def _flush_all():
+    for meta in list(_instances):
+        try:
+            meta.flush()
+        except Exception as e:
+            logger.error(f"Erro ao gravar o meta na saída: {e}")
+
+
+atexit.register(_flush_all)
+
+
+def canonical_name(name):
+    """Nome do template com a primeira letra maiúscula (a pasta fica como está)."""
+    if " / " in name:
+        pasta, nome = name.split(" / ", 1)
+        return f"{pasta} / {nome[:1].upper() + nome[1:]}"
+    return name[:1].upper() + name[1:]
+
+
+class MetaEntry(dict):
+    """Campos de um template; avisa o MetaEntries dono quando o nocodb_id muda."""
+
+    __slots__ = ("_owner", "_name")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._owner = None
+        self._name = None
+
+    def _track(method):
+        def wrapper(self, *args, **kwargs):
+            before = self.get("nocodb_id")
+            result = method(self, *args, **kwargs)
+            after = self.get("nocodb_id")
+            if self._owner is not None and after != before:
+                self._owner._move_nocodb(self._name, before, after)
+            return result
+
+        return wrapper
+
+    __setitem__ = _track(dict.__setitem__)
+    __delitem__ = _track(dict.__delitem__)
+    __ior__ = _track(dict.__ior__)
+    pop = _track(dict.pop)
+    popitem = _track(dict.popitem)
+    setdefault = _track(dict.setdefault)
+    update = _track(dict.update)
+    clear = _track(dict.clear)
+    del _track
+
+
+class MetaEntries(dict):
+    """
+    O dict do meta (nome -> campos) com dois índices mantidos a cada
+    alteração, inclusive as feitas direto em meta.meta pela interface:
+    nome.lower() -> chave (busca sem diferenciar maiúsculas) e
+    nocodb_id -> chaves (templates importados do NocoDB). Os campos de cada
+    template ficam num MetaEntry, que avisa quando o nocodb_id muda.
+    """
+
+    __slots__ = ("index", "by_nocodb")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self.index = {}
+        self.by_nocodb = {}
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def reindex(self):
+        self.index = {key.lower(): key for key in self}
+
+    def find(self, name):
+        """Chave existente para 'name' (sem diferenciar maiúsculas), ou None."""
+        return self.index.get(name.lower())
+
+    def with_nocodb_id(self, nocodb_id):
+        """Chaves com esse nocodb_id, em ordem alfabética."""
+        return sorted(self.by_nocodb.get(str(nocodb_id), ()))
+
+    def _move_nocodb(self, key, old, new):
+        if old is not None:
+            names = self.by_nocodb.get(str(old))
+            if names is not None:
+                names.discard(key)
+                if not names:
+                    del self.by_nocodb[str(old)]
+        if new is not None:
+            self.by_nocodb.setdefault(str(new), set()).add(key)
+
+    def _attach(self, key, value):
+        if not isinstance(value, dict):
+            return value
+        if not isinstance(value, MetaEntry) or value._owner is not None:
+            # dict comum, ou entrada que ainda está em outra chave: guarda uma cópia
+            value = MetaEntry(value)
+        value._owner, value._name = self, key
+        self._move_nocodb(key, None, value.get("nocodb_id"))
+        return value
+
+    def _detach(self, key, value):
+        if isinstance(value, MetaEntry) and value._owner is self and value._name == key:
+            self._move_nocodb(key, value.get("nocodb_id"), None)
+            value._owner = value._name = None
+        lowered = key.lower()
+        if self.index.get(lowered) == key:
+            del self.index[lowered]
+
+    def __setitem__(self, key, value):
+        if key in self:
+            self._detach(key, dict.__getitem__(self, key))
+        super().__setitem__(key, self._attach(key, value))
+        self.index[key.lower()] = key
+
+    def __delitem__(self, key):
+        value = dict.__getitem__(self, key)
+        super().__delitem__(key)
+        self._detach(key, value)
+
+    def pop(self, key, *default):
+        if key in self:
+            value = super().pop(key)
+            self._detach(key, value)
+            return value
+        return super().pop(key, *default)
+
+    def popitem(self):
+        key, value = super().popitem()
+        self._detach(key, value)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def clear(self):
+        for key, value in list(self.items()):
+            self._detach(key, value)
+        super().clear()
+        self.index.clear()
+
+
+@auto_log_functions
+class TemplateMeta:
+    """
+    Favorito, protegido e nocodb_id por template.
+
+    As alterações ficam em memória e são gravadas depois (write-behind): _save()
+    só marca o meta como sujo, e uma thread grava quando passar 'save_delay'
+    segundos sem alterações (ou SAVE_MAX_DELAY desde a primeira pendente);
+    mil alterações seguidas viram uma gravação. flush() grava na hora o que
+    estiver pendente (o app chama ao fechar).
+    """
+
+    def __init__(self, base_dir="templates", storage=None, save_delay=SAVE_DELAY):
+        # meta.json na pasta de templates, ou a tabela meta do SQLite
+        self.storage = storage or FileStorage(base_dir)
+        self.meta = {}
+        self.save_delay = save_delay
+        self._batch_depth = 0
+        self._dirty = False
+        self._timer = None
+        self._first_change = self._last_change = 0.0
+        self._lock = threading.Lock()
+        self.saves = 0  # gravações feitas (para medir o agrupamento)
+        self.version = 0  # incrementada a cada alteração (caches como o TemplateListing)
+        _instances.add(self)
+        self._load()
+
+    def _load(self):
+        self.meta = MetaEntries(self.storage.load_meta())
+        if self.meta:
+            # Migração, só na carga: unifica entradas duplicadas (case-insensitive)
+            # e padroniza a capitalização do nome do template (não da pasta)
+            self._unify_case_insensitive_entries()
+
+    def _unify_case_insensitive_entries(self):
+        # Unifica entradas duplicadas (case-insensitive) e padroniza capitalização do nome do template (não da pasta)
+        lowered = {}
+        to_remove = []
+        for k, v in list(self.meta.items()):
+            # Padroniza: mantém a pasta como está, mas o nome do template com a primeira letra maiúscula
+            canonical = canonical_name(k)
+            k_lower = canonical.lower()
+            if k_lower in lowered:
+                # Unifica: mantém o nome com mais informações (mais campos True, ou mais campos no geral)
+                existing = lowered[k_lower]
+                # Junta os campos (favorito, protegido, nocodb_id, etc)
+                merged = existing.copy()
+                merged.update(v)
+                # Se algum dos dois for favorito/protegido, mantém True
+                if existing.get("favorito") or v.get("favorito"):
+                    merged["favorito"] = True
+                if existing.get("protegido") or v.get("protegido"):
+                    merged["protegido"] = True
+                # Se algum dos dois tiver nocodb_id, mantém
+                if existing.get("nocodb_id") and not merged.get("nocodb_id"):
+                    merged["nocodb_id"] = existing["nocodb_id"]
+                if v.get("nocodb_id") and not merged.get("nocodb_id"):
+                    merged["nocodb_id"] = v["nocodb_id"]
+                # Sempre mantém o nome padronizado
+                self.meta[canonical] = merged
+                lowered[k_lower] = merged
+                if k != canonical:
+                    to_remove.append(k)
+                if lowered[k_lower + "_orig"] in self.meta and lowered[k_lower + "_orig"] != canonical:
+                    to_remove.append(lowered[k_lower + "_orig"])
+            else:
+                lowered[k_lower] = v
+                lowered[k_lower + "_orig"] = canonical
+                # Se o nome não está padronizado, move para o padronizado
+                if k != canonical:
+                    self.meta[canonical] = v
+                    to_remove.append(k)
+        # Remove duplicados
+        for k in set(to_remove):
+            if k in self.meta:
+                del self.meta[k]
+        if to_remove:
+            self.meta.reindex()
+            self._save()
+
+    def _save(self):
+        """Marca o meta como alterado; a gravação fica para o flush() agendado."""
+        self.version += 1
+        with self._lock:
+            now = time.monotonic()
+            if not self._dirty:
+                self._first_change = now
+            self._dirty = True
+            self._last_change = now
+            if self._batch_depth or self._timer is not None:
+                return
+            if self.save_delay is not None:
+                self._start_timer(self.save_delay)
+                return
+        self.flush()
+
+    def _start_timer(self, delay):
+        self._timer = threading.Timer(delay, self._flush_later)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_later(self):
+        with self._lock:
+            self._timer = None
+            if self._batch_depth or not self._dirty:
+                return  # o fim do batch() agenda de novo
+            # Ainda mexendo: espera mais, até o limite desde a primeira alteração
+            now = time.monotonic()
+            wait = min(
+                self._last_change + self.save_delay,
+                self._first_change + SAVE_MAX_DELAY,
+            ) - now
+            if wait > 0:
+                self._start_timer(wait)
+                return
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Erro ao gravar o meta: {e}")
+
+    def flush(self):
+        """Grava agora as alterações pendentes (se houver)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            timer, self._timer = self._timer, None
+            # Cópia feita por operações em C (atômicas sob o GIL): a interface
+            # pode continuar alterando self.meta enquanto a cópia é gravada
+            snapshot = {name: dict(entry) for name, entry in list(self.meta.items())}
+        if timer is not None:
+            timer.cancel()
+        try:
+            self.storage.save_meta(snapshot)
+            self.saves += 1
+        except Exception:
+            with self._lock:
+                self._dirty = True
+            raise
+
+    @property
+    def dirty(self):
+        return self._dirty
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Nenhuma gravação no meio do bloco; o que mudou é agendado no fim."""
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._dirty:
+                self._save()
+
+    def _ensure_entry(self, template_name):
+        canonical = canonical_name(template_name)
+        if canonical not in self.meta:
+            self.meta[canonical] = {}
+
+    # Consultas por nome: chamadas para cada template ao montar listas, sem log por chamada
+
+    @no_auto_log
+    def _canonical_name(self, name):
+        # Não há mais tratamento especial para pasta raiz
+        return canonical_name(name)
+
+    @no_auto_log
+    def _find_meta_key(self, name):
+        # Busca insensível a capitalização pelo índice; sem entrada, o nome padronizado
+        return self.meta.find(name) or canonical_name(name)
+
+    @no_auto_log
+    def _entry(self, name):
+        key = self.meta.find(name)
+        return self.meta[key] if key is not None else {}
+
+    @no_auto_log
+    def is_favorite(self, name):
+        return self._entry(name).get("favorito", False)
+
+    @no_auto_log
+    def is_protected(self, name):
+        return self._entry(name).get("protegido", False)
+
+    def toggle_favorite(self, name):
+        k = self._find_meta_key(name)
+        self._ensure_entry(k)
+        current = self.is_favorite(k)
+        self.meta[k]["favorito"] = not current
+        if not current:
+            self.meta[k]["protegido"] = False  # Favorito remove proteção manual
+        self._save()
+
+    def toggle_protected(self, name):
+        k = self._find_meta_key(name)
+        self._ensure_entry(k)
+        if self.is_favorite(k):
+            return  # Favorito já é protegido, não permite alterar
+        current = self.is_protected(k)
+        self.meta[k]["protegido"] = not current
+        self._save()
+
+    def get_sorted_templates(self, template_names):
+        def sort_key(name):
+            is_fav = self.is_favorite(name)
+            category = name.split(" / ")[0] if " / " in name else "Geral"
+            is_geral = category == "Geral"
+
+            return (
+                0 if is_fav and is_geral else
+                1 if is_fav else
+                2 if is_geral else
+                3,
+                name.lower()
+            )
+
+        return sorted(template_names, key=sort_key)
+
+
+    @no_auto_log
+    def get_display_name(self, name):
+        entry = self._entry(name)
+        if entry.get("favorito"):
+            return f"⭐ {name}"
+        elif entry.get("protegido"):
+            return f"🔒 {name}"
+        return name
+
+    @no_auto_log
+    def get_real_name(self, display_name):
+        if display_name.startswith("⭐ ") or display_name.startswith("🔒 "):
+            return display_name[2:]
+        return display_name
+
+    def remove_meta(self, name):
+        k = self._find_meta_key(name)
+        if k in self.meta:
+            del self.meta[k]
+            self._save()
+
+    def rename_meta(self, old, new):
+        old_k = self._find_meta_key(old)
+        new_k = self._canonical_name(new)
+        if old_k in self.meta:
+            self.meta[new_k] = self.meta.pop(old_k)
+            self._save()
@@ -0,0 +1,254 @@
+"""
+Retrato compactado da biblioteca de templates (.lfpack), aberto com mmap.
+
+Numa pasta sincronizada (OneDrive), abrir centenas de .txt pequenos custa
+caro. O pack guarda num arquivo só o conteúdo, o hash e a tabela de
+placeholders de cada template, junto com a assinatura do .txt (mtime, tamanho,
+inode) de quando foi gerado. O TemplateStore lê do pack os templates cuja
+assinatura no scan ainda é a mesma; o resto vem do backend como antes. O
+arquivo é mapeado em memória e só as partes usadas são lidas do disco.
+
+Layout (little-endian; offsets das seções no cabeçalho):
+    cabeçalho   MAGIC, versão, quantidades e offsets das seções
+    strings     (offset, tamanho) de cada string; categorias, nomes, campos e
+                mensagens de erro aparecem uma vez só
+    entradas    por template: categoria, nome, corpo, campos, erros,
+                assinatura e hash BLAKE2 do conteúdo
+    campos      (string, flags) de cada campo, na ordem do template
+    erros       (mensagem, linha, coluna, offset)
+    textos      bytes UTF-8 das strings
+    diretório   nomes completos separados por NUL, na ordem das entradas (para
+                abrir o pack com um decode só)
+    corpos      conteúdo UTF-8 dos templates, um atrás do outro
+"""
+
+import hashlib
+import logging
+import struct
+
+from .scanner import ScanError, TemplateInfo, automatic_key
+from .storage import split_name
+
+# Get the module logger
+logger = logging.getLogger(__name__)
+
+MAGIC = b"LFPK"
+VERSION = 1
+
+# magic, versão, reservado, templates, strings, chave dos automáticos (string),
+# offsets: strings, entradas, campos, erros, textos, diretório, corpos
+HEADER = struct.Struct("<4sHHIIIQQQQQQQ")
+STRING = struct.Struct("<QI")
+# categoria (-1 = raiz), nome, corpo (offset, tamanho), campos (início, qtd),
+# erros (início, qtd), mtime_ns, tamanho, inode, hash
+ENTRY = struct.Struct("<iIQIIIIIqqQ16s")
+FIELD = struct.Struct("<IB")
+ERROR = struct.Struct("<IIII")
+
+NORMAL, CONDITIONAL, AUTOMATIC = 1, 2, 4
+
+
+def write_pack(path, items, automatic=()):
+    """Grava em 'path' (atômico) o pack de 'items' (ver build_pack)."""
+    from .atomic import atomic_write
+
+    atomic_write(path, build_pack(items, automatic))
+
+
+def build_pack(items, automatic=()):
+    """
+    Conteúdo do pack. 'items' são tuplas (nome, assinatura, conteúdo,
+    TemplateInfo); a assinatura é a do FileStorage (mtime_ns, tamanho, inode).
+    Templates sem assinatura ficam de fora.
+    """
+    strings = {}
+
+    def intern(text):
+        index = strings.get(text)
+        if index is None:
+            index = strings[text] = len(strings)
+        return index
+
+    key_index = intern(automatic_key(automatic))
+    entries, fields, errors, names, bodies = [], [], [], [], []
+    body_offset = field_count = error_count = 0
+    for full_name, signature, content, info in items:
+        if signature is None:
+            continue
+        category, name = split_name(full_name)
+        body = content.encode("utf-8")
+        for field in info.fields:
+            flags = (
+                (NORMAL if field in info.normal_fields else 0)
+                | (CONDITIONAL if field in info.conditional_fields else 0)
+                | (AUTOMATIC if field in info.automatic_fields else 0)
+            )
+            fields.append(FIELD.pack(intern(field), flags))
+        for error in info.errors:
+            errors.append(ERROR.pack(intern(error.message), error.line, error.column, error.offset))
+        mtime_ns, size, inode = signature
+        entries.append(ENTRY.pack(
+            -1 if category is None else intern(category),
+            intern(name),
+            body_offset,
+            len(body),
+            field_count,
+            len(info.fields),
+            error_count,
+            len(info.errors),
+            mtime_ns,
+            size,
+            inode,
+            hashlib.blake2b(body, digest_size=16).digest(),
+        ))
+        names.append(full_name)
+        bodies.append(body)
+        body_offset += len(body)
+        field_count += len(info.fields)
+        error_count += len(info.errors)
+
+    string_table, texts, text_offset = [], [], 0
+    for text in strings:
+        data = text.encode("utf-8")
+        string_table.append(STRING.pack(text_offset, len(data)))
+        texts.append(data)
+        text_offset += len(data)
+
+    directory = ["\0".join(names).encode("utf-8")]
+    sections = [string_table, entries, fields, errors, texts, directory, bodies]
+    offsets, position = [], HEADER.size
+    for section in sections:
+        offsets.append(position)
+        position += sum(map(len, section))
+    header = HEADER.pack(MAGIC, VERSION, 0, len(entries), len(strings), key_index, *offsets)
+    return b"".join([header, *(b"".join(section) for section in sections)])
+
+
+class LibraryPack:
+    """
+    Pack aberto (somente leitura). As consultas recebem a assinatura atual do
+    template e retornam None se o pack não tem o template ou se ele mudou.
+    """
+
+    def __init__(self, path):
+        # mmap só é importado quando há um pack para abrir
+        import mmap
+
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._open()
+        except Exception:
+            self._mm.close()
+            raise
+
+    @classmethod
+    def open(cls, path):
+        """O pack em 'path', ou None se não existe ou está inválido."""
+        try:
+            return cls(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning(f"Ignorando pack inválido {path}: {e}")
+            return None
+
+    def _open(self):
+        mm = self._mm
+        (magic, version, _, count, string_count, key_index, self._strings_at,
+         self._entries_at, self._fields_at, self._errors_at, self._texts_at,
+         directory_at, self._bodies_at) = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"formato desconhecido ({magic!r}, versão {version})")
+        if self._bodies_at > len(mm) or self._entries_at + count * ENTRY.size > self._fields_at:
+            raise ValueError("arquivo truncado")
+        self._string_cache = {}
+        self.automatic_key = self._string(key_index)
+        # Só os nomes são decodificados agora; conteúdo e tabelas, quando pedidos
+        names = mm[directory_at : self._bodies_at].decode("utf-8").split("\0") if count else []
+        if len(names) != count:
+            raise ValueError("diretório de nomes inconsistente")
+        self._entries = dict(zip(names, range(count)))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def _string(self, index):
+        text = self._string_cache.get(index)
+        if text is None:
+            offset, size = STRING.unpack_from(self._mm, self._strings_at + index * STRING.size)
+            start = self._texts_at + offset
+            text = self._string_cache[index] = self._mm[start : start + size].decode("utf-8")
+        return text
+
+    def _entry(self, name, signature):
+        position = self._entries.get(name)
+        if position is None or signature is None:
+            return None
+        entry = ENTRY.unpack_from(self._mm, self._entries_at + position * ENTRY.size)
+        if entry[8:11] != tuple(signature):
+            return None
+        return entry
+
+    def signature(self, name):
+        position = self._entries.get(name)
+        if position is None:
+            return None
+        return ENTRY.unpack_from(self._mm, self._entries_at + position * ENTRY.size)[8:11]
+
+    def content(self, name, signature):
+        entry = self._entry(name, signature)
+        if entry is None:
+            return None
+        start = self._bodies_at + entry[2]
+        return self._mm[start : start + entry[3]].decode("utf-8")
+
+    def digest(self, name, signature):
+        """Hash do conteúdo no formato de storage.content_hash."""
+        entry = self._entry(name, signature)
+        return None if entry is None else entry[11].hex()
+
+    def info(self, name, signature, automatic=()):
+        """TemplateInfo guardado, se montado com os mesmos nomes automáticos."""
+        if self.automatic_key != automatic_key(automatic):
+            return None
+        entry = self._entry(name, signature)
+        if entry is None:
+            return None
+        mm, string = self._mm, self._string
+        fields, normal, conditional, automatic_fields = [], [], [], []
+        at = self._fields_at + entry[4] * FIELD.size
+        for _ in range(entry[5]):
+            index, flags = FIELD.unpack_from(mm, at)
+            at += FIELD.size
+            field = string(index)
+            fields.append(field)
+            if flags & AUTOMATIC:
+                automatic_fields.append(field)
+            if flags & NORMAL:
+                normal.append(field)
+            if flags & CONDITIONAL:
+                conditional.append(field)
+        errors = []
+        at = self._errors_at + entry[6] * ERROR.size
+        for _ in range(entry[7]):
+            message, line, column, offset = ERROR.unpack_from(mm, at)
+            at += ERROR.size
+            errors.append(ScanError(string(message), line, column, offset))
+        return TemplateInfo(fields, normal, conditional, automatic_fields, errors)
+
+    def matches(self, index):
+        """Se o pack tem exatamente os templates e assinaturas de 'index' (scan)."""
+        if len(index) != len(self._entries):
+            return False
+        return all(
+            signature is not None and self.signature(name) == tuple(signature)
+            for name, signature in index.items()
+        )
+
+    def close(self):
+        self._mm.close()
@@ -0,0 +1,198 @@
+"""
+Cache em disco da análise dos templates (parse_cache-pyXY.bin).
+
+Os campos (TemplateInfo) e a árvore compilada (CompiledTemplate) de um
+template saem do mesmo tokenize(), refeito a cada abertura do app mesmo para
+textos que não mudaram. ParseCache guarda os tokens e os erros de cada
+conteúdo, com a chave sendo o hash do conteúdo mais os nomes automáticos (que
+mudam o tipo dos tokens). Na abertura seguinte, a primeira troca de template
+só remonta os objetos a partir dos tokens, sem analisar o texto.
+
+Cada token vira cinco inteiros: tipo, início, fim e onde o valor está no
+conteúdo (valores que não são um trecho do texto, como o '|' implícito das
+condicionais simples, vão numa lista à parte). O arquivo é um marshal (rápido
+de carregar, sem executar código) com a versão do formato, do parser e do
+Python: se algo mudar, o cache é descartado e refeito conforme os templates
+são usados. Só as MAX_ENTRIES entradas usadas mais recentemente são gravadas.
+
+O arquivo fica na pasta de cache do usuário (paths.py), nunca na pasta de
+templates sincronizada: marshal não é estável entre versões do Python e só é
+lido de um arquivo gravado por esta máquina. O nome leva a versão do Python.
+"""
+
+import array
+import hashlib
+import logging
+import marshal
+import os
+import sys
+from collections import OrderedDict
+
+from .atomic import background_writer
+from .compiler import nodes_from_rows
+from .scanner import (
+    AUTOMATIC,
+    COND_CLOSE,
+    COND_ELSE,
+    COND_OPEN,
+    FIELD,
+    PARSER_VERSION,
+    TEXT,
+    ScanError,
+    Token,
+    automatic_key,
+    info_from_tokens,
+    tokenize,
+)
+
+# Get the module logger
+logger = logging.getLogger(__name__)
+
+# Um arquivo por versão do Python: o formato do marshal muda entre versões
+PARSE_CACHE_FILENAME = f"parse_cache-py{sys.version_info[0]}{sys.version_info[1]}.bin"
+LEGACY_PARSE_CACHE_FILENAME = "parse_cache.bin"  # antes ficava na pasta de templates
+FORMAT = 1
+MAX_ENTRIES = 20000
+
+KINDS = (TEXT, FIELD, AUTOMATIC, COND_OPEN, COND_ELSE, COND_CLOSE)
+_KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+NO_SLICE = 0xFFFFFFFF  # o valor está na lista de extras; o índice vai no campo seguinte
+# Os únicos tokens que o TemplateInfo usa
+_PLACEHOLDER_CODES = frozenset(_KIND_CODES[kind] for kind in (FIELD, AUTOMATIC, COND_OPEN))
+
+
+def _header():
+    return ("linxfast-parse-cache", FORMAT, PARSER_VERSION, sys.version_info[:2])
+
+
+def _encode(content, tokens, errors):
+    numbers = array.array("I")
+    extras = []
+    find = content.find
+    for token in tokens:
+        value = token.value
+        at = find(value, token.start, token.end) if value else -1
+        if at == -1:
+            numbers.extend((_KIND_CODES[token.kind], token.start, token.end, NO_SLICE, len(extras)))
+            extras.append(value)
+        else:
+            numbers.extend((_KIND_CODES[token.kind], token.start, token.end, at, at + len(value)))
+    return (
+        numbers.tobytes(),
+        tuple(extras),
+        tuple((e.message, e.line, e.column, e.offset) for e in errors),
+    )
+
+
+def _rows(content, entry, codes=None):
+    """(tipo, valor, início, fim) de cada token guardado; com 'codes', só desses tipos."""
+    data, extras, _ = entry
+    numbers = array.array("I")
+    numbers.frombytes(data)
+    columns = (numbers[i::5] for i in range(5))
+    for code, start, end, value_start, value_end in zip(*columns):
+        if codes is not None and code not in codes:
+            continue
+        if value_start == NO_SLICE:
+            yield KINDS[code], extras[value_end], start, end
+        else:
+            yield KINDS[code], content[value_start:value_end], start, end
+
+
+class ParseCache:
+    """Tokens de cada conteúdo já analisado, guardados entre execuções."""
+
+    def __init__(self, path=None, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # hash -> (tokens, extras, erros)
+        self._hashers = {}  # chave dos automáticos -> blake2b já alimentado com ela
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        if path:
+            self.load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def load(self):
+        """Lê o arquivo; formato, parser ou Python diferentes descartam o cache."""
+        try:
+            data = background_writer.pending(self.path)
+            if data is None:
+                with open(self.path, "rb") as f:
+                    data = f.read()
+            header, entries = marshal.loads(data)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, EOFError, TypeError) as e:
+            logger.warning(f"Ignorando cache de análise inválido {self.path}: {e}")
+            return
+        if header != _header():
+            logger.info("Cache de análise de outra versão; será refeito")
+            return
+        self._entries = OrderedDict(entries)
+
+    def save(self):
+        """Grava em segundo plano (atômico), se algo mudou desde a leitura."""
+        if not self.path or not self.dirty:
+            return
+        data = marshal.dumps((_header(), list(self._entries.items())))
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        background_writer.write(self.path, data)
+        self.dirty = False
+
+    def _key(self, content, automatic):
+        akey = automatic_key(automatic)
+        hasher = self._hashers.get(akey)
+        if hasher is None:
+            hasher = self._hashers[akey] = hashlib.blake2b(akey.encode("utf-8") + b"\0",
+                                                          digest_size=16)
+        hasher = hasher.copy()
+        hasher.update(content.encode("utf-8"))
+        return hasher.digest()
+
+    def _lookup(self, content, automatic):
+        """(entrada, None) se já analisado; senão analisa, guarda e retorna (entrada, tokenize())."""
+        key = self._key(content, automatic)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry, None
+        self.misses += 1
+        fresh = tokenize(content, automatic)
+        entry = self._entries[key] = _encode(content, *fresh)
+        self.dirty = True
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry, fresh
+
+    def tokens(self, content, automatic=(), codes=None):
+        """(tokens, erros) como tokenize(content, automatic), do cache se possível."""
+        entry, fresh = self._lookup(content, automatic)
+        if fresh is not None:
+            return fresh
+        tokens = [Token(*row) for row in _rows(content, entry, codes)]
+        return tokens, [ScanError(*error) for error in entry[2]]
+
+    def info(self, content, automatic=()):
+        """TemplateInfo do conteúdo (como scanner.build_info)."""
+        # Só campos e condicionais: o texto entre eles não entra no TemplateInfo
+        tokens, errors = self.tokens(content, automatic, _PLACEHOLDER_CODES)
+        return info_from_tokens(tokens, errors, automatic)
+
+    def nodes(self, content, handlers=()):
+        """Árvore de nós do conteúdo (como compiler.parse)."""
+        entry, fresh = self._lookup(content, handlers)
+        if fresh is not None:
+            rows = ((t.kind, t.value, t.start, t.end) for t in fresh[0])
+        else:
+            rows = _rows(content, entry)
+        for error in entry[2]:
+            logger.debug(f"Template com erro de sintaxe: {ScanError(*error)}")
+        return nodes_from_rows(content, rows)
+
+    def stats(self):
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
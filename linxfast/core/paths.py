@@ -0,0 +1,97 @@
+"""
+Pastas do usuário para o que só vale nesta máquina.
+
+A pasta de templates é versionada no git e sincronizada pelo OneDrive entre
+as máquinas da equipe. Caches com assinaturas de arquivo (mtime, inode) ou
+gerados por esta instalação não podem ficar nela: seriam inválidos nas outras
+máquinas e gerariam conflitos de sincronização. Cada pasta de templates ganha
+uma subpasta própria, com o nome dela mais o hash do caminho absoluto.
+
+Caches (pack, análise) vão para a pasta de cache; o histórico de revisões,
+que não pode ser refeito, para a de dados do usuário. As variáveis de
+ambiente LINXFASTCACHEDIR e LINXFASTDATADIR trocam as pastas base (ex.: testes).
+"""
+
+import hashlib
+import logging
+import os
+import sys
+
+# Get the module logger
+logger = logging.getLogger(__name__)
+
+APP_NAME = "LinxFast"
+
+
+def _user_cache_base():
+    override = os.getenv("LINXFASTCACHEDIR")
+    if override:
+        return override
+    if sys.platform == "win32":
+        root = os.getenv("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+        return os.path.join(root, APP_NAME, "Cache")
+    if sys.platform == "darwin":
+        return os.path.join(os.path.expanduser("~/Library/Caches"), APP_NAME)
+    root = os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(root, APP_NAME.lower())
+
+
+def _user_data_base():
+    override = os.getenv("LINXFASTDATADIR")
+    if override:
+        return override
+    if sys.platform == "win32":
+        root = os.getenv("APPDATA") or os.path.expanduser("~\\AppData\\Roaming")
+        return os.path.join(root, APP_NAME)
+    if sys.platform == "darwin":
+        return os.path.join(os.path.expanduser("~/Library/Application Support"), APP_NAME)
+    root = os.getenv("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    return os.path.join(root, APP_NAME.lower())
+
+
+def library_key(template_dir):
+    """Nome da subpasta de uma pasta de templates: 'templates-1a2b3c4d'."""
+    path = os.path.normcase(os.path.abspath(template_dir))
+    digest = hashlib.blake2b(path.encode("utf-8"), digest_size=4).hexdigest()
+    return f"{os.path.basename(path) or 'templates'}-{digest}"
+
+
+def user_cache_dir(template_dir):
+    """Pasta de cache desta máquina para a pasta de templates (não é criada aqui)."""
+    return os.path.join(_user_cache_base(), library_key(template_dir))
+
+
+def user_data_dir(template_dir):
+    """Pasta de dados desta máquina para a pasta de templates (não é criada aqui)."""
+    return os.path.join(_user_data_base(), library_key(template_dir))
+
+
+def remove_legacy(path):
+    """Apaga um cache que versões anteriores gravavam na pasta de templates."""
+    if not os.path.exists(path):
+        return
+    try:
+        os.remove(path)
+    except OSError as e:
+        logger.warning(f"Não foi possível remover {path}: {e}")
+
+
+def move_legacy_dir(path, target):
+    """
+    Move para 'target' uma pasta que versões anteriores criavam na pasta de
+    templates. Se 'target' já existe, a antiga fica onde está (com um aviso).
+    """
+    if not os.path.isdir(path):
+        return
+    if os.path.exists(target):
+        logger.warning(f"{path} ignorada: {target} já existe")
+        return
+    try:
+        # Importado aqui: só roda uma vez, na primeira abertura após atualizar
+        import shutil
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.move(path, target)
+        logger.info(f"{path} movida para {target}")
+    except OSError as e:
+        logger.warning(f"Não foi possível mover {path} para {target}: {e}")
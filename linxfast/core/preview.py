@@ -0,0 +1,108 @@
+"""
+Pré-visualização incremental de um template compilado.
+
+O texto é dividido em segmentos (os nós do nível superior da árvore, com
+textos fixos consecutivos agrupados). Um índice campo -> segmentos diz quais
+trechos usam cada campo; ao digitar em $Nome$, só os segmentos que citam
+Nome são renderizados de novo, e a interface corrige só esses trechos.
+"""
+
+import logging
+from .compiler import (
+    Automatic,
+    Conditional,
+    Field,
+    Literal,
+    RenderContext,
+    _render_nodes,
+)
+
+# Get the module logger
+logger = logging.getLogger(__name__)
+
+
+def _referenced_fields(node, found):
+    kind = node.__class__
+    if kind is Field or kind is Automatic:
+        # Automáticos também: um valor digitado tem prioridade sobre o handler
+        found.add(node.name)
+    elif kind is Conditional:
+        found.add(node.field)
+        for child in node.if_true:
+            _referenced_fields(child, found)
+        for child in node.if_false:
+            _referenced_fields(child, found)
+    return found
+
+
+class LivePreview:
+    """Mantém o texto renderizado por segmento e calcula só o que mudou."""
+
+    def __init__(self, compiled):
+        self.compiled = compiled
+        self.segments = []
+        self.dependents = {}  # campo -> índices dos segmentos que o usam
+        for node in compiled.nodes:
+            if node.__class__ is Literal and self.segments:
+                last = self.segments[-1]
+                if last.__class__ is Literal:
+                    self.segments[-1] = Literal(last.text + node.text)
+                    continue
+            self.segments.append(node)
+        for index, node in enumerate(self.segments):
+            for name in _referenced_fields(node, set()):
+                self.dependents.setdefault(name, []).append(index)
+        self.texts = [""] * len(self.segments)
+        self.values = {}
+
+    def _render_segment(self, index, context):
+        node = self.segments[index]
+        if node.__class__ is Literal:
+            return node.text
+        out = []
+        _render_nodes((node,), context.field_values, out.append, context.resolve)
+        return "".join(out)
+
+    def _context(self, field_values, context):
+        if context is None:
+            context = RenderContext(self.compiled.engine)
+        context.field_values = field_values
+        return context
+
+    def render(self, field_values, context=None):
+        """Renderiza tudo; retorna a lista de textos, um por segmento."""
+        context = self._context(field_values, context)
+        self.texts = [self._render_segment(i, context) for i in range(len(self.segments))]
+        self.values = dict(field_values)
+        return self.texts
+
+    def update(self, field_values, context=None):
+        """
+        Renderiza só os segmentos que dependem de campos alterados.
+
+        Retorna [(índice, texto_novo)] apenas para os segmentos cujo texto mudou.
+        """
+        previous = self.values
+        changed = [k for k, v in field_values.items() if previous.get(k) != v]
+        changed.extend(k for k in previous if k not in field_values)
+        self.values = dict(field_values)
+        if not changed:
+            return []
+
+        affected = set()
+        for name in changed:
+            affected.update(self.dependents.get(name, ()))
+        if not affected:
+            return []
+
+        context = self._context(field_values, context)
+        patches = []
+        for index in sorted(affected):
+            text = self._render_segment(index, context)
+            if text != self.texts[index]:
+                self.texts[index] = text
+                patches.append((index, text))
+        return patches
+
+    def text(self):
+        return "".join(self.texts)
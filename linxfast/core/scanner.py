@@ -0,0 +1,421 @@
+"""
+Scanner único dos placeholders dos templates.
+
+Reconhece, em uma única passada e em tempo linear:
+    $Campo$                       campo simples
+    $[checkbox]Campo$             campo inteligente (também [switch] e [radio:a|b])
+    $Agora$ / $Agora[formato]$    placeholders automáticos
+    $Campo?Texto|Alternativa$     condicional (os ramos podem conter outros placeholders)
+
+Regras de pareamento:
+    - Um placeholder é '$' + corpo + '$', onde o corpo não é vazio, não contém
+      quebra de linha e não começa com espaço. Se o corpo for inválido, o '$' é
+      texto comum e a busca recomeça no próximo '$' (ex.: "R$ 10,00").
+    - Se o corpo tiver '?' e '|' é uma condicional simples (forma antiga).
+    - Se tiver '?' mas nenhum '|', a condicional é aninhada: os ramos seguem até
+      o '|' e o '$' de fechamento, podendo conter outros placeholders. Dentro de
+      um ramo, '$' só abre um placeholder se for seguido de letra, dígito, '_'
+      ou '[' e houver outro '$' na mesma linha; caso contrário, fecha o ramo.
+    - Condicionais não atravessam linhas. Uma condicional malformada vira texto
+      comum (sem retroceder), o que mantém a varredura linear mesmo em logs
+      colados com muitos '$' soltos.
+"""
+
+import bisect
+import logging
+import sys
+from collections import namedtuple
+from functools import lru_cache
+
+# Get the module logger
+logger = logging.getLogger(__name__)
+
+TEXT = "text"
+FIELD = "field"
+AUTOMATIC = "automatic"
+COND_OPEN = "cond_open"
+COND_ELSE = "cond_else"
+COND_CLOSE = "cond_close"
+
+MAX_DEPTH = 32
+
+# Mude ao alterar o que tokenize() produz: invalida os tokens guardados em disco (parse_cache.py)
+PARSER_VERSION = 1
+
+FieldKind = namedtuple("FieldKind", "type label options")
+
+
+class Token:
+    __slots__ = ("kind", "value", "start", "end")
+
+    def __init__(self, kind, value, start, end):
+        self.kind = kind
+        self.value = value
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"Token({self.kind}, {self.value!r}, {self.start}, {self.end})"
+
+
+class ScanError(ValueError):
+    """Erro de sintaxe em um template, com linha e coluna (base 1)."""
+
+    def __init__(self, message, line, column, offset):
+        super().__init__(f"{message} (linha {line}, coluna {column})")
+        self.message = message
+        self.line = line
+        self.column = column
+        self.offset = offset
+
+
+class _Frame:
+    __slots__ = ("open_index", "else_index", "start", "has_children")
+
+    def __init__(self, open_index, start):
+        self.open_index = open_index
+        self.else_index = -1
+        self.start = start
+        self.has_children = False
+
+
+@lru_cache(maxsize=4096)
+def field_kind(name):
+    """Detecta o tipo do campo: entry, checkbox, switch ou radio (com opções)."""
+    for prefix, kind in (("[checkbox]", "checkbox"), ("[switch]", "switch")):
+        if name.startswith(prefix) and len(name) > len(prefix):
+            return FieldKind(kind, name[len(prefix) :].strip(), None)
+    if name.startswith("[radio:"):
+        close = name.find("]", 7)
+        if close > 7 and close + 1 < len(name):
+            options = tuple(opt.strip() for opt in name[7:close].split("|"))
+            return FieldKind("radio", name[close + 1 :].strip(), options)
+    return FieldKind("entry", name, None)
+
+
+def is_automatic_name(name, automatic=()):
+    if name == "Agora" or (name.startswith("Agora[") and name.endswith("]")):
+        return True
+    return name in automatic
+
+
+def automatic_key(automatic):
+    """Identifica o conjunto de nomes automáticos (os tokens dependem dele)."""
+    return "\n".join(sorted(automatic))
+
+
+def _condition_start(body):
+    # Em $[radio:a|b]Campo?...$ o '|' das opções não conta para a condicional
+    if body.startswith("[radio:"):
+        close = body.find("]", 7)
+        if close != -1:
+            return close + 1
+    return 0
+
+
+def _valid_body(body):
+    return bool(body) and not body[0].isspace() and "\n" not in body
+
+
+def _valid_nested_body(body):
+    if not body or "\n" in body:
+        return False
+    first = body[0]
+    return first.isalnum() or first in "[_"
+
+
+def tokenize(content, automatic=()):
+    """
+    Converte o template em uma lista de tokens.
+
+    Retorna (tokens, erros). Os erros são ScanError com linha e coluna; o
+    template continua utilizável, pois trechos malformados viram texto.
+    """
+    tokens = []
+    problems = []  # (mensagem, offset)
+    frames = []
+    append = tokens.append
+    find = content.find
+    length = len(content)
+    pos = 0
+
+    def add_text(start, end):
+        if start < end:
+            append(Token(TEXT, content[start:end], start, end))
+
+    def mark_child():
+        if frames:
+            frames[-1].has_children = True
+
+    def abandon(frame):
+        # Condicional sem fechamento: abertura e '|' voltam a ser texto
+        opening = tokens[frame.open_index]
+        tokens[frame.open_index] = Token(
+            TEXT, content[opening.start : opening.end], opening.start, opening.end
+        )
+        if frame.else_index != -1:
+            bar = tokens[frame.else_index]
+            tokens[frame.else_index] = Token(TEXT, "|", bar.start, bar.end)
+        problems.append(("Condicional não fechada", frame.start))
+
+    def close(frame, at):
+        if frame.else_index != -1:
+            append(Token(COND_CLOSE, "$", at, at + 1))
+            mark_child()
+            return
+        if not frame.has_children:
+            # $Campo?Texto$ sem '|' continua sendo um campo com esse nome
+            del tokens[frame.open_index :]
+            append(Token(FIELD, content[frame.start + 1 : at], frame.start, at + 1))
+            mark_child()
+            return
+        opening = tokens[frame.open_index]
+        tokens[frame.open_index] = Token(
+            TEXT, content[opening.start : opening.end], opening.start, opening.end
+        )
+        append(Token(TEXT, "$", at, at + 1))
+        problems.append(("Condicional sem '|' (alternativa)", frame.start))
+
+    def placeholder(body, start, end):
+        cond_from = _condition_start(body)
+        question = body.find("?", cond_from)
+        if question != -1:
+            field_name = body[:question]
+            if body.find("|", cond_from) != -1:
+                # Condicional simples: ramos são texto puro
+                rest_at = start + 1 + question + 1
+                append(Token(COND_OPEN, field_name, start, rest_at))
+                bar = body.find("|", question + 1)
+                if bar == -1:
+                    add_text(rest_at, end - 1)
+                    append(Token(COND_ELSE, "|", end - 1, end - 1))
+                else:
+                    bar_at = start + 1 + bar
+                    add_text(rest_at, bar_at)
+                    append(Token(COND_ELSE, "|", bar_at, bar_at + 1))
+                    add_text(bar_at + 1, end - 1)
+                append(Token(COND_CLOSE, "$", end - 1, end))
+                mark_child()
+                return end
+            if len(frames) < MAX_DEPTH:
+                # Condicional aninhada: os ramos seguem até '|' e '$'
+                rest_at = start + 1 + question + 1
+                mark_child()
+                append(Token(COND_OPEN, field_name, start, rest_at))
+                frames.append(_Frame(len(tokens) - 1, start))
+                return rest_at
+            problems.append(("Aninhamento máximo de condicionais excedido", start))
+        if body.startswith("Agora[") and not body.endswith("]"):
+            problems.append(("Formato de $Agora[...]$ sem ']'", start))
+        elif body.startswith("[radio:") and body.find("]", 7) <= 7:
+            problems.append(("Campo radio sem opções ou sem ']'", start))
+        kind = AUTOMATIC if is_automatic_name(body, automatic) else FIELD
+        append(Token(kind, body, start, end))
+        mark_child()
+        return end
+
+    while pos < length:
+        dollar = find("$", pos)
+        stop = length if dollar == -1 else dollar
+
+        if frames:
+            # Texto dentro de um ramo: '|' troca de ramo, quebra de linha encerra
+            newline = find("\n", pos, stop)
+            segment_end = stop if newline == -1 else newline
+            frame = frames[-1]
+            if frame.else_index == -1:
+                bar = find("|", pos, segment_end)
+                if bar != -1:
+                    add_text(pos, bar)
+                    append(Token(COND_ELSE, "|", bar, bar + 1))
+                    frame.else_index = len(tokens) - 1
+                    pos = bar + 1
+                    continue
+            add_text(pos, segment_end)
+            pos = segment_end
+            if newline != -1 or dollar == -1:
+                while frames:
+                    abandon(frames.pop())
+                continue
+        else:
+            if dollar == -1:
+                add_text(pos, length)
+                break
+            add_text(pos, dollar)
+            pos = dollar
+
+        # pos aponta para um '$'
+        following = find("$", pos + 1)
+        body = content[pos + 1 : following] if following != -1 else None
+
+        if frames:
+            if not _valid_nested_body(body):
+                close(frames.pop(), pos)
+                pos += 1
+                continue
+        elif body is None:
+            add_text(pos, length)
+            break
+        elif not _valid_body(body):
+            # '$' solto: vira texto e o próximo '$' passa a ser o candidato
+            add_text(pos, following)
+            pos = following
+            continue
+
+        pos = placeholder(body, pos, following + 1)
+
+    while frames:
+        abandon(frames.pop())
+
+    return _merge_text(tokens), _to_errors(content, problems)
+
+
+def _merge_text(tokens):
+    merged = []
+    pending = []
+    pending_start = 0
+    for token in tokens:
+        if token.kind is TEXT:
+            if not pending:
+                pending_start = token.start
+            pending.append(token)
+            continue
+        if pending:
+            merged.append(_join(pending, pending_start))
+            pending = []
+        merged.append(token)
+    if pending:
+        merged.append(_join(pending, pending_start))
+    return merged
+
+
+def _join(pending, start):
+    if len(pending) == 1:
+        return pending[0]
+    return Token(TEXT, "".join(t.value for t in pending), start, pending[-1].end)
+
+
+def _to_errors(content, problems):
+    if not problems:
+        return []
+    line_starts = [0]
+    find = content.find
+    index = find("\n")
+    while index != -1:
+        line_starts.append(index + 1)
+        index = find("\n", index + 1)
+    errors = []
+    for message, offset in sorted(problems, key=lambda p: p[1]):
+        line = bisect.bisect_right(line_starts, offset)
+        column = offset - line_starts[line - 1] + 1
+        errors.append(ScanError(message, line, column, offset))
+    return errors
+
+
+def check(content):
+    """Retorna apenas os erros de sintaxe do template."""
+    return tokenize(content)[1]
+
+
+def extract_fields(content):
+    """
+    Retorna (campos, campos_condicionais) na ordem em que aparecem pela primeira vez.
+
+    'campos' inclui todos os nomes usados (simples, automáticos e de condicionais),
+    já sem espaços nas pontas, como o antigo extract_placeholders.
+    """
+    fields = {}
+    conditional = {}
+    for token in tokenize(content)[0]:
+        kind = token.kind
+        if kind is FIELD or kind is AUTOMATIC:
+            fields.setdefault(token.value.strip(), None)
+        elif kind is COND_OPEN:
+            name = token.value.strip()
+            fields.setdefault(name, None)
+            conditional.setdefault(name, None)
+    return list(fields), list(conditional)
+
+
+class TemplateInfo:
+    """
+    Índice dos placeholders de um template, calculado uma vez por conteúdo.
+
+    Todas as listas estão na ordem da primeira ocorrência no template. Fica
+    um por template em memória, então é enxuto: nomes de campos internados
+    (uma cópia só para a biblioteca toda), listas iguais compartilham a mesma
+    tupla e 'kinds' é montado quando pedido.
+    """
+
+    __slots__ = (
+        "fields",
+        "normal_fields",
+        "conditional_fields",
+        "automatic_fields",
+        "input_fields",
+        "errors",
+    )
+
+    def __init__(self, fields, normal, conditional, automatic, errors):
+        self.fields = tuple(map(sys.intern, fields))
+        self.normal_fields = _shared(normal, self.fields)
+        self.conditional_fields = _shared(conditional, self.fields)
+        self.automatic_fields = _shared(automatic, self.fields)
+        # Campos que o usuário preenche (normais e condicionais, sem automáticos)
+        if self.automatic_fields:
+            automatic = self.automatic_fields
+            self.input_fields = _shared([f for f in self.fields if f not in automatic], self.fields)
+        else:
+            self.input_fields = self.fields
+        self.errors = tuple(errors)
+
+    @property
+    def kinds(self):
+        """Campo -> FieldKind (tipo, rótulo, opções) dos campos preenchidos pelo usuário."""
+        return {name: field_kind(name) for name in self.input_fields}
+
+    def uses(self, field_name):
+        return field_name in self.input_fields
+
+
+def _shared(names, fields):
+    """'names' como tupla; a própria 'fields' (com os nomes internados) se forem iguais."""
+    names = tuple(names)
+    if names == fields:
+        return fields
+    return tuple(map(sys.intern, names))
+
+
+def build_info(content, automatic=()):
+    """Analisa o template uma vez e monta o TemplateInfo correspondente."""
+    tokens, errors = tokenize(content, automatic)
+    return info_from_tokens(tokens, errors, automatic)
+
+
+def info_from_tokens(tokens, errors, automatic=()):
+    """TemplateInfo a partir do resultado de tokenize() (sem reanalisar o texto)."""
+    fields = {}
+    normal = {}
+    conditional = {}
+    for token in tokens:
+        kind = token.kind
+        if kind is FIELD or kind is AUTOMATIC:
+            name = token.value.strip()
+            fields.setdefault(name, None)
+            normal.setdefault(name, None)
+        elif kind is COND_OPEN:
+            name = token.value.strip()
+            fields.setdefault(name, None)
+            conditional.setdefault(name, None)
+
+    automatic_fields = {n: None for n in fields if is_automatic_name(n, automatic)}
+    return TemplateInfo(
+        fields,
+        [n for n in normal if n not in automatic_fields],
+        conditional,
+        automatic_fields,
+        errors,
+    )
+
+
+EMPTY_INFO = build_info("")
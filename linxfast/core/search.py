@@ -0,0 +1,256 @@
+"""
+Busca de templates por nome, categoria e conteúdo.
+
+Índice invertido de trigramas sobre o texto sem acentos e em minúsculas
+("Conclusão" -> "conclusao"), com ranking BM25. Nome e categoria pesam mais
+que o corpo do template. Os nomes são indexados na hora; o conteúdo fica
+pendente (stale) até refresh(), que lê os templates aos poucos, com limite de
+tempo, para não travar a interface numa biblioteca grande.
+"""
+
+import heapq
+import logging
+import math
+import operator
+import re
+import sys
+import time
+import unicodedata
+from collections import Counter, OrderedDict
+
+from .storage import split_name
+
+# Get the module logger
+logger = logging.getLogger(__name__)
+
+NAME_WEIGHT = 3.0
+CATEGORY_WEIGHT = 2.0
+CONTENT_WEIGHT = 1.0
+
+TRIGRAMS_PER_WORD = 3  # Só os trigramas mais raros de cada palavra entram na pontuação
+DENSE_MIN_DF = 256  # A partir daqui a pontuação do trigrama vira um vetor em cache
+DENSE_CACHE_SIZE = 64  # Vetores guardados (LRU)
+DENSE_DRIFT = 0.05  # Variação de N/tamanho médio que invalida os vetores
+
+_COMBINING = re.compile("[\u0300-\u036f]+")
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def fold(text):
+    """Minúsculas, sem acentos e só letras/dígitos separados por um espaço."""
+    text = _COMBINING.sub("", unicodedata.normalize("NFKD", text)).casefold()
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def trigrams(text):
+    """Contagem dos trigramas de 'text' (já com fold), com espaço nas bordas."""
+    padded = f" {text} "
+    size = len(padded) - 2
+    return Counter(map(padded.__getitem__, map(slice, range(size), range(3, size + 3))))
+
+
+def word_trigrams(word):
+    padded = f" {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """
+    Índice de trigramas dos templates, atualizado de forma incremental.
+
+    A pontuação BM25 de um trigrama frequente é guardada como um vetor
+    denso (uma posição por documento); somar vetores com map(operator.add)
+    roda em C, o que mantém a busca em poucos ms mesmo quando a palavra
+    aparece em quase todos os templates. Trigramas raros são somados um a um.
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self._ids = {}  # nome -> id
+        self._names = []  # id -> nome (None = posição livre)
+        self._free = []  # ids livres, reaproveitados para o espaço de ids não crescer
+        self._terms = {}  # id -> trigramas do documento (para remover)
+        self._lengths = []  # id -> soma dos pesos
+        self._postings = {}  # trigrama -> {id: peso (tf ponderado por campo)}
+        self._total_length = 0.0
+        self._dense = OrderedDict()  # trigrama -> vetor de pontuações (cache)
+        self._dense_basis = (0, 1.0)  # (N, tamanho médio) usados nos vetores
+        self.stale = set()  # nomes com conteúdo ainda não indexado (ou desatualizado)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, name):
+        return name in self._ids
+
+    def index(self, name, content=None):
+        """Indexa (ou reindexa) um template; sem conteúdo, só o nome, e fica stale."""
+        self._remove(name)
+        category, title = split_name(name)
+        terms = Counter()
+        parts = [(title, NAME_WEIGHT), (category or "", CATEGORY_WEIGHT)]
+        if content is None:
+            self.stale.add(name)
+        else:
+            self.stale.discard(name)
+            parts.append((content, CONTENT_WEIGHT))
+        for text, weight in parts:
+            folded = fold(text)
+            if not folded:
+                continue
+            counts = trigrams(folded)
+            if weight != 1.0:
+                counts = {term: count * weight for term, count in counts.items()}
+            terms.update(counts)
+
+        if self._free:
+            doc_id = self._free.pop()
+            self._names[doc_id] = name
+            self._lengths[doc_id] = 0.0
+        else:
+            doc_id = len(self._names)
+            self._names.append(name)
+            self._lengths.append(0.0)
+            self._dense.clear()  # vetores ficaram curtos
+        self._ids[name] = doc_id
+        # Internados: os trigramas de cada documento são fatias novas do texto;
+        # assim _terms e _postings apontam para uma cópia só de cada trigrama
+        self._terms[doc_id] = tuple(map(sys.intern, terms))
+        length = sum(terms.values())
+        self._lengths[doc_id] = length
+        self._total_length += length
+        postings = self._postings
+        dense = self._dense
+        for term, weight in zip(self._terms[doc_id], terms.values()):
+            posting = postings.get(term)
+            if posting is None:
+                postings[term] = {doc_id: weight}
+            else:
+                posting[doc_id] = weight
+                if term in dense:
+                    del dense[term]
+
+    def _remove(self, name):
+        doc_id = self._ids.pop(name, None)
+        if doc_id is None:
+            return
+        self._names[doc_id] = None
+        self._free.append(doc_id)
+        self._total_length -= self._lengths[doc_id]
+        self._lengths[doc_id] = 0.0
+        dense = self._dense
+        for term in self._terms.pop(doc_id):
+            posting = self._postings[term]
+            del posting[doc_id]
+            if not posting:
+                del self._postings[term]
+            if term in dense:
+                del dense[term]
+
+    def remove(self, name):
+        self._remove(name)
+        self.stale.discard(name)
+
+    def mark_stale(self, names):
+        """Conteúdo mudou: o nome continua buscável, o corpo é relido no refresh()."""
+        for name in names:
+            if name not in self._ids:
+                self.index(name)
+            else:
+                self.stale.add(name)
+
+    def refresh(self, load, budget=None):
+        """
+        Indexa o conteúdo dos templates stale com load(nome) -> conteúdo (None
+        se não existe mais). Com 'budget' (s), para ao estourar o tempo.
+        Retorna quantos ainda faltam.
+        """
+        deadline = None if budget is None else time.perf_counter() + budget
+        while self.stale:
+            name = self.stale.pop()
+            content = load(name)
+            if content is None:
+                self.remove(name)
+            else:
+                self.index(name, content)
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+        return len(self.stale)
+
+    def _query_terms(self, query):
+        """Os trigramas mais raros de cada palavra da busca (sem repetir)."""
+        postings = self._postings
+        terms = set()
+        for word in fold(query).split():
+            found = [t for t in word_trigrams(word) if t in postings]
+            found.sort(key=lambda t: len(postings[t]))
+            terms.update(found[:TRIGRAMS_PER_WORD])
+        return terms
+
+    def _impact(self, tf, doc_id, idf, avg_length):
+        k1 = self.k1
+        norm = k1 * (1.0 - self.b + self.b * self._lengths[doc_id] / avg_length)
+        return idf * tf * (k1 + 1.0) / (tf + norm)
+
+    def _dense_scores(self, term, idf, avg_length):
+        vector = self._dense.get(term)
+        if vector is not None:
+            self._dense.move_to_end(term)
+            return vector
+        vector = [0.0] * len(self._names)
+        impact = self._impact
+        for doc_id, tf in self._postings[term].items():
+            vector[doc_id] = impact(tf, doc_id, idf, avg_length)
+        self._dense[term] = vector
+        while len(self._dense) > DENSE_CACHE_SIZE:
+            self._dense.popitem(last=False)
+        return vector
+
+    def search(self, query, k=20):
+        """Os k melhores [(nome, pontuação)] por BM25, do maior para o menor."""
+        terms = self._query_terms(query)
+        count = len(self._ids)
+        if not terms or not count:
+            return []
+        avg_length = self._total_length / count
+
+        # Vetores em cache dependem de N e do tamanho médio; só recalcula se mudaram bastante
+        basis_count, basis_avg = self._dense_basis
+        if (abs(count - basis_count) > DENSE_DRIFT * basis_count
+                or abs(avg_length - basis_avg) > DENSE_DRIFT * basis_avg):
+            self._dense.clear()
+            self._dense_basis = (count, avg_length)
+        else:
+            count, avg_length = basis_count, basis_avg
+
+        scores = None  # vetor denso somado
+        owned = False  # se 'scores' já é uma cópia (pode ser alterado)
+        sparse = {}
+        for term in terms:
+            posting = self._postings[term]
+            df = len(posting)
+            idf = math.log(1.0 + (count - df + 0.5) / (df + 0.5))
+            if df >= DENSE_MIN_DF:
+                vector = self._dense_scores(term, idf, avg_length)
+                if scores is None:
+                    scores = vector
+                else:
+                    scores = list(map(operator.add, scores, vector))
+                    owned = True
+            else:
+                for doc_id, tf in posting.items():
+                    sparse[doc_id] = sparse.get(doc_id, 0.0) + self._impact(tf, doc_id, idf, avg_length)
+
+        names = self._names
+        if scores is None:
+            best = heapq.nlargest(k, sparse.items(), key=operator.itemgetter(1))
+            return [(names[doc_id], score) for doc_id, score in best]
+        if sparse:
+            if not owned:
+                scores = list(scores)
+            for doc_id, score in sparse.items():
+                scores[doc_id] += score
+        best = heapq.nlargest(k, range(len(scores)), key=scores.__getitem__)
+        return [(names[doc_id], scores[doc_id]) for doc_id in best if scores[doc_id] > 0.0]
@@ -0,0 +1,430 @@
+"""
+Backends de armazenamento dos templates e dos metadados.
+
+FileStorage (padrão) é o formato de sempre: um .txt por template, em pastas
+por categoria, e os metadados num templates/meta.json. As gravações são
+atômicas (atomic.py); o meta.json é gravado em segundo plano. SQLiteStorage guarda
+tudo num banco SQLite em modo WAL, com conteúdo, categoria, hash e datas por
+template e as flags do meta (favorito, protegido, nocodb_id) em colunas
+indexadas.
+
+Os dois têm a mesma interface, usada pelo TemplateStore/TemplateManager e
+pelo TemplateMeta:
+    scan()            {nome: assinatura} para detectar mudanças
+    read/write/delete conteúdo de um template (write retorna a assinatura)
+    exists/times      existência e (criado, modificado) em epoch
+    digest            hash do conteúdo (content_hash)
+    load_meta/save_meta
+    transaction()     agrupa várias operações numa transação
+    has_changes()     False quando é certo que nada mudou desde a última vez
+
+Configuração no config.json:
+    "storage": {"backend": "sqlite", "path": "templates/templates.db"}
+Para migrar uma pasta existente: python migrate_storage.py
+"""
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from .atomic import atomic_write, background_writer
+from .paths import remove_legacy, user_cache_dir
+
+# Get the module logger
+logger = logging.getLogger(__name__)
+
+META_FILENAME = "meta.json"
+PACK_FILENAME = "library.lfpack"
+DEFAULT_DB_FILENAME = "templates.db"
+
+
+def content_hash(content):
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def split_name(full_name):
+    """("Categoria", "Nome") de "Categoria / Nome"; categoria None na raiz."""
+    parts = full_name.split(" / ", 1)
+    if len(parts) == 1:
+        return (None, parts[0])
+    return (parts[0], parts[1])
+
+
+class FileStorage:
+    """Um .txt por template (pasta = categoria) e meta.json."""
+
+    kind = "file"
+
+    def __init__(self, base_dir="templates", cache_dir=None):
+        self.base_dir = os.path.abspath(base_dir)
+        self.meta_path = os.path.join(self.base_dir, META_FILENAME)
+        # Retrato compactado da pasta (pack.py), para não abrir um .txt por
+        # template. As assinaturas são desta máquina: fica na pasta de cache
+        # do usuário (paths.py), fora da pasta versionada/sincronizada.
+        self.pack_path = os.path.join(cache_dir or user_cache_dir(self.base_dir), PACK_FILENAME)
+        # Versões anteriores gravavam o pack dentro da pasta de templates
+        remove_legacy(os.path.join(self.base_dir, PACK_FILENAME))
+        # Pasta monitorada pelo LibraryWatcher (inotify, ou scan por stat numa thread)
+        self.watch_dir = self.base_dir
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    def path(self, full_name):
+        category, name = split_name(full_name)
+        if category is None:
+            return os.path.join(self.base_dir, f"{name}.txt")
+        return os.path.join(self.base_dir, category, f"{name}.txt")
+
+    @staticmethod
+    def _signature(stat, inode):
+        return (stat.st_mtime_ns, stat.st_size, inode)
+
+    def scan(self):
+        found = {}
+        self._scan_dir(self.base_dir, None, found)
+        return found
+
+    def _scan_dir(self, path, category, found):
+        try:
+            entries = list(os.scandir(path))
+        except OSError as e:
+            logger.warning(f"Erro ao listar {path}: {e}")
+            return
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name.startswith("."):
+                    continue  # pastas internas (ex.: .history), não são categorias
+                sub = entry.name if category is None else f"{category}/{entry.name}"
+                self._scan_dir(entry.path, sub, found)
+            elif entry.name.endswith(".txt") and entry.is_file():
+                name = entry.name[:-4]
+                full_name = f"{category} / {name}" if category else name
+                try:
+                    # inode() vem da própria listagem (no Windows, stat() do DirEntry traz 0)
+                    found[full_name] = self._signature(entry.stat(), entry.inode())
+                except OSError:
+                    continue
+
+    def exists(self, full_name):
+        return os.path.exists(self.path(full_name))
+
+    def read(self, full_name):
+        with open(self.path(full_name), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def digest(self, full_name):
+        """Hash do conteúdo (content_hash); aqui é preciso ler o arquivo."""
+        return content_hash(self.read(full_name))
+
+    def write(self, full_name, content):
+        path = self.path(full_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Síncrono: a assinatura retornada tem que ser a do arquivo final
+        atomic_write(path, content)
+        try:
+            stat = os.stat(path)
+            return self._signature(stat, stat.st_ino)
+        except OSError:
+            return None
+
+    def delete(self, full_name):
+        path = self.path(full_name)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def times(self, full_name):
+        path = self.path(full_name)
+        try:
+            return (os.path.getctime(path), os.path.getmtime(path))
+        except OSError:
+            return (None, None)
+
+    def load_meta(self):
+        pending = background_writer.pending(self.meta_path)
+        if pending is not None:
+            return json.loads(pending)
+        if not os.path.exists(self.meta_path):
+            return {}
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_meta(self, meta):
+        # Atômico e em segundo plano; gravações seguidas do meta viram uma só
+        background_writer.write(self.meta_path, json.dumps(meta, indent=2, ensure_ascii=False))
+
+    def transaction(self):
+        # Arquivos não têm transação; o TemplateMeta adia o meta.json até o fim do bloco
+        return contextlib.nullcontext()
+
+    def has_changes(self):
+        # Sem inotify, só um scan diz se algo mudou
+        return True
+
+    def close(self):
+        background_writer.flush()
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS templates (
+    name TEXT PRIMARY KEY,
+    category TEXT,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS templates_category ON templates (category, title);
+CREATE INDEX IF NOT EXISTS templates_hash ON templates (hash);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    favorito INTEGER,
+    protegido INTEGER,
+    nocodb_id TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS meta_nocodb_id ON meta (nocodb_id);
+CREATE INDEX IF NOT EXISTS meta_flags ON meta (favorito, protegido);
+"""
+
+_META_COLUMNS = ("favorito", "protegido", "nocodb_id")
+
+
+def _meta_row(name, entry):
+    extra = {k: v for k, v in entry.items() if k not in _META_COLUMNS}
+    favorito = entry.get("favorito")
+    protegido = entry.get("protegido")
+    nocodb_id = entry.get("nocodb_id")
+    return (
+        name,
+        None if favorito is None else int(bool(favorito)),
+        None if protegido is None else int(bool(protegido)),
+        None if nocodb_id is None else str(nocodb_id),
+        json.dumps(extra, ensure_ascii=False, sort_keys=True) if extra else None,
+    )
+
+
+def _meta_entry(row):
+    _, favorito, protegido, nocodb_id, extra = row
+    entry = json.loads(extra) if extra else {}
+    if favorito is not None:
+        entry["favorito"] = bool(favorito)
+    if protegido is not None:
+        entry["protegido"] = bool(protegido)
+    if nocodb_id is not None:
+        entry["nocodb_id"] = nocodb_id
+    return entry
+
+
+class SQLiteStorage:
+    """Templates e metadados num banco SQLite (WAL)."""
+
+    kind = "sqlite"
+
+    def __init__(self, path):
+        # sqlite3 só é importado quando o backend é usado
+        import sqlite3
+
+        self.path = os.path.abspath(path)
+        self.watch_dir = None
+        # O banco já é um arquivo só e indexado; não usa pack
+        self.pack_path = None
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Autocommit: as transações são abertas explicitamente em transaction().
+        # O meta pode ser gravado pela thread do write-behind (TemplateMeta) e a
+        # conexão é uma só: todo acesso a _conn passa por _lock, para que uma
+        # leitura ou um delete de outra thread não entre na transação aberta.
+        self._conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self._lock = threading.RLock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._depth = 0
+        self._meta_rows = {}  # nome -> linha gravada (para salvar só o que mudou)
+        self._data_version = self._read_data_version()
+
+    def _read_data_version(self):
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Transação (reentrante: blocos internos entram na transação externa)."""
+        with self._lock:
+            if self._depth == 0:
+                self._conn.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute("ROLLBACK")
+                    # O meta gravado dentro da transação também voltou
+                    self._meta_rows = {
+                        row[0]: row for row in self._conn.execute(
+                            "SELECT name, favorito, protegido, nocodb_id, extra FROM meta"
+                        )
+                    }
+                raise
+            self._depth -= 1
+            if self._depth == 0:
+                self._conn.execute("COMMIT")
+
+    def scan(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT name, version, hash FROM templates").fetchall()
+        return {name: (version, digest) for name, version, digest in rows}
+
+    def exists(self, full_name):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM templates WHERE name = ?", (full_name,)
+            ).fetchone()
+        return row is not None
+
+    def read(self, full_name):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content FROM templates WHERE name = ?", (full_name,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(full_name)
+        return row[0]
+
+    def digest(self, full_name):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT hash FROM templates WHERE name = ?", (full_name,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(full_name)
+        return row[0]
+
+    def write(self, full_name, content, created_at=None, updated_at=None):
+        category, title = split_name(full_name)
+        digest = content_hash(content)
+        now = time.time()
+        with self.transaction():
+            self._conn.execute(
+                """
+                INSERT INTO templates (name, category, title, content, hash, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET
+                    content = excluded.content,
+                    hash = excluded.hash,
+                    version = templates.version + 1,
+                    updated_at = excluded.updated_at
+                """,
+                (full_name, category, title, content, digest,
+                 created_at or now, updated_at or now),
+            )
+            version = self._conn.execute(
+                "SELECT version FROM templates WHERE name = ?", (full_name,)
+            ).fetchone()[0]
+        return (version, digest)
+
+    def delete(self, full_name):
+        with self._lock:
+            self._conn.execute("DELETE FROM templates WHERE name = ?", (full_name,))
+
+    def times(self, full_name):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_at, updated_at FROM templates WHERE name = ?", (full_name,)
+            ).fetchone()
+        return tuple(row) if row else (None, None)
+
+    def load_meta(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, favorito, protegido, nocodb_id, extra FROM meta"
+            ).fetchall()
+            self._meta_rows = {row[0]: row for row in rows}
+        return {row[0]: _meta_entry(row) for row in rows}
+
+    def save_meta(self, meta):
+        """Grava só as entradas novas, alteradas ou removidas, numa transação."""
+        rows = {name: _meta_row(name, entry) for name, entry in meta.items()}
+        with self._lock:
+            changed = [row for name, row in rows.items() if self._meta_rows.get(name) != row]
+            removed = [(name,) for name in self._meta_rows if name not in rows]
+            if not changed and not removed:
+                return
+            with self.transaction():
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO meta (name, favorito, protegido, nocodb_id, extra) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    changed,
+                )
+                self._conn.executemany("DELETE FROM meta WHERE name = ?", removed)
+            self._meta_rows = rows
+
+    def has_changes(self):
+        # data_version só muda quando outra conexão (outra instância do app) grava
+        version = self._read_data_version()
+        if version == self._data_version:
+            return False
+        self._data_version = version
+        return True
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM templates").fetchone()[0]
+
+    def clear(self):
+        with self.transaction():
+            self._conn.execute("DELETE FROM templates")
+            self._conn.execute("DELETE FROM meta")
+            self._meta_rows = {}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_storage(config=None, template_dir="templates"):
+    """Backend conforme a chave "storage" do config.json (padrão: arquivos)."""
+    config = config or {}
+    backend = config.get("backend", "file")
+    if backend == "sqlite":
+        return SQLiteStorage(config.get("path") or os.path.join(template_dir, DEFAULT_DB_FILENAME))
+    if backend != "file":
+        logger.warning(f"Backend de armazenamento desconhecido: {backend}; usando arquivos")
+    return FileStorage(config.get("path") or template_dir)
+
+
+def migrate_to_sqlite(template_dir="templates", db_path=None, force=False):
+    """
+    Copia os .txt e o meta.json de 'template_dir' para um banco SQLite, numa
+    única transação. Os .txt não são alterados (o meta.json só se tiver
+    entradas duplicadas para unificar, como ao abrir o app).
+
+    Retorna (templates, entradas de meta). Recusa um banco que já tenha
+    templates, a não ser com force=True.
+    """
+    from .meta import TemplateMeta
+
+    source = FileStorage(template_dir)
+    target = SQLiteStorage(db_path or os.path.join(template_dir, DEFAULT_DB_FILENAME))
+    try:
+        if target.count():
+            if not force:
+                raise ValueError(f"{target.path} já tem templates (use force para sobrescrever)")
+            target.clear()
+        # Passa pelo TemplateMeta para unificar entradas duplicadas antes de copiar
+        meta = TemplateMeta(storage=source).meta
+        names = sorted(source.scan())
+        with target.transaction():
+            for name in names:
+                created, modified = source.times(name)
+                target.write(name, source.read(name), created, modified)
+            target.load_meta()
+            target.save_meta(meta)
+        return len(names), len(meta)
+    finally:
+        target.close()
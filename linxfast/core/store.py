@@ -0,0 +1,222 @@
+"""
+Índice dos templates com o conteúdo carregado sob demanda.
+
+Na inicialização só os nomes e as assinaturas do backend (storage.py) são
+lidos: dados de stat para arquivos, versão e hash no SQLite. O conteúdo é
+lido no primeiro acesso e fica num cache LRU
+limitado pelo total de caracteres; o que sai do cache é relido do disco
+quando pedido de novo. Os contadores hits/misses ajudam a ajustar o tamanho
+do cache (chave "template_cache_size" no config.json).
+
+Cada scan compara o snapshot (para arquivos: mtime_ns, tamanho, inode) com o
+anterior e devolve um TemplateChanges com o que foi criado, removido ou
+alterado; só esses templates perdem o conteúdo em cache.
+
+Com um pack (pack.py), o conteúdo dos templates cuja assinatura não mudou
+desde que o pack foi gerado vem dele, sem abrir os .txt.
+"""
+
+import logging
+from collections import OrderedDict
+
+# Get the module logger
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = 8 * 1024 * 1024  # caracteres
+
+
+class TemplateChanges:
+    """
+    Mudanças na biblioteca desde o último scan (nomes "Categoria / Nome").
+
+    'select' é uma sugestão de template a selecionar nas janelas (ex.: o que
+    acabou de ser importado); não indica mudança de arquivo.
+    """
+
+    __slots__ = ("added", "removed", "modified", "select")
+
+    def __init__(self, added=(), removed=(), modified=(), select=None):
+        self.added = frozenset(added)
+        self.removed = frozenset(removed)
+        self.modified = frozenset(modified)
+        self.select = select
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.modified or self.select)
+
+    def __repr__(self):
+        return (
+            f"TemplateChanges(added={sorted(self.added)}, removed={sorted(self.removed)}, "
+            f"modified={sorted(self.modified)}, select={self.select!r})"
+        )
+
+
+class TemplateStore:
+    """
+    Mapeamento "Categoria / Nome" -> conteúdo, com a mesma interface de leitura
+    de um dict (in, iteração, len, get, []). Escritas passam por set()/remove(),
+    chamados depois de gravar no backend.
+    """
+
+    def __init__(self, storage, max_size=DEFAULT_CACHE_SIZE):
+        self.storage = storage
+        self.max_size = max_size
+        self.index = {}  # nome -> assinatura no backend
+        self._pending = {}  # nome -> "added"/"removed"/"modified" ainda não reportado
+        # Muda a cada set/remove/scan: diz se um storage.scan() feito em outra
+        # thread (LibraryWatcher) ainda vale para o índice atual
+        self.generation = 0
+        self._cache = OrderedDict()  # nome -> conteúdo, do menos para o mais recente
+        self._cache_size = 0
+        # LibraryPack (pack.py) com o conteúdo dos templates que não mudaram, se houver
+        self.pack = None
+        self.hits = 0
+        self.misses = 0
+
+    # --- interface de dict (leitura) ---
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+    def keys(self):
+        return self.index.keys()
+
+    def __getitem__(self, name):
+        content = self.get(name, None)
+        if content is None:
+            raise KeyError(name)
+        return content
+
+    def get(self, name, default=None):
+        content = self._cache.get(name)
+        if content is not None:
+            self.hits += 1
+            self._cache.move_to_end(name)
+            return content
+        if name not in self.index:
+            return default
+        self.misses += 1
+        try:
+            content = self._read(name)
+        except Exception as e:
+            logger.warning(f"Erro ao ler template {name}: {e}")
+            return default
+        self._remember(name, content)
+        return content
+
+    def load(self, name):
+        """
+        Conteúdo sem passar pelo LRU (nem contar hit/miss): usa o cache se já
+        estiver lá, senão lê do backend sem guardar. Para varreduras como a
+        indexação da busca, que não devem expulsar os templates em uso.
+        """
+        content = self._cache.get(name)
+        if content is not None:
+            return content
+        if name not in self.index:
+            return None
+        try:
+            return self._read(name)
+        except Exception as e:
+            logger.warning(f"Erro ao ler template {name}: {e}")
+            return None
+
+    def _read(self, name):
+        if self.pack is not None:
+            content = self.pack.content(name, self.index.get(name))
+            if content is not None:
+                return content
+        return self.storage.read(name)
+
+    # --- escrita ---
+
+    def set(self, name, signature, content):
+        """Registra o conteúdo recém-gravado ('signature' é o retorno de storage.write)."""
+        if name not in self.index:
+            self._pending[name] = "modified" if self._pending.get(name) == "removed" else "added"
+        elif self._pending.get(name) != "added":
+            self._pending[name] = "modified"
+        self.index[name] = signature
+        self.generation += 1
+        self._forget(name)
+        self._remember(name, content)
+
+    def remove(self, name):
+        self.generation += 1
+        if self.index.pop(name, None) is not None:
+            if self._pending.get(name) == "added":
+                del self._pending[name]
+            else:
+                self._pending[name] = "removed"
+        self._forget(name)
+
+    def scan(self, snapshot=None):
+        """
+        Reindexa o backend e retorna um TemplateChanges com o que mudou desde
+        o último scan, incluindo o que foi gravado por set() e remove() nesse
+        meio tempo. Só os alterados/removidos saem do cache.
+
+        'snapshot' é o resultado de um storage.scan() já feito (ex.: numa
+        thread), usado no lugar de um novo; só vale se 'generation' não mudou
+        desde que ele começou.
+        """
+        old_index = self.index
+        self.index = self.storage.scan() if snapshot is None else snapshot
+        self.generation += 1
+        changes, self._pending = self._pending, {}
+        for name, signature in old_index.items():
+            if name not in self.index:
+                changes[name] = "removed"
+            elif self.index[name] != signature or signature is None:
+                changes[name] = "modified"
+            else:
+                continue
+            self._forget(name)
+        for name in self.index.keys() - old_index.keys():
+            changes[name] = "added"
+        return TemplateChanges(
+            (n for n, kind in changes.items() if kind == "added"),
+            (n for n, kind in changes.items() if kind == "removed"),
+            (n for n, kind in changes.items() if kind == "modified"),
+        )
+
+    # --- cache ---
+
+    def _remember(self, name, content):
+        size = len(content)
+        if size > self.max_size:
+            return
+        self._cache[name] = content
+        self._cache_size += size
+        while self._cache_size > self.max_size:
+            _, evicted = self._cache.popitem(last=False)
+            self._cache_size -= len(evicted)
+
+    def forget(self, name):
+        """Descarta o conteúdo em cache; o próximo get() relê do backend."""
+        self._forget(name)
+
+    def _forget(self, name):
+        content = self._cache.pop(name, None)
+        if content is not None:
+            self._cache_size -= len(content)
+
+    def clear_cache(self):
+        self._cache.clear()
+        self._cache_size = 0
+
+    def stats(self):
+        return {
+            "templates": len(self.index),
+            "cached": len(self._cache),
+            "cache_size": self._cache_size,
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,187 @@
+"""
+Detecção de mudanças na pasta de templates (ex.: biblioteca sincronizada).
+
+LibraryWatcher.poll() é chamado periodicamente pela interface (timer do Tk).
+No Linux usa inotify, quando disponível: o scan só roda se o kernel avisou
+de alguma mudança em .txt ou pastas. Nos demais casos (Windows, OneDrive, ou
+se inotify falhar, ex.: limite de watches) o scan é por stat, que só compara
+nomes, mtime, tamanho e inode, sem ler conteúdo; numa biblioteca grande numa
+pasta sincronizada isso ainda custa dezenas de ms, então ele roda numa thread
+e o poll() seguinte aplica o resultado na thread de quem chamou. No backend
+SQLite o scan só roda quando outra conexão gravou no banco (PRAGMA
+data_version), na própria chamada.
+
+As mudanças chegam às janelas pelos listeners do TemplateManager.
+"""
+
+import logging
+import os
+import struct
+import sys
+import threading
+
+from .store import TemplateChanges
+
+# Get the module logger
+logger = logging.getLogger(__name__)
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+_WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+)
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class _Inotify:
+    """Watches inotify (não bloqueantes) em uma pasta e todas as subpastas."""
+
+    def __init__(self, root):
+        # ctypes só é importado aqui: pesa no tempo de import do núcleo
+        import ctypes
+        import ctypes.util
+
+        self._ctypes = ctypes
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+        self.root = root
+        self._watches = {}  # wd -> pasta
+        try:
+            self._add_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_tree(self, path):
+        self._add_watch(path)
+        for dirpath, dirnames, _ in os.walk(path):
+            # Pastas ocultas (ex.: .history) não têm templates
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            for dirname in dirnames:
+                self._add_watch(os.path.join(dirpath, dirname))
+
+    def _add_watch(self, path):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            raise OSError(self._ctypes.get_errno(), f"inotify_add_watch falhou em {path}")
+        self._watches[wd] = path
+
+    def read_changes(self):
+        """Lê os eventos pendentes; True se algum afeta templates."""
+        dirty = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return dirty
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    dirty = True
+                elif mask & IN_IGNORED:
+                    self._watches.pop(wd, None)
+                elif mask & IN_ISDIR:
+                    if name.startswith(b"."):
+                        continue
+                    dirty = True
+                    if mask & (IN_CREATE | IN_MOVED_TO) and wd in self._watches:
+                        self._add_tree(os.path.join(self._watches[wd], os.fsdecode(name)))
+                elif mask & (IN_DELETE_SELF | IN_MOVE_SELF) or name.endswith(b".txt"):
+                    dirty = True
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class LibraryWatcher:
+    """
+    Recarrega o índice do TemplateManager quando a pasta muda no disco.
+
+    mode é "inotify" ou "stat" (polling). poll() retorna o TemplateChanges do
+    scan (vazio se nada mudou); os listeners do manager já foram notificados.
+    Com background_scan, o scan por stat de uma pasta roda numa thread: cada
+    poll() aplica o scan que terminou e começa o próximo.
+    """
+
+    def __init__(self, manager, use_inotify=True, background_scan=True):
+        self.manager = manager
+        self._inotify = None
+        self.background_scan = background_scan
+        self._scan_thread = None
+        self._scanned = None  # (generation, snapshot) do último scan em thread
+        watch_dir = manager.storage.watch_dir  # None no SQLite
+        if use_inotify and watch_dir and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify(watch_dir)
+            except (OSError, AttributeError) as e:
+                # AttributeError: libc sem inotify_init1
+                logger.warning(f"inotify indisponível, usando polling por stat: {e}")
+        self.mode = "inotify" if self._inotify else "stat"
+        logger.info(f"Monitorando templates ({manager.storage.kind}, {self.mode})")
+
+    def poll(self):
+        if self._inotify is not None:
+            try:
+                if not self._inotify.read_changes():
+                    return TemplateChanges()
+            except OSError as e:
+                logger.warning(f"Falha no inotify, voltando ao polling por stat: {e}")
+                self._inotify.close()
+                self._inotify = None
+                self.mode = "stat"
+        elif self.background_scan and self.manager.storage.watch_dir:
+            return self._poll_in_thread()
+        elif not self.manager.storage.has_changes():
+            return TemplateChanges()
+        return self.manager.load_templates()
+
+    def _poll_in_thread(self):
+        if self._scan_thread is not None and self._scan_thread.is_alive():
+            return TemplateChanges()
+        changes = TemplateChanges()
+        scanned, self._scanned = self._scanned, None
+        if scanned is not None:
+            generation, snapshot = scanned
+            # Se o app gravou ou reindexou durante o scan, o snapshot está
+            # velho (mostraria o que acabou de ser salvo como removido)
+            if snapshot is not None and generation == self.manager.templates.generation:
+                changes = self.manager.apply_scan(snapshot)
+        generation = self.manager.templates.generation
+        self._scan_thread = threading.Thread(
+            target=self._scan, args=(generation,), name="linxfast-scan", daemon=True
+        )
+        self._scan_thread.start()
+        return changes
+
+    def _scan(self, generation):
+        try:
+            snapshot = self.manager.storage.scan()
+        except Exception as e:
+            logger.error(f"Erro ao verificar a pasta de templates: {e}")
+            snapshot = None
+        self._scanned = (generation, snapshot)
+
+    def close(self):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
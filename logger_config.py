@@ -1,6 +1,5 @@
 import logging
 import os
-from logging.handlers import RotatingFileHandler
 import types
 
 
@@ -20,10 +19,18 @@ def log_function_call(func):
     return wrapper
 
 
+def no_auto_log(func):
+    """Marks a method to be skipped by auto_log_functions (hot lookups called per item)."""
+    func._no_auto_log = True
+    return func
+
+
 def auto_log_functions(cls):
     """Class decorator to automatically log all methods of a class."""
     for attr_name, attr_value in cls.__dict__.items():
         if isinstance(attr_value, types.FunctionType):  # Check if it's a function
+            if getattr(attr_value, "_no_auto_log", False):
+                continue
             setattr(cls, attr_name, log_function_call(attr_value))
     return cls
 
@@ -39,6 +46,9 @@ def get_log_level():
 
 def setup_logging():
     """Configura o sistema de logging com níveis apropriados e formatação."""
+    # Importado aqui: logging.handlers carrega socket/pickle e só o app precisa dele
+    from logging.handlers import RotatingFileHandler
+
     # Cria diretório de logs se não existir
     log_dir = "logs"
     os.makedirs(log_dir, exist_ok=True)
@@ -78,7 +88,7 @@ def setup_logging():
         "main_window",
         "quick_template_popup",
         "template_editor",
-        "template_manager",
+        "linxfast",
     ]
     for module in modules:
         logger = logging.getLogger(module)
@@ -1,16 +1,26 @@
 from typing import Self
 import customtkinter as ctk
 import pyperclip
-import json
 import os
-import re
-import datetime
 import sys
 import logging
 import tkinter as tk
 import requests
 from template_editor import TemplateEditor
-from template_manager import TemplateManager
+from template_picker import TemplatePicker
+from linxfast.core import (
+    DEFAULT_CACHE_SIZE,
+    ConfigStore,
+    ExternalDataService,
+    LibraryWatcher,
+    LivePreview,
+    TemplateManager,
+    field_kind,
+    open_storage,
+    placeholder_engine,
+    process_conditionals,
+    template_compiler,
+)
 from theme_manager import ThemeManager
 from dpm import DailyPasswordManager
 from settings_window import SettingsWindow
@@ -30,78 +40,6 @@ except ImportError:
 logger = logging.getLogger("main_window")
 
 
-# --- PlaceholderEngine e instância global ---
-@auto_log_functions
-class PlaceholderEngine:
-    """
-    Manages dynamic placeholder substitution in text templates.
-
-    Allows registration of custom handlers for placeholders and provides built-in support for date/time placeholders like $Agora$ and $Agora[formato]$.
-    """
-
-    def __init__(self):
-        self.handlers = {}
-
-    def register_handler(self, name, func):
-        self.handlers[name] = func
-
-    def process(self, text):
-        def replacer(match):
-            ph = match.group(1)
-            # Handler customizado: $Agora[formato]$ ou $Agora$
-            if ph == "Agora":
-                # Formato padrão para $Agora$
-                fmt = "%H:%M"
-                try:
-                    return datetime.datetime.now().strftime(fmt)
-                except Exception:
-                    return match.group(0)
-            if ph.startswith("Agora[") and ph.endswith("]"):
-                fmt = ph[6:-1]
-                try:
-                    return datetime.datetime.now().strftime(fmt)
-                except Exception:
-                    return match.group(0)
-            # Handler padrão
-            handler = self.handlers.get(ph)
-            if handler:
-                return handler()
-            return match.group(0)
-
-        # Regex: $Nome$ ou $Agora[...formato...]$ ou $Agora$
-        return re.sub(r"\$([a-zA-Z0-9 _\-çÇáéíóúãõâêîôûÀ-ÿ\[\]%:/]+)\$", replacer, text)
-
-
-# Instância global da engine
-placeholder_engine = PlaceholderEngine()
-# Handlers padrões
-placeholder_engine.register_handler(
-    "Hoje", lambda: datetime.datetime.now().strftime("%d/%m/%Y")
-)
-DIAS_SEMANA_PT = {
-    "Monday": "segunda-feira",
-    "Tuesday": "terça-feira",
-    "Wednesday": "quarta-feira",
-    "Thursday": "quinta-feira",
-    "Friday": "sexta-feira",
-    "Saturday": "sábado",
-    "Sunday": "domingo",
-}
-
-placeholder_engine.register_handler(
-    "DiaSemana",
-    lambda: DIAS_SEMANA_PT.get(
-        datetime.datetime.now().strftime("%A"), datetime.datetime.now().strftime("%A")
-    ),
-)
-placeholder_engine.register_handler(
-    "HoraMinuto", lambda: datetime.datetime.now().strftime("%H:%M")
-)
-placeholder_engine.register_handler(
-    "HoraMinutoSegundo", lambda: datetime.datetime.now().strftime("%H:%M:%S")
-)
-
-
 @auto_log_functions
 class TemplateApp(ctk.CTk):
     def __init__(self):
@@ -120,9 +58,17 @@ class TemplateApp(ctk.CTk):
         self.geometry("360x535")
         self.visual_feedback_enabled = True
         self._after_ids = set()  # IDs dos afters agendados
+        self.config_store = ConfigStore()
 
         # Carrega config de campos expansíveis
         self.expandable_fields = self.load_expandable_fields_config()
+        # Painel de pré-visualização ao vivo (botão direito em "Visualizar Resultado")
+        self.live_preview_enabled = bool(self.config_store.get("live_preview", False))
+        self.live_preview_box = None
+        self._live_preview = None
+        self._preview_idle_id = None
+        self._search_idle_id = None
+        self._search_warm_id = None
 
         # Carrega config de tema e aparência
         self.theme_name, self.appearance_mode = self.load_theme_config()
@@ -135,8 +81,36 @@ class TemplateApp(ctk.CTk):
         else:
             ctk.set_default_color_theme(theme_path)
 
+        # Placeholders com dados externos (config.json: "external_handlers").
+        # Registrados antes do TemplateManager para já contarem como automáticos.
+        self.external_data = ExternalDataService(placeholder_engine)
+        self.external_data.load_config(self.config_store.get("external_handlers", []))
+
         # Inicialização das classes
-        self.template_manager = TemplateManager()
+        # Conteúdo dos templates é lido sob demanda; "template_cache_size"
+        # (caracteres) limita quanto fica em memória
+        # "storage" escolhe o backend: pasta de .txt (padrão) ou SQLite
+        self.template_manager = TemplateManager(
+            automatic_names=placeholder_engine.handlers,
+            cache_size=self.config_store.get("template_cache_size", DEFAULT_CACHE_SIZE),
+            storage=open_storage(self.config_store.get("storage")),
+        )
+        # Pré-visualização e cópia reaproveitam os tokens guardados da última execução
+        template_compiler.parse_cache = self.template_manager.parse_cache
+        # Mudanças na pasta (biblioteca sincronizada, outro editor) viram eventos
+        # do TemplateManager; seletores e editor se inscrevem neles
+        self.library_watcher = LibraryWatcher(
+            self.template_manager,
+            use_inotify=self.config_store.get("template_watch_inotify", True),
+        )
+        self.library_watch_interval = int(
+            self.config_store.get("template_watch_interval", 2000)
+        )
+        self._library_poll_id = None
+        self._library_refresh_id = None
+        self._pending_select = None
+        self._reload_current_template = False
+        self.template_manager.add_listener(self._on_templates_changed)
         self.theme_manager = ThemeManager(
             theme_name=self.theme_name, mode=self.appearance_mode
         )
@@ -171,6 +145,14 @@ class TemplateApp(ctk.CTk):
         self.minsize(392, 525)  # 392px cobre selector + botões + paddings
 
         self._safe_after(0, self.apply_saved_geometry)
+        self._library_poll_id = self._safe_after(
+            self.library_watch_interval, self._poll_template_library
+        )
+        self._schedule_search_warmup()
+        # Limites do histórico de revisões, depois que a janela já abriu
+        self._safe_after(5000, lambda: self.template_manager.compact_history(background=True))
+        # Monta o pack da biblioteca numa thread, para o fechamento não ler os templates
+        self._safe_after(8000, lambda: self.template_manager.prepare_pack(background=True))
         self.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def _build_main_interface(self):
@@ -190,6 +172,21 @@ class TemplateApp(ctk.CTk):
         selector_container = ctk.CTkFrame(selector_frame, fg_color="transparent")
         selector_container.pack(side="left", fill="x", expand=True, padx=(0, 5))
 
+        # Type-ahead pelo nome (sugestões logo abaixo); o mesmo texto filtra o
+        # seletor por nome, categoria e conteúdo (SearchIndex)
+        self.template_search = TemplatePicker(
+            selector_container,
+            placeholder_text="🔍 Buscar template...",
+            width=300,
+            command=self._on_template_picked,
+            on_query=self._on_template_search_key,
+            on_submit=self._select_first_search_result,
+            on_cancel=self._clear_template_search,
+            display=self.template_manager.meta.get_display_name,
+        )
+        self.template_search.pack(side="top", fill="x", expand=True, pady=(0, 3))
+        self._update_template_picker()
+
         self.template_selector = ctk.CTkOptionMenu(
             selector_container,
             variable=self.current_template_display,
@@ -198,7 +195,7 @@ class TemplateApp(ctk.CTk):
             width=300,
             dynamic_resizing=False,  # Evita que o menu cresça além do width especificado
         )
-        self.template_selector.pack(side="left", fill="x", expand=True)
+        self.template_selector.pack(side="top", fill="x", expand=True)
 
         # Botão de Configurações ao lado do seletor de template
         self.settings_button = ctk.CTkButton(
@@ -261,14 +258,16 @@ class TemplateApp(ctk.CTk):
             hover_color="#6A4BB3",
             command=self.copy_template,
         ).grid(row=2, column=0, pady=(5, 5))
-        # Botão de Visualizar Template
-        ctk.CTkButton(
+        # Botão de Visualizar Template (botão direito liga/desliga o painel ao vivo)
+        preview_button = ctk.CTkButton(
             self.main_frame,
             text="Visualizar Resultado",
             fg_color="#5E35B1",
             hover_color="#512DA8",
             command=self.preview_template,
-        ).grid(row=3, column=0, pady=(5, 5))
+        )
+        preview_button.grid(row=3, column=0, pady=(5, 5))
+        preview_button.bind("<Button-3>", self.toggle_live_preview)
         # Botão de Editar Template
         ctk.CTkButton(
             self.main_frame,
@@ -298,6 +297,10 @@ class TemplateApp(ctk.CTk):
             command=self.open_quick_mode,
         ).grid(row=6, column=0, pady=(5, 5))
 
+        # Painel de pré-visualização ao vivo (linha 7), se ativado
+        self.live_preview_box = None
+        self._build_live_preview()
+
         # --- Frame inferior para label de crédito e botão de info alinhados ---
         bottom_frame = ctk.CTkFrame(self.main_frame, fg_color="transparent")
         bottom_frame.grid(row=100, column=0, sticky="ew", pady=0, padx=0)
@@ -545,6 +548,7 @@ class TemplateApp(ctk.CTk):
             self._update_single_field_border(field_name, widget)
 
     def _push_undo(self):
+        self.schedule_live_preview_update()
         if getattr(self, "_restoring_undo_redo", False):
             return
         if not hasattr(self, "_undo_stack"):
@@ -556,6 +560,25 @@ class TemplateApp(ctk.CTk):
                 self._undo_stack.pop(0)
         # Limpa o redo ao novo push
         self._redo_stack.clear()
+        self._schedule_external_prefetch()
+
+    def _schedule_external_prefetch(self, delay=400):
+        """Agenda (com debounce) a busca dos placeholders externos do template atual."""
+        if not self.external_data.handlers:
+            return
+        after_id = getattr(self, "_prefetch_after_id", None)
+        if after_id:
+            self._safe_after_cancel(after_id)
+        self._prefetch_after_id = self._safe_after(delay, self._prefetch_external_data)
+
+    def _prefetch_external_data(self):
+        self._prefetch_after_id = None
+        info = self.template_manager.get_template_info(self.current_template)
+        names = [n for n in info.automatic_fields if n in self.external_data.handlers]
+        if names:
+            values = self._get_fields_snapshot()
+            values.pop("_dynamic_fields", None)
+            self.external_data.prefetch(values, names)
 
     def undo_fields(self, event=None):
         if not hasattr(self, "_undo_stack"):
@@ -565,6 +588,7 @@ class TemplateApp(ctk.CTk):
             self._redo_stack.append(current)
             snapshot = self._undo_stack[-1]
             self._restore_fields_snapshot(snapshot)
+            self.schedule_live_preview_update()
             self.show_snackbar("Desfeito!", toast_type="info")
 
     def redo_fields(self, event=None):
@@ -578,6 +602,7 @@ class TemplateApp(ctk.CTk):
                 self._undo_stack.append(snapshot)
             finally:
                 self._restoring_undo_redo = False
+            self.schedule_live_preview_update()
             self.show_snackbar("Refeito!", toast_type="info")
 
     def _bind_undo_redo_shortcuts(self):
@@ -642,36 +667,9 @@ class TemplateApp(ctk.CTk):
             entry.configure(border_color=darker_border)
             return
 
-        # Analisa o template atual
-        template = self.template_manager.get_template(self.current_template)
-        if not template:
-            entry.configure(border_color=darker_border)
-            return
-
-        # Extrai campos normais
-        normal_fields = self.template_manager.extract_placeholders(template)
-        field_in_template = False
-
-        # Verifica campos normais
-        if field_name in normal_fields:
-            if (
-                field_name not in placeholder_engine.handlers
-                and not field_name.startswith("Agora")
-            ):
-                field_in_template = True
-
-        # Verifica campos condicionais
-        if not field_in_template:
-            for match in re.findall(
-                r"\$([a-zA-Z0-9 _\-çÇáéíóúãõâêîôûÀ-ÿ\[\]%:/]+)\?", template
-            ):
-                if match.strip() == field_name:
-                    if (
-                        field_name not in placeholder_engine.handlers
-                        and not field_name.startswith("Agora")
-                    ):
-                        field_in_template = True
-                        break
+        # Índice pré-calculado do template atual (campos normais e condicionais)
+        info = self.template_manager.get_template_info(self.current_template)
+        field_in_template = info.uses(field_name)
 
         # Configura a cor baseada no uso do campo no template
         if field_in_template:
@@ -707,34 +705,13 @@ class TemplateApp(ctk.CTk):
         ):
             return
 
-        # Se não recebeu placeholders, analisa o template atual
+        # Se não recebeu placeholders, usa o índice do template atual (sem automáticos)
         if placeholders is None:
-            template = self.template_manager.get_template(self.current_template)
-            if not template:
-                return
-
-            # Obtém todos os campos do template atual
-            placeholders = set()
-
-            # Extrai campos normais
-            normal_fields = self.template_manager.extract_placeholders(template)
-            for field in normal_fields:
-                # Remove campos automáticos
-                if field not in placeholder_engine.handlers and not field.startswith(
-                    "Agora"
-                ):
-                    placeholders.add(field.strip())
-
-            # Adiciona campos condicionais (com ?), exceto automáticos
-            for match in re.findall(
-                r"\$([a-zA-Z0-9 _\-çÇáéíóúãõâêîôûÀ-ÿ\[\]%:/]+)\?", template
-            ):
-                field = match.strip()
-                # Adiciona apenas se não for um campo automático
-                if field not in placeholder_engine.handlers and not field.startswith(
-                    "Agora"
-                ):
-                    placeholders.add(field)
+            placeholders = set(
+                self.template_manager.get_template_info(
+                    self.current_template
+                ).input_fields
+            )
 
         # Processa cada campo apenas uma vez
         processed_fields = set()
@@ -767,16 +744,7 @@ class TemplateApp(ctk.CTk):
         field_label = name
         radio_options = None
 
-        m = re.match(r"\[(checkbox|switch)\](.+)", name)
-        if m:
-            field_type = m.group(1)
-            field_label = m.group(2).strip()
-        else:
-            m = re.match(r"\[radio:([^\]]+)\](.+)", name)
-            if m:
-                field_type = "radio"
-                radio_options = [opt.strip() for opt in m.group(1).split("|")]
-                field_label = m.group(2).strip()
+        field_type, field_label, radio_options = field_kind(name)
 
         # LABEL
         label = ctk.CTkLabel(
@@ -795,6 +763,7 @@ class TemplateApp(ctk.CTk):
             entry = ctk.CTkCheckBox(row_frame, text="", variable=var)
             entry.grid(row=0, column=1, sticky="w")
             self.entries[name] = entry
+            var.trace_add("write", lambda *_: self.schedule_live_preview_update())
         elif field_type == "switch":
             var = ctk.StringVar(value=value if value else "Sim")
             entry = ctk.CTkSwitch(
@@ -806,6 +775,7 @@ class TemplateApp(ctk.CTk):
             )
             entry.grid(row=0, column=1, sticky="w")
             self.entries[name] = entry
+            var.trace_add("write", lambda *_: self.schedule_live_preview_update())
         elif field_type == "radio" and radio_options:
             var = ctk.StringVar(
                 value=value if value in radio_options else radio_options[0]
@@ -816,6 +786,7 @@ class TemplateApp(ctk.CTk):
                 btn = ctk.CTkRadioButton(radio_frame, text=opt, variable=var, value=opt)
                 btn.pack(side="left", padx=2)
             self.entries[name] = var
+            var.trace_add("write", lambda *_: self.schedule_live_preview_update())
         # --- Para campos expansíveis definidos pelo usuário ---
         elif name in getattr(self, "expandable_fields", []):
             entry = ctk.CTkEntry(row_frame, placeholder_text=f"{name}")
@@ -1052,35 +1023,19 @@ class TemplateApp(ctk.CTk):
     def save_field_order(self):
         """Salva a ordem dos campos dinâmicos do template atual no arquivo config.json."""
         try:
-            if os.path.exists("config.json"):
-                with open("config.json", "r", encoding="utf-8") as f:
-                    config = json.load(f)
-            else:
-                config = {}
-
-            if "field_orders" not in config:
-                config["field_orders"] = {}
-
-            config["field_orders"][self.current_template] = self.dynamic_fields
-
-            with open("config.json", "w", encoding="utf-8") as f:
-                json.dump(config, f, indent=4)
+            self.config_store.set_field_order(self.current_template, self.dynamic_fields)
         except Exception as e:
             print(f"[ERRO ao salvar ordem dos campos]: {e}")
 
     def load_field_order(self):
         """Carrega a ordem dos campos dinâmicos do template atual, se existir."""
         try:
-            if os.path.exists("config.json"):
-                with open("config.json", "r", encoding="utf-8") as f:
-                    config = json.load(f)
-                field_orders = config.get("field_orders", {})
-                order = field_orders.get(self.current_template)
-                if order:
-                    # Garante que só mantenha campos realmente presentes no template
-                    self.dynamic_fields = [
-                        f for f in order if f in self.dynamic_fields
-                    ] + [f for f in self.dynamic_fields if f not in order]
+            order = self.config_store.get_field_order(self.current_template)
+            if order:
+                # Garante que só mantenha campos realmente presentes no template
+                self.dynamic_fields = [
+                    f for f in order if f in self.dynamic_fields
+                ] + [f for f in self.dynamic_fields if f not in order]
         except Exception as e:
             print(f"[ERRO ao carregar ordem dos campos]: {e}")
 
@@ -1202,19 +1157,11 @@ class TemplateApp(ctk.CTk):
         template = self.template_manager.get_template(self.current_template)
         tem_vazios = False
 
-        # Descobre quais campos realmente estão no template atual
-        placeholders = set(self.template_manager.extract_placeholders(template))
-
-        cond_fields = set()
-        for match in re.findall(
-            r"\$([a-zA-Z0-9 _\-çÇáéíóúãõâêîôûÀ-ÿ\[\]%:/]+)\?", template
-        ):
-            cond_fields.add(match.strip())
-
-        all_fields = placeholders | cond_fields
+        # Descobre quais campos realmente estão no template atual (inclui condicionais)
+        info = self.template_manager.get_template_info(self.current_template)
 
         # Filtra apenas os campos presentes no template e que estão na interface
-        fields_to_validate = [k for k in self.entries if k in all_fields]
+        fields_to_validate = [k for k in self.entries if info.uses(k)]
 
         # 1. Coleta valores dos campos
         field_values = {}
@@ -1261,15 +1208,8 @@ class TemplateApp(ctk.CTk):
                     )
                 tem_vazios = True
 
-        # 2. Processa lógica condicional no template
-        template = self.process_conditionals(template, field_values)
-
-        # 3. Substitui placeholders simples
-        for key, value in field_values.items():
-            template = template.replace(f"${key}$", value if value else "")
-
-        # 4. Substitui placeholders dinâmicos
-        template = placeholder_engine.process(template)
+        # 2. Renderiza condicionais, campos e placeholders automáticos em uma passada
+        template = template_compiler.render(template, field_values)
 
         pyperclip.copy(template)
         self.pulse_window()
@@ -1294,13 +1234,8 @@ class TemplateApp(ctk.CTk):
             else:
                 value = str(entry.get())
             field_values[key] = value
-        # Processa lógica condicional
-        template = self.process_conditionals(template, field_values)
-        # Substitui placeholders simples
-        for key, value in field_values.items():
-            template = template.replace(f"${key}$", value if value else "")
-        # Substitui placeholders dinâmicos
-        template = placeholder_engine.process(template)
+        # Renderiza condicionais, campos e placeholders automáticos em uma passada
+        template = template_compiler.render(template, field_values)
 
         preview = ctk.CTkToplevel(self)
         preview.title("Visualização do Template")
@@ -1313,6 +1248,101 @@ class TemplateApp(ctk.CTk):
         box.configure(state="disabled")
         box.pack(expand=True, fill="both", padx=20, pady=20)
 
+    # --- Pré-visualização ao vivo (painel fixo) ---
+    def _collect_field_values(self):
+        """Valores dos campos do template atual, convertidos como no copy_template."""
+        info = self.template_manager.get_template_info(self.current_template)
+        field_values = {}
+        for key, entry in self.entries.items():
+            if not info.uses(key):
+                continue
+            if hasattr(entry, "winfo_exists") and not entry.winfo_exists():
+                continue
+            if isinstance(entry, ctk.CTkCheckBox):
+                value = "Sim" if entry.get() else "Não"
+            elif isinstance(entry, ctk.CTkTextbox):
+                value = entry.get("1.0", "end-1c")
+            else:
+                value = str(entry.get())
+            field_values[key] = value
+        return field_values
+
+    def toggle_live_preview(self, event=None):
+        self.live_preview_enabled = not self.live_preview_enabled
+        self.config_store.update(live_preview=self.live_preview_enabled)
+        self._build_live_preview()
+        self.adjust_window_height()
+
+    def _build_live_preview(self):
+        box = self.live_preview_box
+        if not self.live_preview_enabled:
+            if box is not None:
+                box.destroy()
+            self.live_preview_box = None
+            self._live_preview = None
+            return
+        if box is None or not box.winfo_exists():
+            self.live_preview_box = ctk.CTkTextbox(
+                self.main_frame, height=160, wrap="word", state="disabled"
+            )
+            self.live_preview_box.grid(row=7, column=0, sticky="nsew", padx=5, pady=(5, 5))
+        self.refresh_live_preview()
+
+    def refresh_live_preview(self):
+        """Renderiza o painel inteiro (ao ativar ou trocar de template)."""
+        box = self.live_preview_box
+        if box is None:
+            return
+        self._live_preview = None
+        box.configure(state="normal")
+        box.delete("1.0", "end")
+        template = self.template_manager.get_template(self.current_template)
+        if template:
+            preview = LivePreview(template_compiler.compile(template))
+            # Cada segmento recebe uma tag; o Tk ajusta as faixas a cada edição
+            for index, text in enumerate(preview.render(self._collect_field_values())):
+                if text:
+                    box.insert("end", text, f"seg{index}")
+            self._live_preview = preview
+        box.configure(state="disabled")
+
+    def schedule_live_preview_update(self):
+        """Atualiza o painel quando o Tk ficar ocioso (várias teclas, uma atualização)."""
+        if self._live_preview is None or self._preview_idle_id is not None:
+            return
+        self._preview_idle_id = self.after_idle(self._update_live_preview)
+        self._after_ids.add(self._preview_idle_id)
+
+    def _update_live_preview(self):
+        self._after_ids.discard(self._preview_idle_id)
+        self._preview_idle_id = None
+        preview, box = self._live_preview, self.live_preview_box
+        if preview is None or box is None or not box.winfo_exists():
+            return
+        patches = preview.update(self._collect_field_values())
+        if not patches:
+            return
+        box.configure(state="normal")
+        for index, text in patches:
+            tag = f"seg{index}"
+            ranges = box.tag_ranges(tag)
+            if ranges:
+                start = box.index(ranges[0])
+                box.delete(ranges[0], ranges[-1])
+            else:
+                start = self._segment_start(box, index)
+            if text:
+                box.insert(start, text, tag)
+        box.configure(state="disabled")
+
+    def _segment_start(self, box, index):
+        # Segmento vazio não tem faixa: começa onde termina o último anterior com texto
+        for previous in range(index - 1, -1, -1):
+            ranges = box.tag_ranges(f"seg{previous}")
+            if ranges:
+                return box.index(ranges[-1])
+        return "1.0"
+
     def load_template_placeholders(self):
         """Atualiza a interface para refletir os campos do template atual."""
         logger.info("Carregando placeholders do template")
@@ -1330,31 +1360,18 @@ class TemplateApp(ctk.CTk):
         ):
             # Se não há template selecionado, reseta todas as bordas
             self._update_field_borders()
+            self.refresh_live_preview()
             return
 
-        template_content = self.template_manager.get_template(self.current_template)
-        if not template_content:
+        # Índice do template: campos normais e condicionais, já sem automáticos
+        info = self.template_manager.get_template_info(self.current_template)
+        if not info.fields:
+            self.refresh_live_preview()
             return
-
-        # Extrai todos os campos do template (normais e condicionais)
-        placeholders = set(self.template_manager.extract_placeholders(template_content))
-
-        # Também considera campos usados em condicionais
-        for match in re.findall(
-            r"\$([a-zA-Z0-9 _\-çÇáéíóúãõâêîôûÀ-ÿ\[\]%:/]+)\?", template_content
-        ):
-            placeholders.add(match.strip())
-
-        # Remove placeholders automáticos
-        automatic_placeholders = set(placeholder_engine.handlers.keys())
-        placeholders = {
-            p
-            for p in placeholders
-            if p not in automatic_placeholders and not p.startswith("Agora")
-        }
+        placeholders = info.input_fields
 
         # Atualiza as cores das bordas para refletir os campos do novo template
-        self._update_field_borders(placeholders)
+        self._update_field_borders(set(placeholders))
 
         if not hasattr(self, "theme_manager") or not hasattr(self, "entries"):
             return
@@ -1372,55 +1389,18 @@ class TemplateApp(ctk.CTk):
                 entry.configure(border_color=lighter_border)
 
         # Destaca os campos que são usados no template atual
-        template = self.template_manager.get_template(self.current_template)
-        if template:
-            placeholders = self.template_manager.extract_placeholders(template)
-            for field in placeholders:
-                if field in self.entries and isinstance(
-                    self.entries[field], (ctk.CTkEntry, ctk.CTkTextbox)
-                ):
-                    self.entries[field].configure(border_color=border_color)
-
-        # Também considera campos usados em condicionais
-        for match in re.findall(
-            r"\$([a-zA-Z0-9 _\-çÇáéíóúãõâêîôûÀ-ÿ\[\]%:/]+)\?", template_content
-        ):
-            field = match.strip()
+        for field in placeholders:
             if field in self.entries and isinstance(
                 self.entries[field], (ctk.CTkEntry, ctk.CTkTextbox)
             ):
                 self.entries[field].configure(border_color=border_color)
 
         # Atualiza as cores das bordas
-        self._update_field_borders(
-            placeholders
-        )  # Filtra placeholders automáticos (handlers do PlaceholderEngine)
-        automatic_placeholders = set(placeholder_engine.handlers.keys())
-
-        # Também filtra placeholders do tipo $Agora[...]$
-        def is_automatic(ph):
-            if ph in automatic_placeholders:
-                return True
-            if ph == "Agora":
-                return True
-            if ph.startswith("Agora[") and ph.endswith("]"):
-                return True
-            return False
+        self._update_field_borders(set(placeholders))
 
         # REDEFINIR CAMPOS DINÂMICOS com base no novo template
-        cond_fields = set()
-        for match in re.findall(
-            r"\$([a-zA-Z0-9 _\-çÇáéíóúãõâêîôûÀ-ÿ\[\]%:/]+)\?", template_content
-        ):
-            cond_fields.add(match.strip())
-
-        all_fields = set(placeholders) | cond_fields
-
-        self.dynamic_fields = [
-            ph
-            for ph in all_fields
-            if ph not in self.fixed_fields and not is_automatic(ph)
-        ]
+        # (input_fields já exclui automáticos: handlers e $Agora[...]$)
+        self.dynamic_fields = [ph for ph in placeholders if ph not in self.fixed_fields]
 
         # Carrega ordem persistida, se houver
         if hasattr(self, "load_field_order") and callable(self.load_field_order):
@@ -1441,6 +1421,10 @@ class TemplateApp(ctk.CTk):
                     entry.insert(0, valor_antigo)
         # Se não houver valor antigo, deixa vazio para mostrar o placeholder
 
+        # Já busca os dados externos com os valores que vieram do template anterior
+        self._schedule_external_prefetch(delay=0)
+        self.refresh_live_preview()
+
     def open_template_editor(self):
         def get_fields():
             return {"fixed": self.fixed_fields, "dynamic": sorted(self.dynamic_fields)}
@@ -1477,13 +1461,10 @@ class TemplateApp(ctk.CTk):
                 self.show_snackbar("Senha diária salva e copiada!")
 
     def on_template_change(self, selected_display_name):
-        real_name = self.template_manager.meta.get_real_name(selected_display_name)
-
-        # Sempre recarrega lista atualizada
-        self.template_manager.load_templates()
-        self.template_selector.configure(
-            values=self.template_manager.get_display_names()
-        )
+        # A lista já é atualizada pelos eventos do LibraryWatcher, sem rescan aqui
+        real_name = self.template_manager.get_real_name(selected_display_name)
+        if real_name not in self.template_manager.templates:
+            return  # ex.: "Nenhum template encontrado" do filtro
 
         self.current_template = real_name
         self.current_template_display.set(
@@ -1503,6 +1484,8 @@ class TemplateApp(ctk.CTk):
             author_label_height = widget.winfo_reqheight()
             break
         extra_height = 250 + author_label_height
+        if self.live_preview_box is not None:
+            extra_height += self.live_preview_box.winfo_reqheight() + 10
 
         screen_height = self.winfo_screenheight()
         max_height = int(screen_height * 0.9)
@@ -1626,51 +1609,184 @@ class TemplateApp(ctk.CTk):
             return []
 
     def _refresh_all_template_selectors(self, select_template=None):
-        # Atualiza todos os OptionMenus relevantes (main, editor, quick popup)
-        # Main selector
-        if hasattr(self, "template_selector"):
-            self.template_selector.configure(
-                values=self.template_manager.get_display_names()
+        # Avisa todas as janelas inscritas (main, editor, quick popup)
+        self.template_manager.notify(select=select_template)
+
+    def _show_template_revisions(self, full_name, parent=None, on_restore=None):
+        """Janela com as revisões salvas de um template, para ver e restaurar uma delas."""
+        revisions = self.template_manager.get_revisions(full_name)
+        if not revisions:
+            self.show_snackbar(
+                "Nenhuma versão anterior salva para este template.", toast_type="info"
             )
-            # Seleciona o template alterado, se fornecido
-            if select_template:
-                display_name = self.template_manager.meta.get_display_name(
-                    select_template
+            return
+
+        win = ctk.CTkToplevel(parent or self)
+        win.title(f"Versões de {full_name}")
+        win.geometry("640x480")
+        win.grab_set()
+        win.grid_columnconfigure(0, weight=1)
+        win.grid_rowconfigure(1, weight=1)
+
+        # Mais recente primeiro; a última revisão é o texto salvo por último
+        labels = {}
+        for position, (index, stamp) in enumerate(reversed(revisions)):
+            label = stamp.strftime("%d/%m/%Y %H:%M:%S")
+            labels[f"{label} (última)" if position == 0 else label] = index
+
+        text_box = ctk.CTkTextbox(win, wrap="word")
+        text_box.grid(row=1, column=0, padx=10, pady=10, sticky="nsew")
+
+        def mostrar(label):
+            try:
+                content = self.template_manager.get_revision(full_name, labels[label])
+            except Exception as e:
+                logger.error(f"Erro ao ler revisão de {full_name}: {e}")
+                content = "Não foi possível ler esta versão."
+            text_box.configure(state="normal")
+            text_box.delete("1.0", "end")
+            text_box.insert("1.0", content)
+            text_box.configure(state="disabled")
+
+        selected = ctk.StringVar(value=next(iter(labels)))
+        ctk.CTkOptionMenu(
+            win, values=list(labels), variable=selected, command=mostrar
+        ).grid(row=0, column=0, padx=10, pady=(10, 0), sticky="w")
+        mostrar(selected.get())
+
+        def restaurar():
+            try:
+                content = self.template_manager.restore_revision(
+                    full_name, labels[selected.get()]
                 )
-                self.current_template = select_template
-                self.current_template_display.set(display_name)
-                self.template_selector.set(display_name)
-                self.load_template_placeholders()
-        # Template Editor
-        for w in self.winfo_children():
-            if w.__class__.__name__ == "TemplateEditor":
-                try:
-                    w.refresh_templates()
-                    # Seleciona o template alterado, se fornecido
-                    if select_template:
-                        display_name = self.template_manager.meta.get_display_name(
-                            select_template
-                        )
-                        w.template_var.set(display_name)
-                        w.load_template(select_template)
-                except Exception:
-                    pass
-            elif hasattr(w, "dropdown"):
-                try:
-                    w.dropdown.configure(
-                        values=self.template_manager.get_display_names()
-                    )
-                except Exception:
-                    pass
-        # QuickTemplatePopup
-        for w in self.winfo_children():
-            if w.__class__.__name__ == "QuickTemplatePopup":
-                try:
-                    w.template_dropdown.configure(
-                        values=self.template_manager.get_template_names()
-                    )
-                except Exception:
-                    pass
+            except Exception as e:
+                logger.error(f"Erro ao restaurar revisão de {full_name}: {e}")
+                self.show_snackbar("Erro ao restaurar a versão.", toast_type="error")
+                return
+            self.template_manager.load_templates()
+            self._refresh_all_template_selectors()
+            if on_restore:
+                on_restore(content)
+            self.show_snackbar(f"Versão de '{full_name}' restaurada!", toast_type="success")
+            win.destroy()
+
+        btn_frame = ctk.CTkFrame(win)
+        btn_frame.grid(row=2, column=0, pady=(0, 10))
+        ctk.CTkButton(
+            btn_frame, text="Restaurar esta versão", fg_color="#388E3C", command=restaurar
+        ).pack(side="left", padx=10)
+        ctk.CTkButton(
+            btn_frame, text="Fechar", fg_color="#A94444", command=win.destroy
+        ).pack(side="left", padx=10)
+        win.wait_window()
+        # Devolve o foco exclusivo à janela de comparação
+        if parent is not None and parent.winfo_exists():
+            parent.grab_set()
+
+    def _poll_template_library(self):
+        """Timer do LibraryWatcher: inotify ou scan por stat (numa thread), conforme o sistema."""
+        self._after_ids.discard(self._library_poll_id)
+        try:
+            self.library_watcher.poll()
+        except Exception as e:
+            logger.error(f"Erro ao verificar a pasta de templates: {e}")
+        self._library_poll_id = self._safe_after(
+            self.library_watch_interval, self._poll_template_library
+        )
+
+    def _on_templates_changed(self, changes):
+        """Listener do TemplateManager; a atualização do seletor é agrupada no idle."""
+        if changes.select:
+            self._pending_select = changes.select
+        if self.current_template in changes.modified:
+            self._reload_current_template = True
+        if self._library_refresh_id is None:
+            self._library_refresh_id = self.after_idle(self._apply_template_changes)
+            self._after_ids.add(self._library_refresh_id)
+
+    def _apply_template_changes(self):
+        self._after_ids.discard(self._library_refresh_id)
+        self._library_refresh_id = None
+        select_template, self._pending_select = self._pending_select, None
+        reload_current, self._reload_current_template = self._reload_current_template, False
+        if not hasattr(self, "template_selector"):
+            return
+        self.template_selector.configure(values=self._filtered_display_names())
+        self._update_template_picker()
+        self._schedule_search_warmup()
+        # Seleciona o template alterado, se fornecido
+        if select_template:
+            display_name = self.template_manager.meta.get_display_name(select_template)
+            self.current_template = select_template
+            self.current_template_display.set(display_name)
+            self.template_selector.set(display_name)
+            self.load_template_placeholders()
+        elif reload_current:
+            # O template aberto mudou no disco: refaz o formulário (valores são mantidos)
+            self.load_template_placeholders()
+
+    # --- Filtro de templates ---
+
+    def _filtered_display_names(self):
+        """Opções do seletor: todos os templates ou o resultado da busca, por relevância."""
+        query = self.template_search.get().strip() if hasattr(self, "template_search") else ""
+        if not query:
+            return self.template_manager.get_display_names()
+        try:
+            names = self.template_manager.search(query)
+        except Exception as e:
+            logger.error(f"Erro na busca de templates: {e}")
+            return self.template_manager.get_display_names()
+        if not names:
+            return ["Nenhum template encontrado"]
+        return [self.template_manager.meta.get_display_name(name) for name in names]
+
+    def _update_template_picker(self):
+        names = self.template_manager.get_template_names()
+        meta = self.template_manager.meta
+        self.template_search.set_values(names, [n for n in names if meta.is_favorite(n)])
+
+    def _on_template_picked(self, name):
+        self._clear_template_search()
+        self.on_template_change(self.template_manager.meta.get_display_name(name))
+
+    def _on_template_search_key(self, query=None):
+        """Refaz o filtro quando o Tk ficar ocioso (várias teclas, uma busca)."""
+        if self._search_idle_id is None:
+            self._search_idle_id = self.after_idle(self._apply_template_filter)
+            self._after_ids.add(self._search_idle_id)
+
+    def _apply_template_filter(self):
+        self._after_ids.discard(self._search_idle_id)
+        self._search_idle_id = None
+        self.template_selector.configure(values=self._filtered_display_names())
+
+    def _select_first_search_result(self):
+        if not self.template_search.get().strip():
+            return
+        values = self._filtered_display_names()
+        self.template_selector.configure(values=values)
+        self.on_template_change(values[0])
+
+    def _clear_template_search(self):
+        self.template_search.delete(0, "end")
+        self.template_selector.configure(values=self.template_manager.get_display_names())
+        self.focus_set()
+
+    def _schedule_search_warmup(self):
+        """Indexa o conteúdo dos templates em fatias, no timer, sem travar a interface."""
+        if self._search_warm_id is None and self.template_manager.search_index.stale:
+            self._search_warm_id = self._safe_after(50, self._warm_search_index)
+
+    def _warm_search_index(self):
+        self._after_ids.discard(self._search_warm_id)
+        self._search_warm_id = None
+        try:
+            self.template_manager.warm_search_index()
+        except Exception as e:
+            logger.error(f"Erro ao indexar templates para a busca: {e}")
+            return
+        self._schedule_search_warmup()
 
     def importar_template(self, template):
         """
@@ -1796,32 +1912,20 @@ class TemplateApp(ctk.CTk):
             self.show_snackbar("Template inválido!", toast_type="error")
             return
 
-        base_dir = os.path.abspath("templates")
-        categorias = ["Geral"]
-        for root, dirs, files in os.walk(base_dir):
-            rel = os.path.relpath(root, base_dir)
-            if rel != ".":
-                categorias.append(rel.replace("\\", "/"))
-        categorias = sorted(set(categorias))
+        # Pastas com templates (índice do manager, sem percorrer o disco)
+        categorias = self.template_manager.get_categories()
 
         # Procura todos os templates locais com esse nocodb_id
         duplicate_names = []
-        for local_name, meta in self.template_manager.meta.meta.items():
+        for local_name in self.template_manager.find_by_nocodb_id(nocodb_id):
             # Padroniza: se for "Geral / Nome", converte para "Nome"
             if local_name.startswith("Geral / "):
-                local_name_check = local_name.split(" / ", 1)[1]
-            else:
-                local_name_check = local_name
-            if meta.get("nocodb_id") == str(nocodb_id):
-                duplicate_names.append(local_name_check)
+                local_name = local_name.split(" / ", 1)[1]
+            duplicate_names.append(local_name)
         existing_name = duplicate_names[0] if duplicate_names else None
 
         # --- NOVO: Procura todos os templates locais com o MESMO CONTEÚDO ---
-        same_content_names = []
-        for local_name in self.template_manager.templates:
-            local_content = self.template_manager.get_template(local_name)
-            if local_content == conteudo:
-                same_content_names.append(local_name)
+        same_content_names = self.template_manager.find_by_content(conteudo)
 
         # Se houver mais de um template com o mesmo conteúdo, e pelo menos um deles tem nocodb_id, pergunta se deseja unificar
         if len(same_content_names) > 1:
@@ -1932,9 +2036,7 @@ class TemplateApp(ctk.CTk):
                             duration=2500,
                         )
                     self.template_manager.load_templates()
-                    self.template_selector.configure(
-                        values=self.template_manager.get_display_names()
-                    )
+                    self._refresh_all_template_selectors()
                     return
                 # Se cancelar, não faz nada: NÃO remove nenhum template, segue para a lógica de comparação de ID/conteúdo normalmente
 
@@ -1942,11 +2044,9 @@ class TemplateApp(ctk.CTk):
         local_contents = []
         for name in duplicate_names:
             # Para "Geral", o nome do arquivo é só o nome, nunca "Geral / Nome"
-            local_path = self.template_manager._template_path(name)
-            if os.path.exists(local_path):
-                # Sempre lê o conteúdo diretamente do arquivo para garantir que está atualizado
-                with open(local_path, "r", encoding="utf-8") as f:
-                    content = f.read()
+            if self.template_manager.template_exists(name):
+                # Sempre relê do armazenamento para garantir que está atualizado
+                content = self.template_manager.get_template(name, fresh=True)
                 local_contents.append((name, content))
             else:
                 local_contents.append((name, ""))
@@ -1977,28 +2077,23 @@ class TemplateApp(ctk.CTk):
                 return
 
             # --- NOVO: verifica se já existe template com mesmo conteúdo em outra pasta ---
-            same_content_names = []
-            for local_name in self.template_manager.templates:
-                local_content = self.template_manager.get_template(local_name)
-                if local_content == conteudo and local_name != full_name:
-                    same_content_names.append(local_name)
+            same_content_names = [
+                n for n in self.template_manager.find_by_content(conteudo) if n != full_name
+            ]
             # Se existir, unifica: remove todos os outros, mantém só o novo
             if same_content_names:
-                for n in same_content_names:
-                    self.template_manager.delete_template(n)
-                for name, _ in local_contents:
-                    if name != full_name:
-                        self.template_manager.delete_template(name)
-                self.template_manager.add_template(full_name, conteudo)
-                self.template_manager.meta._ensure_entry(full_name)
-                self.template_manager.meta.meta[full_name]["nocodb_id"] = str(nocodb_id)
-                self.template_manager.meta._save()
-                # Remove duplicados do meta.json
-                for name in list(self.template_manager.meta.meta.keys()):
-                    if name != full_name and self.template_manager.meta.meta[name].get(
-                        "nocodb_id"
-                    ) == str(nocodb_id):
-                        self.template_manager.meta.remove_meta(name)
+                with self.template_manager.transaction():
+                    for n in same_content_names:
+                        self.template_manager.delete_template(n)
+                    for name, _ in local_contents:
+                        if name != full_name:
+                            self.template_manager.delete_template(name)
+                    self.template_manager.add_template(full_name, conteudo)
+                    self.template_manager.meta._ensure_entry(full_name)
+                    self.template_manager.meta.meta[full_name]["nocodb_id"] = str(nocodb_id)
+                    self.template_manager.meta._save()
+                    # Remove duplicados do meta.json
+                    self.template_manager.remove_nocodb_duplicates(nocodb_id, full_name)
                 pasta_str = f"{pasta} / {nome}"
                 self.show_snackbar(
                     f"Templates unificados como '{pasta_str}'!",
@@ -2009,19 +2104,16 @@ class TemplateApp(ctk.CTk):
                 self._refresh_all_template_selectors()
                 return
             # Caso contrário, remove todos, mantém só o nome do NocoDB (na pasta escolhida)
-            for name, _ in local_contents:
-                if name != full_name:
-                    self.template_manager.delete_template(name)
-            self.template_manager.add_template(full_name, conteudo)
-            self.template_manager.meta._ensure_entry(full_name)
-            self.template_manager.meta.meta[full_name]["nocodb_id"] = str(nocodb_id)
-            self.template_manager.meta._save()
-            # Remove duplicados do meta.json
-            for name in list(self.template_manager.meta.meta.keys()):
-                if name != full_name and self.template_manager.meta.meta[name].get(
-                    "nocodb_id"
-                ) == str(nocodb_id):
-                    self.template_manager.meta.remove_meta(name)
+            with self.template_manager.transaction():
+                for name, _ in local_contents:
+                    if name != full_name:
+                        self.template_manager.delete_template(name)
+                self.template_manager.add_template(full_name, conteudo)
+                self.template_manager.meta._ensure_entry(full_name)
+                self.template_manager.meta.meta[full_name]["nocodb_id"] = str(nocodb_id)
+                self.template_manager.meta._save()
+                # Remove duplicados do meta.json
+                self.template_manager.remove_nocodb_duplicates(nocodb_id, full_name)
             pasta_str = f"{pasta} / {nome}"
             if any(
                 self.template_manager._split_name(name)[0] != pasta
@@ -2165,25 +2257,14 @@ class TemplateApp(ctk.CTk):
             local_created_list = []
             local_modified_list = []
             for idx, (name, _) in enumerate(local_contents):
-                local_path = self.template_manager._template_path(name)
                 try:
-                    local_created_dt = (
-                        datetime.datetime.fromtimestamp(os.path.getctime(local_path))
-                        if os.path.exists(local_path)
-                        else None
+                    local_created_dt, local_modified_dt = (
+                        self.template_manager.template_times(name)
                     )
                     local_created_dt = to_naive(local_created_dt)
-                except Exception:
-                    local_created_dt = None
-                try:
-                    local_modified_dt = (
-                        datetime.datetime.fromtimestamp(os.path.getmtime(local_path))
-                        if os.path.exists(local_path)
-                        else None
-                    )
                     local_modified_dt = to_naive(local_modified_dt)
                 except Exception:
-                    local_modified_dt = None
+                    local_created_dt = local_modified_dt = None
                 local_created_list.append(local_created_dt)
                 local_modified_list.append(local_modified_dt)
 
@@ -2320,11 +2401,7 @@ class TemplateApp(ctk.CTk):
                 self.template_manager.meta._save()
 
                 # Remove duplicados do meta.json (com a mesma nocodb_id) exceto o escolhido
-                for name in list(self.template_manager.meta.meta.keys()):
-                    if name != full_name and self.template_manager.meta.meta[name].get(
-                        "nocodb_id"
-                    ) == str(nocodb_id):
-                        self.template_manager.meta.remove_meta(name)
+                self.template_manager.remove_nocodb_duplicates(nocodb_id, full_name)
 
                 pasta_str = f"{pasta} / {nome}"
                 self.template_manager.load_templates()
@@ -2393,11 +2470,7 @@ class TemplateApp(ctk.CTk):
                     self.template_manager.meta._save()
 
                 # Remove duplicados do meta.json (com a mesma nocodb_id) exceto o escolhido
-                for n in list(self.template_manager.meta.meta.keys()):
-                    if n != keep_name and self.template_manager.meta.meta[n].get(
-                        "nocodb_id"
-                    ) == str(nocodb_id):
-                        self.template_manager.meta.remove_meta(n)
+                self.template_manager.remove_nocodb_duplicates(nocodb_id, keep_name)
 
                 pasta_str = f"{pasta} / {current_nome}"
                 self.template_manager.load_templates()
@@ -2586,8 +2659,7 @@ class TemplateApp(ctk.CTk):
 
         if existing_name:
             # Verifica se o arquivo do template local existe e não está vazio
-            local_path = self.template_manager._template_path(existing_name)
-            local_exists = os.path.exists(local_path)
+            local_exists = self.template_manager.template_exists(existing_name)
             local_content = (
                 self.template_manager.get_template(existing_name)
                 if local_exists
@@ -2607,11 +2679,7 @@ class TemplateApp(ctk.CTk):
                     )
                     self.template_manager.meta._save()
                 # Remove entradas duplicadas de meta.json (com o mesmo nocodb_id)
-                for name in list(self.template_manager.meta.meta.keys()):
-                    if name != full_name and self.template_manager.meta.meta[name].get(
-                        "nocodb_id"
-                    ) == str(nocodb_id):
-                        self.template_manager.meta.remove_meta(name)
+                self.template_manager.remove_nocodb_duplicates(nocodb_id, full_name)
                 if old_category != pasta:
                     self.show_snackbar(
                         f"Template movido para '{full_name}'!",
@@ -2635,7 +2703,6 @@ class TemplateApp(ctk.CTk):
                 compare_win.grab_set()
 
                 import datetime
-                import os
 
                 ctk.CTkLabel(
                     compare_win,
@@ -2693,26 +2760,34 @@ class TemplateApp(ctk.CTk):
                     )
                 except Exception:
                     nocodb_updated_fmt = "-"
+                # Datas do template local pelo manager (o arquivo depende do backend)
+                local_created_dt, local_modified_dt = self.template_manager.template_times(
+                    existing_name
+                )
+                local_created = (
+                    local_created_dt.strftime("%d/%m/%Y %H:%M")
+                    if local_created_dt
+                    else "-"
+                )
+                local_modified = (
+                    local_modified_dt.strftime("%d/%m/%Y %H:%M")
+                    if local_modified_dt
+                    else "-"
+                )
+                local_dt = local_modified_dt
                 try:
-                    local_created = (
-                        datetime.datetime.fromtimestamp(
-                            os.path.getctime(local_path)
-                        ).strftime("%d/%m/%Y %H:%M")
-                        if os.path.exists(local_path)
-                        else "-"
-                    )
-                except Exception:
-                    local_created = "-"
-                try:
-                    local_modified = (
-                        datetime.datetime.fromtimestamp(
-                            os.path.getmtime(local_path)
-                        ).strftime("%d/%m/%Y %H:%M")
-                        if os.path.exists(local_path)
-                        else "-"
+                    # Hora local sem fuso, para comparar com a do arquivo
+                    nocodb_dt = (
+                        datetime.datetime.fromisoformat(
+                            nocodb_updated.replace("Z", "+00:00")
+                        )
+                        .astimezone()
+                        .replace(tzinfo=None)
+                        if nocodb_updated
+                        else None
                     )
                 except Exception:
-                    local_modified = "-"
+                    nocodb_dt = None
 
                 ctk.CTkLabel(
                     compare_win,
@@ -2734,7 +2809,7 @@ class TemplateApp(ctk.CTk):
                     text=f"Modificação: {local_modified}",
                     font=ctk.CTkFont(size=11, slant="italic"),
                 ).grid(row=3, column=1, padx=10, sticky="w")
-                row_info += 1
+                row_info = 4
 
                 info_text = ""
                 if nocodb_dt and local_dt:
@@ -2762,7 +2837,7 @@ class TemplateApp(ctk.CTk):
                 ).grid(row=row_info, column=0, columnspan=2, pady=(0, 10))
 
                 btn_frame = ctk.CTkFrame(compare_win)
-                btn_frame.grid(row=3, column=0, columnspan=2, pady=10)
+                btn_frame.grid(row=row_info + 1, column=0, columnspan=2, pady=10)
 
                 def usar_nocodb():
                     # Pergunta se deseja atualizar o título do template usando customtkinter
@@ -2934,14 +3009,24 @@ class TemplateApp(ctk.CTk):
                         )
                     compare_win.destroy()
                     self.template_manager.load_templates()
-                    self.template_selector.configure(
-                        values=self.template_manager.get_display_names()
-                    )
+                    self._refresh_all_template_selectors()
 
                 def manter_local():
                     self.show_snackbar("Template local mantido!", toast_type="info")
                     compare_win.destroy()
 
+                def atualizar_local(content):
+                    local_box.configure(state="normal")
+                    local_box.delete("1.0", "end")
+                    local_box.insert("1.0", content)
+                    local_box.configure(state="disabled")
+
+                def versoes_anteriores():
+                    # Histórico do template local (ex.: o texto antes de um "Usar do NocoDB")
+                    self._show_template_revisions(
+                        existing_name, compare_win, on_restore=atualizar_local
+                    )
+
                 ctk.CTkButton(
                     btn_frame,
                     text="Usar do NocoDB",
@@ -2954,6 +3039,12 @@ class TemplateApp(ctk.CTk):
                     fg_color="#388E3C",
                     command=manter_local,
                 ).pack(side="left", padx=20)
+                if self.template_manager.get_revisions(existing_name):
+                    ctk.CTkButton(
+                        btn_frame,
+                        text="Versões Anteriores",
+                        command=versoes_anteriores,
+                    ).pack(side="left", padx=20)
                 compare_win.wait_window()
                 return
             else:
@@ -3094,9 +3185,7 @@ class TemplateApp(ctk.CTk):
                             toast_type="success",
                         )
                         self.template_manager.load_templates()
-                        self.template_selector.configure(
-                            values=self.template_manager.get_display_names()
-                        )
+                        self._refresh_all_template_selectors()
                     else:
                         self.show_snackbar(
                             "Template já existe e está atualizado!", toast_type="info"
@@ -3121,28 +3210,20 @@ class TemplateApp(ctk.CTk):
             self.template_manager.meta.meta[meta_key]["nocodb_id"] = str(nocodb_id)
             self.template_manager.meta._save()
             # Remove entradas duplicadas de meta.json (com o mesmo nocodb_id)
-            for name in list(self.template_manager.meta.meta.keys()):
-                if name != full_name and self.template_manager.meta.meta[name].get(
-                    "nocodb_id"
-                ) == str(nocodb_id):
-                    self.template_manager.meta.remove_meta(name)
+            self.template_manager.remove_nocodb_duplicates(nocodb_id, full_name)
         self.show_snackbar(
             f"Template '{full_name}' importado!", toast_type="success", duration=2500
         )
         self.template_manager.load_templates()
-        self.template_selector.configure(
-            values=self.template_manager.get_display_names()
-        )
+        self._refresh_all_template_selectors()
 
     def remover_templates_nocodb_id_menos_um(self):
         # Remove todos os templates e metas com nocodb_id == "-1"
-        to_remove = [
-            name
-            for name, meta in self.template_manager.meta.meta.items()
-            if meta.get("nocodb_id") == "-1"
-        ]
-        for name in to_remove:
-            self.template_manager.delete_template(name)
+        to_remove = self.template_manager.find_by_nocodb_id("-1")
+        # Uma transação (SQLite) e uma gravação do meta para o lote inteiro
+        with self.template_manager.transaction():
+            for name in to_remove:
+                self.template_manager.delete_template(name)
         self.template_manager.load_templates()
         self._refresh_all_template_selectors()
 
@@ -3359,35 +3440,7 @@ class TemplateApp(ctk.CTk):
         Se o campo estiver preenchido, usa Texto (pode conter outros placeholders).
         Se não, usa Alternativa (pode conter outros placeholders).
         """
-
-        def cond_replacer(match):
-            field = match.group(1)
-            if "?" in field and "|" in field:
-                # Suporte a aninhamento acidental, pega só o primeiro ?
-                field_name, rest = field.split("?", 1)
-                if "|" in rest:
-                    text_true, text_false = rest.split("|", 1)
-                else:
-                    text_true, text_false = rest, ""
-                value = field_values.get(field_name, "")
-                # Se for checkbox, só considera "Sim" como verdadeiro
-                if field_name.startswith("[checkbox]"):
-                    is_true = value == "Sim"
-                else:
-                    is_true = bool(value)
-                # Recursivo: processa condicional dentro de Texto/Alternativa
-                if is_true:
-                    return self.process_conditionals(text_true, field_values)
-                else:
-                    return self.process_conditionals(text_false, field_values)
-            return match.group(0)
-
-        # Regex: $Campo?Texto|Alternativa$
-        return re.sub(
-            r"\$([a-zA-Z0-9 _\-çÇáéíóúãõâêîôûÀ-ÿ\[\]%:/\?\|]+)\$",
-            cond_replacer,
-            template,
-        )
+        return process_conditionals(template, field_values)
 
     # Mantém uma lista global de tooltips abertos para garantir que todos sejam fechados ao passar o mouse novamente
     _all_tooltips = []
@@ -3576,71 +3629,30 @@ class TemplateApp(ctk.CTk):
             geometry_str = self.geometry()
 
             try:
-                # Carrega o config existente, se houver
-                if os.path.exists("config.json"):
-                    with open("config.json", "r", encoding="utf-8") as f:
-                        config = json.load(f)
-                else:
-                    config = {}
-
-                # Atualiza a geometria
-                config["geometry"] = geometry_str
-
-                # Salva o arquivo atualizado
-                with open("config.json", "w", encoding="utf-8") as f:
-                    json.dump(config, f)
-
+                # Atualiza só a geometria, mantendo o restante do config
+                self.config_store.update(geometry=geometry_str)
             except Exception as e:
                 print(f"[ERRO ao salvar config]: {e}")
 
     def load_window_config(self):
         try:
-            with open("config.json", "r", encoding="utf-8") as f:
-                config = json.load(f)
-                geometry = config.get("geometry")
-                if geometry and "x" in geometry:
-                    self.geometry(geometry)
+            geometry = self.config_store.get("geometry")
+            if geometry and "x" in geometry:
+                self.geometry(geometry)
         except Exception:
             pass
 
     def apply_saved_geometry(self):
-        try:
-            with open("config.json", "r", encoding="utf-8") as f:
-                config = json.load(f)
-                geometry = config.get("geometry")
-                if geometry and "x" in geometry:
-                    self.geometry(geometry)
-        except Exception:
-            pass
+        self.load_window_config()
 
     # --- Configuração de campos expansíveis ---
     def load_expandable_fields_config(self):
-        import json
-
-        if os.path.exists("config.json"):
-            try:
-                with open("config.json", "r", encoding="utf-8") as f:
-                    config = json.load(f)
-                return config.get(
-                    "expandable_fields", ["Procedimento Executado", "Problema Relatado"]
-                )
-            except Exception:
-                return ["Procedimento Executado", "Problema Relatado"]
-        return ["Procedimento Executado", "Problema Relatado"]
+        return self.config_store.get(
+            "expandable_fields", ["Procedimento Executado", "Problema Relatado"]
+        )
 
     def save_expandable_fields_config(self):
-        import json
-
-        config = {}
-        if os.path.exists("config.json"):
-            try:
-                with open("config.json", "r", encoding="utf-8") as f:
-                    config = json.load(f)
-            except Exception:
-                config = {}
-        config["expandable_fields"] = self.expandable_fields
-        with open("config.json", "w", encoding="utf-8") as f:
-            json.dump(config, f, indent=4)
+        self.config_store.update(expandable_fields=self.expandable_fields)
 
     def open_settings(self):
         # Permite apenas uma janela de configurações por vez
@@ -3708,33 +3720,11 @@ class TemplateApp(ctk.CTk):
                     entry.insert(0, valor_antigo)
 
     def load_theme_config(self):
-        import json
-
-        if os.path.exists("config.json"):
-            try:
-                with open("config.json", "r", encoding="utf-8") as f:
-                    config = json.load(f)
-                theme = config.get("theme_name", "green")
-                mode = config.get("appearance_mode", "dark")
-                return theme, mode
-            except Exception:
-                return "green", "dark"
-        return "green", "dark"
+        config = self.config_store.load()
+        return config.get("theme_name", "green"), config.get("appearance_mode", "dark")
 
     def save_theme_config(self, theme_name, appearance_mode):
-        import json
-
-        config = {}
-        if os.path.exists("config.json"):
-            try:
-                with open("config.json", "r", encoding="utf-8") as f:
-                    config = json.load(f)
-            except Exception:
-                config = {}
-        config["theme_name"] = theme_name
-        config["appearance_mode"] = appearance_mode
-        with open("config.json", "w", encoding="utf-8") as f:
-            json.dump(config, f, indent=4)
+        self.config_store.update(theme_name=theme_name, appearance_mode=appearance_mode)
 
     def _safe_after(self, delay, callback):
         """Agende um after e registre o ID para cancelamento seguro."""
@@ -3758,9 +3748,20 @@ class TemplateApp(ctk.CTk):
 
     def on_close(self):
         self._cancel_all_afters()
+        self.external_data.shutdown()
+        self.template_manager.remove_listener(self._on_templates_changed)
+        self.library_watcher.close()
+        self.template_manager.meta.flush()  # write-behind: grava o meta pendente
+        # Próxima abertura lê os templates do pack. Em geral só troca o arquivo
+        # montado pelo prepare_pack; limita as leituras para não travar o fechamento.
+        self.template_manager.save_pack(max_reads=200)
+        self.template_manager.parse_cache.save()  # e não reanalisa o que já foi analisado
+        self.template_manager.storage.close()
+        logger.info(f"Cache de templates: {self.template_manager.cache_stats()}")
         self.update_idletasks()  # Garante que a geometria seja a real
         self.save_window_config()
+        self.config_store.flush()  # config.json/meta.json pendentes vão para o disco já
         self.destroy()
 
 
-__all__ = ["TemplateApp", "placeholder_engine"]
+__all__ = ["TemplateApp", "placeholder_engine", "template_compiler"]
@@ -0,0 +1,44 @@
+"""
+Migra a pasta de templates (.txt + meta.json) para o backend SQLite.
+
+Exemplos:
+    python migrate_storage.py
+    python migrate_storage.py --templates templates --db templates/templates.db --enable
+
+Os arquivos originais ficam onde estão; o app só passa a usar o banco com
+"storage": {"backend": "sqlite", ...} no config.json (--enable grava isso).
+"""
+
+import argparse
+import os
+import sys
+
+from linxfast.core import ConfigStore, migrate_to_sqlite
+from linxfast.core.storage import DEFAULT_DB_FILENAME
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migra os templates para SQLite.")
+    parser.add_argument("--templates", default="templates", help="Diretório dos templates")
+    parser.add_argument("--db", default=None, help=f"Banco de destino (padrão: <templates>/{DEFAULT_DB_FILENAME})")
+    parser.add_argument("--force", action="store_true", help="Sobrescreve um banco que já tenha templates")
+    parser.add_argument("--enable", action="store_true", help="Ativa o backend SQLite no config.json")
+    parser.add_argument("--config", default="config.json", help="Arquivo de configuração do app")
+    args = parser.parse_args(argv)
+
+    db_path = args.db or os.path.join(args.templates, DEFAULT_DB_FILENAME)
+    try:
+        templates, metas = migrate_to_sqlite(args.templates, db_path, force=args.force)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"{templates} templates e {metas} entradas de meta copiados para {db_path}")
+
+    if args.enable:
+        ConfigStore(args.config).update(storage={"backend": "sqlite", "path": db_path})
+        print(f"Backend SQLite ativado em {args.config}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
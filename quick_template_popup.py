@@ -3,6 +3,8 @@ from tkinter import StringVar
 from tkinter import messagebox
 from app import TemplateApp
 from theme_manager import ThemeManager
+from template_picker import TemplatePicker
+from linxfast.core import ConfigStore, field_kind, template_compiler
 import logging
 from logger_config import auto_log_functions
 
@@ -38,6 +40,7 @@ class QuickTemplatePopup(ctk.CTkToplevel):
         # Não altera o modo de aparência aqui! Apenas no _build_interface, e só se necessário.
         self.template_var = StringVar(value="")
         self._build_interface()
+        self.manager.add_listener(self._on_templates_changed)
 
     def _build_interface(self):
         self.grid_columnconfigure(0, weight=0)  # coluna do botão pin
@@ -112,14 +115,17 @@ class QuickTemplatePopup(ctk.CTkToplevel):
 
         self.clear_toggle.bind("<Enter>", show_tooltip)
         self.clear_toggle.bind("<Leave>", lambda e: self._safe_after(1, hide_tooltip))
-        # Dropdown expansível ocupando o espaço restante
-        self.template_dropdown = ctk.CTkOptionMenu(
+        # Type-ahead ocupando o espaço restante (seta para baixo lista todos)
+        self.template_picker = TemplatePicker(
             self,
-            values=self.manager.get_template_names(),
-            variable=self.template_var,
-            command=self.load_template
+            placeholder_text="🔍 Digite o nome do template...",
+            command=self._select_template,
+            keep_selection=True,
+            visible_rows=8,
         )
-        self.template_dropdown.grid(row=1, column=1, padx=(0, 0), pady=5, sticky="ew")
+        self.template_picker.grid(row=1, column=1, padx=(0, 0), pady=5, sticky="ew")
+        self._update_template_picker()
+        self.template_picker.focus_set()
 
         # Frame para os campos
         self.form_frame = ctk.CTkFrame(self, fg_color="transparent")
@@ -153,6 +159,17 @@ class QuickTemplatePopup(ctk.CTkToplevel):
         )
         self.clear_btn.grid(row=0, column=0, padx=(37, 0), sticky="e")
 
+    def _update_template_picker(self):
+        names = self.manager.get_template_names()
+        self.template_picker.set_values(names, [n for n in names if self.manager.meta.is_favorite(n)])
+
+    def _on_templates_changed(self, changes):
+        self._update_template_picker()
+
+    def _select_template(self, template_name):
+        self.template_var.set(template_name)
+        self.load_template(template_name)
+
     def toggle_always_on_top(self):
         current = self.attributes("-topmost")
         new_state = not current
@@ -169,9 +186,6 @@ class QuickTemplatePopup(ctk.CTkToplevel):
     def load_template(self, template_name):
         """Carrega o template selecionado e configura os campos dinamicamente"""
         logger.info(f"Carregando template: {template_name}")
-        from main_window import placeholder_engine  # Importa aqui para evitar import circular
-        import json
-        import os
 
         logging.info(f"Carregando template '{template_name}' no Modo Simples...")
 
@@ -188,19 +202,9 @@ class QuickTemplatePopup(ctk.CTkToplevel):
             widget.destroy()
         self.entries.clear()
 
-        content = self.manager.get_template(template_name)
-        placeholders = self.manager.extract_placeholders(content)
-
-        # Filtra placeholders automáticos
-        automatic_placeholders = set(placeholder_engine.handlers.keys())
-        def is_automatic(ph):
-            if ph in automatic_placeholders:
-                return True
-            if ph == "Agora":
-                return True
-            if ph.startswith("Agora[") and ph.endswith("]"):
-                return True
-            return False
+        # Índice do template (campos já sem os placeholders automáticos)
+        info = self.manager.get_template_info(template_name)
+        placeholders = info.input_fields
 
         # --- ORDEM PERSISTENTE DOS CAMPOS DINÂMICOS ---
         # Tenta carregar ordem salva do config.json - INICIANDO
@@ -212,18 +216,13 @@ class QuickTemplatePopup(ctk.CTkToplevel):
 
         # Separa placeholders em fixos e dinâmicos
         fixed_present = [ph for ph in fixed_fields if ph in placeholders]
-        dynamic_fields = [ph for ph in placeholders if ph not in fixed_fields and not is_automatic(ph)]
-
-        order = None
-        config_path = "config.json"
-        if os.path.exists(config_path):
-            try:
-                with open(config_path, "r", encoding="utf-8") as f:
-                    config = json.load(f)
-                field_orders = config.get("field_orders", {})
-                order = field_orders.get(template_name)
-            except Exception:
-                order = None
+        dynamic_fields = [ph for ph in placeholders if ph not in fixed_fields]
+
+        config_store = getattr(self.app, "config_store", None) or ConfigStore()
+        try:
+            order = config_store.get_field_order(template_name)
+        except Exception:
+            order = None
         if order:
             # Garante que só mantenha campos realmente presentes no template
             dynamic_ordered = [f for f in order if f in dynamic_fields] + [f for f in dynamic_fields if f not in order]
@@ -233,26 +232,8 @@ class QuickTemplatePopup(ctk.CTkToplevel):
         # Campos fixos sempre primeiro, na ordem padrão, depois os dinâmicos na ordem salva
         used_fields = fixed_present + dynamic_ordered
 
-        import re
-        def detect_field_type(name):
-            field_type = "entry"
-            field_label = name
-            radio_options = None
-
-            m = re.match(r"\[(checkbox|switch)\](.+)", name)
-            if m:
-                field_type = m.group(1)
-                field_label = m.group(2).strip()
-            else:
-                m = re.match(r"\[radio:([^\]]+)\](.+)", name)
-                if m:
-                    field_type = "radio"
-                    radio_options = [opt.strip() for opt in m.group(1).split("|")]
-                    field_label = m.group(2).strip()
-            return field_type, field_label, radio_options
-
         for i, field in enumerate(used_fields):
-            field_type, field_label, radio_options = detect_field_type(field)
+            field_type, field_label, radio_options = field_kind(field)
             label = ctk.CTkLabel(self.form_frame, text=field_label)
             label.grid(row=i, column=0, sticky="w", pady=(2, 2))
 
@@ -422,8 +403,6 @@ class QuickTemplatePopup(ctk.CTkToplevel):
 
     def copy_template(self):
         """Processa o template com os valores dos campos e copia para o clipboard"""
-        from main_window import placeholder_engine  # Importa aqui para evitar import circular
-
         logging.info("Copiando template processado para o clipboard...")
 
         template_name = self.template_var.get()
@@ -451,27 +430,8 @@ class QuickTemplatePopup(ctk.CTkToplevel):
                 value = str(entry.get())
             field_values[key] = value
 
-        # 2. Processa lógica condicional no template
-        def process_conditionals(template, field_values):
-            import re
-            def cond_repl(match):
-                field = match.group(1)
-                true_val = match.group(2)
-                false_val = match.group(3)
-                val = field_values.get(field, "")
-                # Valores considerados como verdadeiro
-                val_lower = str(val).lower()
-                return true_val if val_lower in {"sim", "true", "1"} else false_val
-            return re.sub(r"\$([^\$?]+)\?([^\|$]+)\|([^\$]+)\$", cond_repl, template)
-
-        content = process_conditionals(content, field_values)
-
-        # 3. Substitui placeholders simples
-        for key, value in field_values.items():
-            content = content.replace(f"${key}$", value or "")
-
-        # 4. Substitui placeholders automáticos/dinâmicos
-        content = placeholder_engine.process(content)
+        # 2. Renderiza condicionais, campos e placeholders automáticos em uma passada
+        content = template_compiler.render(content, field_values)
 
         import pyperclip
         pyperclip.copy(content)
@@ -533,3 +493,7 @@ class QuickTemplatePopup(ctk.CTkToplevel):
     def on_close(self):
         self._cancel_all_afters()
         self.destroy()
+
+    def destroy(self):
+        self.manager.remove_listener(self._on_templates_changed)
+        super().destroy()
@@ -3,6 +3,7 @@ from tkinter import messagebox
 from customtkinter import CTkInputDialog
 import logging
 from logger_config import auto_log_functions
+from linxfast.core import check
 
 # Get the module logger
 logger = logging.getLogger(__name__)
@@ -31,6 +32,8 @@ class TemplateEditor(ctk.CTkToplevel):
 
         self._build_interface()
         self.load_template(current_template)
+        # Lista e conteúdo acompanham mudanças na biblioteca (LibraryWatcher)
+        self.manager.add_listener(self._on_templates_changed)
 
     def _build_interface(self):
         self.grid_columnconfigure((0, 1), weight=1)
@@ -164,7 +167,6 @@ class TemplateEditor(ctk.CTkToplevel):
         self.refresh_placeholder_list(content)
 
     def refresh_placeholder_list(self, content):
-        all_placeholders = self.manager.extract_placeholders(content)
         fixed = self.get_placeholders()["fixed"]
         dynamic = self.get_placeholders()["dynamic"]
 
@@ -179,6 +181,13 @@ class TemplateEditor(ctk.CTkToplevel):
         for p in dynamic:
             self.placeholder_box.insert("end", f"${p}$\n")
 
+        # Erros de sintaxe (condicionais malformadas etc.) com linha e coluna
+        errors = check(content)
+        if errors:
+            self.placeholder_box.insert("end", "\n--- Avisos ---\n")
+            for error in errors:
+                self.placeholder_box.insert("end", f"{error}\n")
+
         self.placeholder_box.configure(state="disabled")
 
     def save_template(self):
@@ -228,10 +237,23 @@ class TemplateEditor(ctk.CTkToplevel):
         if self.original_name in self.template_names:
             self.template_var.set(self.manager.meta.get_display_name(self.original_name))
 
+    def _on_templates_changed(self, changes):
+        self.refresh_templates()
+        # Seleciona o template alterado, se fornecido
+        if changes.select:
+            self.original_name = changes.select
+            self.template_var.set(self.manager.meta.get_display_name(changes.select))
+            self.load_template(changes.select)
+        elif self.original_name in changes.modified and not self.has_unsaved_changes():
+            # Alterado fora do editor; não sobrescreve o que está sendo editado
+            if self.manager.get_template(self.original_name) != self.last_saved_content:
+                self.load_template(self.original_name)
+
     def toggle_favorite(self):
         real = self.get_real_name()
         self.manager.meta.toggle_favorite(real)
-        self.refresh_templates()
+        # Todas as janelas: ⭐ no nome e prioridade no type-ahead
+        self.manager.notify()
 
     def toggle_protected(self):
         real = self.get_real_name()
@@ -239,7 +261,7 @@ class TemplateEditor(ctk.CTkToplevel):
             messagebox.showinfo("Aviso", "Templates favoritos já são protegidos automaticamente.")
             return
         self.manager.meta.toggle_protected(real)
-        self.refresh_templates()
+        self.manager.notify()
 
     def show_autocomplete(self, event=None):
         placeholders = self.manager.extract_placeholders(self.content_box.get("1.0", "end"))
@@ -280,3 +302,7 @@ class TemplateEditor(ctk.CTkToplevel):
     def on_close(self):
         self._cancel_all_afters()
         self.destroy()
+
+    def destroy(self):
+        self.manager.remove_listener(self._on_templates_changed)
+        super().destroy()
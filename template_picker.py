@@ -0,0 +1,177 @@
+import customtkinter as ctk
+import tkinter as tk
+import logging
+from linxfast.core import FuzzyMatcher
+
+# Get the module logger
+logger = logging.getLogger(__name__)
+
+
+class TemplatePicker(ctk.CTkEntry):
+    """
+    Campo com sugestões (type-ahead) para escolher um template pelo nome.
+
+    Cada tecla filtra os nomes com o FuzzyMatcher (subsequência, sem acentos,
+    favoritos primeiro) e mostra o resultado numa lista logo abaixo do campo.
+    Setas navegam, Enter/clique escolhem, Esc fecha a lista. Seta para baixo
+    com o campo vazio lista todos os templates.
+
+    command(nome) recebe o template escolhido; on_query(texto) é chamado a cada
+    mudança do texto, on_submit() no Enter sem sugestões e on_cancel() no Esc
+    com a lista já fechada. 'display' converte o nome para exibição (ex.: ⭐).
+    """
+
+    def __init__(self, master, command=None, on_query=None, on_submit=None, on_cancel=None,
+                 display=None, keep_selection=False, max_results=200, visible_rows=10, **kwargs):
+        super().__init__(master, **kwargs)
+        self.matcher = FuzzyMatcher()
+        self.command = command
+        self.on_query = on_query
+        self.on_submit = on_submit
+        self.on_cancel = on_cancel
+        self.display = display or str
+        self.keep_selection = keep_selection
+        self.max_results = max_results
+        self.visible_rows = visible_rows
+        self._results = []
+        self._popup = None
+        self._listbox = None
+        self._idle_id = None
+        self._hide_id = None
+
+        self.bind("<KeyRelease>", self._on_key)
+        self.bind("<Down>", lambda e: self._move(1))
+        self.bind("<Up>", lambda e: self._move(-1))
+        self.bind("<Return>", self._on_return)
+        self.bind("<Escape>", self._on_escape)
+        self.bind("<FocusOut>", self._on_focus_out)
+
+    def set_values(self, names, favorites=()):
+        """Troca a lista de templates; a lista aberta é refeita com o texto atual."""
+        self.matcher.set_items(names, favorites)
+        if self._popup is not None:
+            self._update()
+
+    # --- digitação ---
+
+    def _on_key(self, event):
+        if event.keysym in ("Up", "Down", "Return", "Escape", "Tab") or event.keysym.startswith(
+            ("Shift", "Control", "Alt")
+        ):
+            return
+        # Várias teclas até o Tk ficar ocioso = uma busca
+        if self._idle_id is None:
+            self._idle_id = self.after_idle(self._update)
+
+    def _update(self, show_all=False):
+        self._idle_id = None
+        query = self.get()
+        if query.strip() or show_all:
+            self._results = self.matcher.match(query, self.max_results)
+        else:
+            self._results = []
+        if self._results:
+            self._show()
+        else:
+            self._hide()
+        if self.on_query is not None and not show_all:
+            self.on_query(query)
+
+    def _move(self, delta):
+        if self._popup is None:
+            self._update(show_all=True)
+            return "break"
+        listbox = self._listbox
+        current = listbox.curselection()
+        index = (current[0] + delta) if current else 0
+        index = max(0, min(index, listbox.size() - 1))
+        listbox.selection_clear(0, "end")
+        listbox.selection_set(index)
+        listbox.see(index)
+        return "break"
+
+    def _on_return(self, event=None):
+        if self._popup is not None and self._results:
+            current = self._listbox.curselection()
+            self._pick(self._results[current[0] if current else 0])
+        elif self.on_submit is not None:
+            self.on_submit()
+        return "break"
+
+    def _on_escape(self, event=None):
+        if self._popup is not None:
+            self._hide()
+        elif self.on_cancel is not None:
+            self.on_cancel()
+        return "break"
+
+    def _pick(self, name):
+        self._hide()
+        self.delete(0, "end")
+        if self.keep_selection:
+            self.insert(0, self.display(name))
+        if self.command is not None:
+            self.command(name)
+
+    # --- lista de sugestões ---
+
+    def _show(self):
+        if self._popup is None:
+            self._popup = tk.Toplevel(self)
+            self._popup.overrideredirect(True)
+            self._popup.attributes("-topmost", True)
+            self._listbox = tk.Listbox(
+                self._popup,
+                activestyle="none",
+                exportselection=False,
+                borderwidth=1,
+                highlightthickness=0,
+                bg=self._apply_appearance_mode(ctk.ThemeManager.theme["CTkEntry"]["fg_color"]),
+                fg=self._apply_appearance_mode(ctk.ThemeManager.theme["CTkEntry"]["text_color"]),
+                selectbackground=self._apply_appearance_mode(
+                    ctk.ThemeManager.theme["CTkButton"]["fg_color"]
+                ),
+            )
+            self._listbox.pack(fill="both", expand=True)
+            self._listbox.bind("<ButtonRelease-1>", self._on_click)
+        listbox = self._listbox
+        listbox.delete(0, "end")
+        listbox.insert("end", *map(self.display, self._results))
+        listbox.configure(height=min(len(self._results), self.visible_rows))
+        listbox.selection_set(0)
+        self._popup.geometry(
+            f"{self.winfo_width()}x{listbox.winfo_reqheight()}"
+            f"+{self.winfo_rootx()}+{self.winfo_rooty() + self.winfo_height()}"
+        )
+
+    def _hide(self):
+        if self._popup is not None:
+            self._popup.destroy()
+            self._popup = None
+            self._listbox = None
+
+    def _on_click(self, event):
+        index = self._listbox.nearest(event.y)
+        if 0 <= index < len(self._results):
+            self._pick(self._results[index])
+
+    def _on_focus_out(self, event=None):
+        # O clique na lista tira o foco do campo antes do ButtonRelease
+        if self._hide_id is None:
+            self._hide_id = self.after(200, self._hide_if_unfocused)
+
+    def _hide_if_unfocused(self):
+        self._hide_id = None
+        focus = self.focus_get()
+        if focus is None or not str(focus).startswith(str(self)):
+            self._hide()
+
+    def destroy(self):
+        for after_id in (self._idle_id, self._hide_id):
+            if after_id is not None:
+                try:
+                    self.after_cancel(after_id)
+                except Exception:
+                    pass
+        self._hide()
+        super().destroy()
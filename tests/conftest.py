@@ -0,0 +1,17 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def user_cache_dir(tmp_path, monkeypatch):
+    """Caches por usuário (linxfast/core/paths.py) numa pasta temporária."""
+    path = tmp_path / "user-cache"
+    monkeypatch.setenv("LINXFASTCACHEDIR", str(path))
+    return path
+
+
+@pytest.fixture(autouse=True)
+def user_data_dir(tmp_path, monkeypatch):
+    """Dados por usuário (histórico de revisões) numa pasta temporária."""
+    path = tmp_path / "user-data"
+    monkeypatch.setenv("LINXFASTDATADIR", str(path))
+    return path
@@ -0,0 +1,151 @@
+"""
+Exportação e importação da biblioteca (archive.py), com cada política de
+conflito de nome, e a validação que impede importações pela metade.
+"""
+
+import gzip
+import json
+
+import pytest
+
+from linxfast.core import (
+    ConfigStore,
+    TemplateManager,
+    export_library,
+    import_library,
+    validate_archive,
+)
+from linxfast.core.archive import CONFLICT_POLICIES
+
+
+def _set_meta(manager, name, **fields):
+    meta = manager.meta
+    key = meta._find_meta_key(name)
+    meta._ensure_entry(key)
+    meta.meta[key].update(fields)
+    meta._save()
+
+
+@pytest.fixture
+def archive(tmp_path):
+    source = TemplateManager(str(tmp_path / "origem"))
+    source.add_template("Suporte / Novo", "novo $cliente$")
+    source.add_template("Suporte / Remoto", "remoto v2")
+    source.add_template("Vendas / Igual", "mesmo texto")
+    source.add_template("Vendas / Oferta", "oferta nova $cliente$ $valor$")
+    _set_meta(source, "Suporte / Remoto", nocodb_id="42")
+    _set_meta(source, "Vendas / Igual", favorito=True)
+    _set_meta(source, "Vendas / Oferta", favorito=True)
+    config = ConfigStore(str(tmp_path / "origem.json"))
+    config.set_field_orders({"Vendas / Oferta": ["valor", "cliente"]})
+    path = str(tmp_path / "biblioteca.jsonl.gz")
+    # Uma pasta nova já começa com o "Template Padrão"
+    assert export_library(source, path, config) == 5
+    return path
+
+
+@pytest.fixture
+def target(tmp_path):
+    manager = TemplateManager(str(tmp_path / "destino"))
+    manager.add_template("Outros / Cópia", "mesmo texto")
+    manager.add_template("Suporte / Acesso remoto", "remoto v1")
+    manager.add_template("Vendas / Oferta", "oferta antiga")
+    _set_meta(manager, "Suporte / Acesso remoto", nocodb_id="42")
+    _set_meta(manager, "Vendas / Oferta", protegido=True)
+    return manager
+
+
+def test_export_is_gzip_jsonl_with_header_and_end(archive):
+    with gzip.open(archive, "rt", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert records[0]["format"] == "linxfast-library"
+    assert records[-1] == {"end": True, "templates": 5}
+    names = [r["name"] for r in records[1:-1]]
+    assert names == sorted(names)
+    oferta = records[-2]
+    assert oferta["meta"]["favorito"] is True
+    assert oferta["field_order"] == ["valor", "cliente"]
+    assert validate_archive(archive) == 5
+
+
+def test_round_trip_into_empty_library(archive, tmp_path):
+    manager = TemplateManager(str(tmp_path / "vazia"))
+    result = import_library(manager, archive)
+    assert sorted(result.added) == ["Suporte / Novo", "Suporte / Remoto", "Vendas / Igual", "Vendas / Oferta"]
+    assert result.merged == [("Template Padrão", "Template Padrão")]
+    assert manager.get_template("Vendas / Oferta") == "oferta nova $cliente$ $valor$"
+    assert manager.meta.is_favorite("Vendas / Oferta")
+    assert manager.find_by_nocodb_id("42") == ["Suporte / Remoto"]
+
+
+@pytest.mark.parametrize("policy", CONFLICT_POLICIES)
+def test_conflict_policies(archive, target, tmp_path, policy):
+    config = ConfigStore(str(tmp_path / "destino.json"))
+    result = import_library(target, archive, config, on_conflict=policy)
+
+    # Independentes da política: nocodb_id, mesmo conteúdo e nome novo
+    assert result.added == ["Suporte / Novo"]
+    assert "Suporte / Acesso remoto" in result.updated
+    assert target.get_template("Suporte / Acesso remoto") == "remoto v2"
+    assert "Suporte / Remoto" not in target.templates
+    assert ("Vendas / Igual", "Outros / Cópia") in result.merged
+    assert target.meta.is_favorite("Outros / Cópia")
+
+    oferta = target.get_template("Vendas / Oferta")
+    order = config.get_field_order("Vendas / Oferta")
+    if policy == "rename":
+        assert result.renamed == [("Vendas / Oferta", "Vendas / Oferta (importado)")]
+        assert oferta == "oferta antiga"
+        assert target.get_template("Vendas / Oferta (importado)") == "oferta nova $cliente$ $valor$"
+        assert config.get_field_order("Vendas / Oferta (importado)") == ["valor", "cliente"]
+    elif policy == "overwrite":
+        assert "Vendas / Oferta" in result.updated
+        assert oferta == "oferta nova $cliente$ $valor$"
+        # O meta local é mantido e o do arquivo é somado
+        assert target.meta.is_favorite("Vendas / Oferta")
+        assert target.meta._entry("Vendas / Oferta")["protegido"] is True
+        assert order == ["valor", "cliente"]
+    else:
+        assert result.skipped == ["Vendas / Oferta"]
+        assert oferta == "oferta antiga"
+        assert order is None
+        assert not target.meta.is_favorite("Vendas / Oferta")
+
+
+def test_importing_twice_changes_nothing(archive, target):
+    import_library(target, archive)
+    again = import_library(target, archive)
+    assert again.added == [] and again.updated == []
+    assert again.unchanged == ["Suporte / Acesso remoto"]
+
+
+def test_unknown_policy_is_rejected(archive, target):
+    with pytest.raises(ValueError):
+        import_library(target, archive, on_conflict="merge")
+
+
+def test_invalid_archive_changes_nothing(archive, target, tmp_path):
+    with gzip.open(archive, "rt", encoding="utf-8") as f:
+        lines = f.readlines()
+    record = json.loads(lines[1])
+    record["content"] += " alterado"  # o hash não confere mais
+    lines[1] = json.dumps(record) + "\n"
+    broken = tmp_path / "quebrado.jsonl"
+    # Sem o registro final: o arquivo também está truncado
+    broken.write_text("".join(lines[:-1]), encoding="utf-8")
+    before = {name: target.get_template(name) for name in target.templates}
+
+    with pytest.raises(ValueError) as error:
+        validate_archive(str(broken))
+    assert "hash não confere" in str(error.value)
+    assert "sem o registro final" in str(error.value)
+    with pytest.raises(ValueError):
+        import_library(target, str(broken))
+    assert {name: target.get_template(name) for name in target.templates} == before
+
+
+def test_not_an_archive(tmp_path):
+    path = tmp_path / "outro.jsonl"
+    path.write_text('{"format": "outro"}\n', encoding="utf-8")
+    with pytest.raises(ValueError, match="Não é um arquivo"):
+        validate_archive(str(path))
@@ -0,0 +1,72 @@
+"""
+atomic_write/atomic_open (temporário + rename) e CoalescingWriter, que agrupa
+as gravações do mesmo arquivo numa thread.
+"""
+
+import time
+
+import pytest
+
+from linxfast.core import CoalescingWriter, atomic_open, atomic_write
+
+
+def _leftovers(directory):
+    return [p.name for p in directory.iterdir() if p.name.endswith(".tmp")]
+
+
+def test_atomic_write_replaces_text_and_bytes(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text("antigo", encoding="utf-8")
+    atomic_write(str(path), "novo: ção")
+    assert path.read_text(encoding="utf-8") == "novo: ção"
+    atomic_write(str(path), b"\x00\x01")
+    assert path.read_bytes() == b"\x00\x01"
+    assert _leftovers(tmp_path) == []
+
+
+def test_error_keeps_the_old_file_and_removes_the_temporary(tmp_path):
+    path = tmp_path / "meta.json"
+    path.write_text("antigo", encoding="utf-8")
+    with pytest.raises(RuntimeError):
+        with atomic_open(str(path)) as f:
+            f.write("metade")
+            raise RuntimeError("caiu no meio")
+    assert path.read_text(encoding="utf-8") == "antigo"
+    assert _leftovers(tmp_path) == []
+
+
+def test_unencodable_text_keeps_the_old_file(tmp_path):
+    path = tmp_path / "meta.json"
+    path.write_text("antigo", encoding="utf-8")
+    with pytest.raises(UnicodeEncodeError):
+        atomic_write(str(path), "ção", encoding="ascii")
+    assert path.read_text(encoding="utf-8") == "antigo"
+    assert _leftovers(tmp_path) == []
+
+
+def test_flush_writes_only_the_last_version(tmp_path):
+    # Atraso longo: nada é gravado pela thread durante o teste
+    writer = CoalescingWriter(delay=60)
+    path = str(tmp_path / "config.json")
+    writer.write(path, "1")
+    writer.write(path, "2")
+    writer.write(path, "3")
+    assert writer.pending(path) == "3"
+    assert not (tmp_path / "config.json").exists()
+
+    writer.flush()
+    assert (tmp_path / "config.json").read_text(encoding="utf-8") == "3"
+    assert writer.writes == 1
+    assert writer.pending(path) is None
+
+
+def test_background_thread_writes_after_the_delay(tmp_path):
+    writer = CoalescingWriter(delay=0.2)
+    path = tmp_path / "config.json"
+    writer.write(str(path), "a")
+    writer.write(str(path), "b")
+    deadline = time.monotonic() + 5
+    while writer.pending(str(path)) is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert path.read_text(encoding="utf-8") == "b"
+    assert writer.writes == 1
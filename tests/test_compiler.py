@@ -0,0 +1,27 @@
+"""
+Condicionais do compilador de templates (compiler.py) com checkbox e switch.
+
+Os formulários gravam "Sim"/"Não" para os dois tipos (CTkSwitch com
+offvalue="Não" no Modo Simples), então "Não" tem que cair no ramo falso.
+"""
+
+import pytest
+
+from linxfast.core import TemplateCompiler, is_truthy
+
+
+@pytest.mark.parametrize("field", ["[switch]Ativo", "[checkbox]Ativo"])
+@pytest.mark.parametrize("value, expected", [("Sim", "ligado"), ("Não", "desligado"), ("", "desligado")])
+def test_toggle_conditional(field, value, expected):
+    content = f"${field}?ligado|desligado$"
+    assert TemplateCompiler().render(content, {field: value}) == expected
+
+
+def test_switch_off_is_false():
+    assert not is_truthy("[switch]Ativo", "Não")
+    assert is_truthy("[switch]Ativo", "Sim")
+
+
+def test_plain_field_is_true_when_filled():
+    assert is_truthy("Cliente", "Não")
+    assert not is_truthy("Cliente", "")
@@ -0,0 +1,145 @@
+"""
+ExternalDataService contra um servidor HTTP local de verdade: prefetch em
+segundo plano, cache com TTL e, quando o serviço não responde a tempo, o
+placeholder sem valor em vez de travar a cópia.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import pytest
+
+from linxfast.core import ExternalDataService, http_fetcher
+from linxfast.core.compiler import CompiledTemplate, parse
+from linxfast.core.engine import PlaceholderEngine
+
+SLOW = 1.0  # segundos que /lento demora para responder
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        if self.path.startswith("/lento"):
+            time.sleep(SLOW)
+        cnpj = unquote(self.path.rsplit("/", 1)[-1])
+        body = json.dumps({"cliente": {"nome": f"Cliente {cnpj}"}}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def service(clock):
+    service = ExternalDataService(PlaceholderEngine(), clock=clock)
+    yield service
+    service.shutdown()
+
+
+def _register(service, server, path="clientes", timeout=2.0, ttl=60):
+    url = f"http://127.0.0.1:{server.server_port}/{path}/{{CNPJ}}"
+    return service.register("ClienteNome", http_fetcher(url, "cliente.nome", ("CNPJ",)),
+                            fields=("CNPJ",), ttl=ttl, timeout=timeout)
+
+
+def _wait_pending(service):
+    for future in list(service._pending.values()):
+        future.result(timeout=5)
+
+
+def test_prefetch_fills_the_cache_for_the_render(service, server):
+    _register(service, server)
+    values = {"CNPJ": "12.345/0001"}
+    service.prefetch(values)
+    _wait_pending(service)
+    assert server.requests == ["/clientes/12.345%2F0001"]
+
+    template = CompiledTemplate(parse("Cliente: $ClienteNome$", service.engine.handlers), service.engine)
+    assert template.render(values) == "Cliente: Cliente 12.345/0001"
+    assert service.get("ClienteNome", values) == "Cliente 12.345/0001"
+    # Render e get vieram do cache
+    assert len(server.requests) == 1
+
+
+def test_missing_field_does_not_fetch(service, server):
+    _register(service, server)
+    service.prefetch({"CNPJ": "  "})
+    assert service.get("ClienteNome", {}) is None
+    assert server.requests == []
+
+
+def test_cache_hit_until_ttl_expires(service, server, clock):
+    _register(service, server, ttl=60)
+    values = {"CNPJ": "1"}
+    assert service.get("ClienteNome", values, wait=5) == "Cliente 1"
+    clock.now += 59
+    service.prefetch(values)
+    assert service.get("ClienteNome", values) == "Cliente 1"
+    assert len(server.requests) == 1
+
+    clock.now += 2
+    # Expirou: sem esperar, o valor ainda não está lá; a busca é refeita
+    assert service.get("ClienteNome", values) is None
+    _wait_pending(service)
+    assert service.get("ClienteNome", values) == "Cliente 1"
+    assert len(server.requests) == 2
+
+
+def test_timeout_falls_back_to_none_without_retrying(service, server, clock):
+    _register(service, server, path="lento", timeout=0.2)
+    values = {"CNPJ": "9"}
+    start = time.monotonic()
+    assert service.get("ClienteNome", values, wait=5) is None
+    assert time.monotonic() - start < SLOW
+    # A falha fica em cache por error_ttl: nada de nova busca a cada tecla
+    service.prefetch(values)
+    assert service.get("ClienteNome", values) is None
+    assert len(server.requests) == 1
+
+    clock.now += service.error_ttl + 1
+    service.prefetch(values)
+    _wait_pending(service)
+    assert len(server.requests) == 2
+
+
+def test_render_does_not_wait_for_the_network(service, server):
+    _register(service, server, path="lento")
+    template = CompiledTemplate(parse("Cliente: $ClienteNome$", service.engine.handlers), service.engine)
+    start = time.monotonic()
+    rendered = template.render({"CNPJ": "5"})
+    assert time.monotonic() - start < SLOW / 2
+    assert "Cliente 5" not in rendered
+    _wait_pending(service)
+    assert template.render({"CNPJ": "5"}) == "Cliente: Cliente 5"
@@ -0,0 +1,42 @@
+"""
+Versão curta e determinística do fuzz (benchmarks/fuzz.py): o render novo
+produz o mesmo texto que a implementação antiga (legacy_reference.py) e os
+tokens/LivePreview continuam consistentes em entradas malformadas. Sem as
+medidas de tempo, que ficam para o benchmark.
+"""
+
+import random
+
+from benchmarks import legacy_reference
+from benchmarks.fuzz import (
+    NOW,
+    _cold_render,
+    adversarial_case,
+    check_preview,
+    check_tokens,
+    compat_case,
+)
+
+SEED = 20250131
+COMPAT_CASES = 400
+ADVERSARIAL_CASES = 150
+
+
+def test_new_renderer_matches_legacy():
+    rng = random.Random(SEED)
+    for index in range(COMPAT_CASES):
+        case = compat_case(rng)
+        template, values = case["template"], case["values"]
+        expected = legacy_reference.render(template, values, NOW)
+        assert _cold_render(template, values) == expected, f"caso {index}: {template!r} {values!r}"
+
+
+def test_malformed_templates_keep_tokens_and_preview_consistent():
+    rng = random.Random(SEED)
+    for index in range(ADVERSARIAL_CASES):
+        case = adversarial_case(rng)
+        template, values = case["template"], case["values"]
+        _cold_render(template, values)
+        assert check_tokens(template) is None, f"caso {index}: {template!r}"
+        assert check_preview(template, values, rng) is None, f"caso {index}: {template!r}"
+
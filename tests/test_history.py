@@ -0,0 +1,58 @@
+"""
+Histórico de revisões (history.py) pelo TemplateManager: onde fica e como
+uma revisão anterior é restaurada (janela de comparação do NocoDB).
+"""
+
+import os
+
+from linxfast.core import RevisionStore, TemplateManager
+
+NOME = "Suporte / Encerramento"
+
+
+def test_history_lives_in_user_data_not_in_template_folder(tmp_path, user_data_dir):
+    manager = TemplateManager(str(tmp_path / "templates"))
+    manager.add_template(NOME, "v1")
+    manager.save_template(NOME, NOME, "v2")
+    directory = manager.history.directory
+    assert os.path.commonpath([directory, str(user_data_dir)]) == str(user_data_dir)
+    assert os.listdir(directory)
+    assert not (tmp_path / "templates" / ".history").exists()
+
+
+def test_legacy_history_folder_is_moved(tmp_path):
+    folder = tmp_path / "templates"
+    legacy = RevisionStore(str(folder / ".history"))
+    legacy.record(NOME, "antigo")
+    legacy.record(NOME, "atual")
+
+    manager = TemplateManager(str(folder))
+    assert not (folder / ".history").exists()
+    texts = [manager.get_revision(NOME, index) for index, _ in manager.get_revisions(NOME)]
+    assert texts == ["antigo", "atual"]
+
+
+def test_restore_previous_revision_after_overwrite(tmp_path):
+    manager = TemplateManager(str(tmp_path / "templates"))
+    manager.add_template(NOME, "texto local")
+    # "Usar do NocoDB" sobrescreve o local
+    manager.save_template(NOME, NOME, "texto do NocoDB")
+
+    revisions = manager.get_revisions(NOME)
+    assert [manager.get_revision(NOME, index) for index, _ in revisions] == [
+        "texto local",
+        "texto do NocoDB",
+    ]
+
+    assert manager.restore_revision(NOME, revisions[0][0]) == "texto local"
+    assert manager.get_template(NOME, fresh=True) == "texto local"
+    # A restauração também é uma revisão: dá para voltar ao texto do NocoDB
+    assert manager.get_revision(NOME, -2) == "texto do NocoDB"
+
+
+def test_history_follows_rename(tmp_path):
+    manager = TemplateManager(str(tmp_path / "templates"))
+    manager.add_template(NOME, "v1")
+    manager.save_template(NOME, "Outra / Encerramento", "v2")
+    assert manager.get_revision("Outra / Encerramento", 0) == "v1"
+    assert manager.get_revisions(NOME) == []
@@ -0,0 +1,90 @@
+"""
+TemplateListing: inserções, renomeações e remoções por bisect devem deixar a
+lista igual à de TemplateMeta.get_sorted_templates feita do zero.
+"""
+
+import pytest
+
+from linxfast.core import TemplateMeta
+from linxfast.core.listing import TemplateListing
+
+NOMES = [
+    "Geral / Boas-vindas",
+    "Geral / agradecimento",
+    "Vendas / Oferta",
+    "Suporte / Reset de senha",
+    "Suporte / abertura",
+    "Vendas / Cobrança",
+]
+
+
+@pytest.fixture
+def meta(tmp_path):
+    meta = TemplateMeta(str(tmp_path), save_delay=None)
+    meta.toggle_favorite("Vendas / Oferta")
+    meta.toggle_protected("Suporte / abertura")
+    return meta
+
+
+def _check(listing, meta, names):
+    expected = meta.get_sorted_templates(names)
+    assert listing.names() == expected
+    assert listing.display_names() == [meta.get_display_name(n) for n in expected]
+    assert len(listing) == len(expected)
+
+
+def test_initial_order_matches_meta(meta):
+    listing = TemplateListing(meta, NOMES)
+    _check(listing, meta, NOMES)
+    assert listing.names()[0] == "Vendas / Oferta"
+    assert listing.real_name("🔒 Suporte / abertura") == "Suporte / abertura"
+
+
+def test_insert(meta):
+    listing = TemplateListing(meta, NOMES)
+    version = listing.version
+    listing.add("Geral / Aviso")
+    listing.add("Suporte / Zebra")
+    _check(listing, meta, NOMES + ["Geral / Aviso", "Suporte / Zebra"])
+    assert listing.version == version + 2
+    # Repetido não muda nada
+    listing.add("Geral / Aviso")
+    assert listing.version == version + 2
+
+
+def test_rename_keeps_flags_of_the_new_name(meta):
+    listing = TemplateListing(meta, NOMES)
+    meta.meta["Vendas / Oferta nova"] = meta.meta.pop("Vendas / Oferta")
+    listing.rename("Vendas / Oferta", "Vendas / Oferta nova")
+    names = [n for n in NOMES if n != "Vendas / Oferta"] + ["Vendas / Oferta nova"]
+    _check(listing, meta, names)
+    assert "Vendas / Oferta" not in listing
+    assert listing.real_name("⭐ Vendas / Oferta nova") == "Vendas / Oferta nova"
+    assert listing.real_name("⭐ Vendas / Oferta") == "Vendas / Oferta"
+
+
+def test_delete(meta):
+    listing = TemplateListing(meta, NOMES)
+    listing.remove("Suporte / abertura")
+    listing.remove("Suporte / inexistente")
+    _check(listing, meta, [n for n in NOMES if n != "Suporte / abertura"])
+    assert "Suporte / abertura" not in listing
+
+
+def test_update_applies_scan_changes(meta):
+    listing = TemplateListing(meta, NOMES)
+    listing.update(added={"Geral / Novo"}, removed={"Vendas / Cobrança"})
+    names = [n for n in NOMES if n != "Vendas / Cobrança"] + ["Geral / Novo"]
+    _check(listing, meta, names)
+    # Muitas mudanças de uma vez refazem a lista; o resultado é o mesmo
+    many = {f"Outros / T{i}" for i in range(10)}
+    listing.update(added=many, removed={"Geral / Novo"})
+    _check(listing, meta, set(names) - {"Geral / Novo"} | many)
+
+
+def test_meta_changes_move_only_what_changed(meta):
+    listing = TemplateListing(meta, NOMES)
+    meta.toggle_favorite("Suporte / Reset de senha")
+    meta.toggle_favorite("Vendas / Oferta")
+    _check(listing, meta, NOMES)
+    assert listing.names()[0] == "Suporte / Reset de senha"
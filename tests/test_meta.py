@@ -0,0 +1,76 @@
+"""
+TemplateMeta: entradas duplicadas por capitalização são unificadas uma vez, na
+carga, e as consultas por nome não diferenciam maiúsculas.
+"""
+
+import json
+
+from linxfast.core import TemplateMeta, background_writer
+
+
+def _meta(tmp_path, entries):
+    (tmp_path / "meta.json").write_text(json.dumps(entries), encoding="utf-8")
+    return TemplateMeta(str(tmp_path), save_delay=None)
+
+
+def _saved(tmp_path):
+    background_writer.flush()
+    return json.loads((tmp_path / "meta.json").read_text(encoding="utf-8"))
+
+
+def test_pair_differing_only_in_case_keeps_the_merged_entry(tmp_path):
+    meta = _meta(tmp_path, {"A / x": {"favorito": True}, "A / X": {"nocodb_id": 7}})
+    assert dict(meta.meta) == {"A / X": {"favorito": True, "nocodb_id": 7}}
+    assert _saved(tmp_path) == {"A / X": {"favorito": True, "nocodb_id": 7}}
+
+
+def test_duplicates_merge_flags_and_nocodb_id(tmp_path):
+    meta = _meta(
+        tmp_path,
+        {
+            "Geral / saudação": {"favorito": True},
+            "Geral / Saudação": {"nocodb_id": 7},
+            "Geral / SAUDAÇÃO": {"protegido": True, "favorito": False},
+        },
+    )
+    [(name, entry)] = meta.meta.items()
+    assert name.lower() == "geral / saudação"
+    assert entry == {"favorito": True, "protegido": True, "nocodb_id": 7}
+    assert meta.meta.with_nocodb_id(7) == [name]
+
+
+def test_template_name_is_capitalized_but_not_the_folder(tmp_path):
+    meta = _meta(tmp_path, {"vendas / oferta": {"nocodb_id": 3}})
+    assert list(meta.meta) == ["vendas / Oferta"]
+    assert meta.meta.with_nocodb_id("3") == ["vendas / Oferta"]
+
+
+def test_clean_meta_is_not_saved_on_load(tmp_path):
+    meta = _meta(tmp_path, {"Geral / Oi": {"favorito": True}, "Geral / Tchau": {}})
+    assert meta.saves == 0 and not meta.dirty
+
+
+def test_lookups_ignore_case(tmp_path):
+    meta = _meta(tmp_path, {"Geral / Oi": {"favorito": True}, "Geral / Tchau": {"protegido": True}})
+    assert meta.is_favorite("GERAL / oi")
+    assert meta.is_protected("geral / tchau")
+    assert meta.get_display_name("geral / oi") == "⭐ geral / oi"
+    assert not meta.is_favorite("Geral / Outro")
+
+
+def test_toggle_uses_the_existing_key(tmp_path):
+    meta = _meta(tmp_path, {"Geral / Oi": {}})
+    meta.toggle_favorite("geral / OI")
+    assert dict(meta.meta) == {"Geral / Oi": {"favorito": True, "protegido": False}}
+
+
+def test_direct_edits_keep_the_index(tmp_path):
+    # A interface ainda altera meta.meta diretamente (renomear, importar)
+    meta = _meta(tmp_path, {"Geral / Velho": {"favorito": True, "nocodb_id": 1}})
+    meta.meta["Geral / Novo"] = meta.meta.pop("Geral / Velho")
+    assert meta.meta.find("geral / velho") is None
+    assert meta.is_favorite("GERAL / NOVO")
+    assert meta.meta.with_nocodb_id(1) == ["Geral / Novo"]
+    meta.meta["Geral / Novo"]["nocodb_id"] = 2
+    assert meta.meta.with_nocodb_id(1) == []
+    assert meta.meta.with_nocodb_id(2) == ["Geral / Novo"]
@@ -0,0 +1,119 @@
+"""
+Pack da biblioteca (pack.py) e como o TemplateManager o grava.
+"""
+
+import os
+
+from linxfast.core import LibraryPack, TemplateManager, build_info, write_pack
+from linxfast.core.storage import content_hash
+
+
+def _library(tmp_path, count=5):
+    manager = TemplateManager(str(tmp_path / "templates"))
+    for index in range(count):
+        manager.add_template(f"Cat {index % 2} / Template {index}", f"Olá $nome$ {index}")
+    manager.templates.scan()
+    return manager
+
+
+def test_pack_lives_in_user_cache_not_in_template_folder(tmp_path, user_cache_dir):
+    manager = _library(tmp_path)
+    assert manager.save_pack()
+    assert os.path.commonpath([manager.pack_path, str(user_cache_dir)]) == str(user_cache_dir)
+    assert not any(name.endswith(".lfpack") for name in os.listdir(manager.template_dir))
+
+
+def test_legacy_pack_in_template_folder_is_removed(tmp_path):
+    folder = tmp_path / "templates"
+    folder.mkdir()
+    (folder / "library.lfpack").write_bytes(b"antigo")
+    TemplateManager(str(folder))
+    assert not (folder / "library.lfpack").exists()
+
+
+def test_prepared_pack_is_swapped_in_on_save(tmp_path):
+    manager = _library(tmp_path)
+    manager.prepare_pack()
+    assert os.path.exists(manager.prepared_pack_path)
+    assert manager.save_pack()
+    assert not os.path.exists(manager.prepared_pack_path)
+    assert manager.templates.pack.matches(manager.templates.index)
+
+
+def test_save_pack_gives_up_past_max_reads(tmp_path):
+    manager = _library(tmp_path)
+    assert not manager.save_pack(max_reads=2)
+    assert manager.templates.pack is None
+    assert manager.save_pack(max_reads=10)
+
+
+def test_save_pack_rebuilds_only_changes_after_prepare(tmp_path):
+    manager = _library(tmp_path)
+    manager.prepare_pack()
+    manager.save_template("Cat 0 / Template 0", "Cat 0 / Template 0", "novo $campo$")
+    manager.templates.scan()
+    # Só o template alterado precisa ser lido do backend
+    assert manager.save_pack(max_reads=1)
+    index = manager.templates.index
+    assert manager.templates.pack.content("Cat 0 / Template 0", index["Cat 0 / Template 0"]) == "novo $campo$"
+
+
+def _items():
+    return [
+        ("Geral / Oi", (1, 10, 100), "Olá $nome$, $[checkbox]VIP?cliente VIP|cliente$"),
+        ("Vendas / Data", (2, 20, 200), "Hoje: $Agora$\n$A?x $B$ y$"),
+        ("Vendas / Vazio", (3, 0, 300), ""),
+    ]
+
+
+def _write(tmp_path, automatic=("Agora",)):
+    items = [(name, sig, content, build_info(content, automatic)) for name, sig, content in _items()]
+    path = str(tmp_path / "library.lfpack")
+    write_pack(path, items, automatic)
+    return LibraryPack.open(path)
+
+
+def test_round_trip_content_digest_and_info(tmp_path):
+    pack = _write(tmp_path)
+    assert len(pack) == 3
+    for name, signature, content in _items():
+        assert pack.content(name, signature) == content
+        assert pack.digest(name, signature) == content_hash(content)
+        expected = build_info(content, ("Agora",))
+        info = pack.info(name, signature, ("Agora",))
+        assert info.fields == expected.fields
+        assert info.normal_fields == expected.normal_fields
+        assert info.conditional_fields == expected.conditional_fields
+        assert info.automatic_fields == expected.automatic_fields
+        assert [(e.message, e.line, e.column, e.offset) for e in info.errors] == [
+            (e.message, e.line, e.column, e.offset) for e in expected.errors
+        ]
+    assert pack.info("Vendas / Data", (2, 20, 200), ("Agora",)).errors
+    assert pack.matches({name: signature for name, signature, _ in _items()})
+    pack.close()
+
+
+def test_signature_mismatch_returns_none(tmp_path):
+    pack = _write(tmp_path)
+    # mtime, tamanho ou inode diferentes: o .txt mudou depois do pack
+    for signature in ((9, 10, 100), (1, 11, 100), (1, 10, 101), None):
+        assert pack.content("Geral / Oi", signature) is None
+        assert pack.digest("Geral / Oi", signature) is None
+        assert pack.info("Geral / Oi", signature, ("Agora",)) is None
+    assert pack.content("Geral / Outro", (1, 10, 100)) is None
+    assert not pack.matches({"Geral / Oi": (9, 10, 100)})
+    pack.close()
+
+
+def test_info_needs_the_same_automatic_names(tmp_path):
+    pack = _write(tmp_path)
+    assert pack.info("Geral / Oi", (1, 10, 100), ("Agora", "Usuario")) is None
+    assert pack.content("Geral / Oi", (1, 10, 100)) is not None
+    pack.close()
+
+
+def test_invalid_pack_is_ignored(tmp_path):
+    path = tmp_path / "library.lfpack"
+    path.write_bytes(b"LFPK" + b"\0" * 8)
+    assert LibraryPack.open(str(path)) is None
+    assert LibraryPack.open(str(tmp_path / "inexistente.lfpack")) is None
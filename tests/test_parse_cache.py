@@ -0,0 +1,55 @@
+"""
+Cache de análise (parse_cache.py): local desta máquina e desta versão do Python.
+"""
+
+import os
+import sys
+
+from linxfast.core import ParseCache, TemplateManager, background_writer, build_info, placeholder_engine
+from linxfast.core import parse_cache as parse_cache_module
+
+CONTEUDO = "Olá $nome$, $[checkbox]Urgente?urgente|normal$ em $data$"
+
+
+def test_cache_file_is_per_user_and_per_python(tmp_path, user_cache_dir):
+    manager = TemplateManager(str(tmp_path / "templates"))
+    path = manager.parse_cache.path
+    assert os.path.commonpath([path, str(user_cache_dir)]) == str(user_cache_dir)
+    assert f"py{sys.version_info[0]}{sys.version_info[1]}" in os.path.basename(path)
+
+
+def test_legacy_cache_in_template_folder_is_removed(tmp_path):
+    folder = tmp_path / "templates"
+    folder.mkdir()
+    (folder / "parse_cache.bin").write_bytes(b"marshal de outra maquina")
+    TemplateManager(str(folder))
+    assert not (folder / "parse_cache.bin").exists()
+
+
+def test_round_trip_gives_same_info(tmp_path):
+    handlers = placeholder_engine.handlers
+    path = str(tmp_path / "cache" / "parse_cache.bin")
+    cache = ParseCache(path)
+    first = cache.info(CONTEUDO, handlers)
+    cache.save()
+    background_writer.flush()
+
+    reloaded = ParseCache(path)
+    assert len(reloaded) == 1
+    info = reloaded.info(CONTEUDO, handlers)
+    assert reloaded.hits == 1
+    expected = build_info(CONTEUDO, handlers)
+    assert info.fields == first.fields == expected.fields
+    assert info.automatic_fields == expected.automatic_fields
+
+
+def test_other_python_version_is_discarded(tmp_path, monkeypatch):
+    path = str(tmp_path / "parse_cache.bin")
+    cache = ParseCache(path)
+    cache.info(CONTEUDO)
+    cache.save()
+    background_writer.flush()
+
+    header = parse_cache_module._header()
+    monkeypatch.setattr(parse_cache_module, "_header", lambda: header[:3] + ((2, 7),))
+    assert len(ParseCache(path)) == 0
@@ -0,0 +1,92 @@
+"""
+Erros do scanner (linha, coluna e offset) e condicionais desbalanceadas, que
+voltam a ser texto sem derrubar o restante do template.
+"""
+
+from linxfast.core import ScanError, check, tokenize
+from linxfast.core.scanner import COND_CLOSE, COND_ELSE, COND_OPEN, FIELD, MAX_DEPTH, TEXT
+
+
+def _kinds(tokens):
+    return [token.kind for token in tokens]
+
+
+def _text(tokens, content):
+    # Os tokens cobrem o template inteiro, em ordem e sem sobreposição
+    assert [t.start for t in tokens[1:]] == [t.end for t in tokens[:-1]]
+    return "".join(content[t.start : t.end] for t in tokens)
+
+
+def test_valid_template_has_no_errors():
+    content = "Olá $Nome$, $X?sim|não$ e $A?$B$|$C$$"
+    tokens, errors = tokenize(content)
+    assert errors == []
+    assert check(content) == []
+    assert _text(tokens, content) == content
+
+
+def test_loose_dollar_stays_text():
+    tokens, errors = tokenize("R$ 10,00 e $Nome$")
+    assert errors == []
+    assert [(t.kind, t.value) for t in tokens] == [(TEXT, "R$ 10,00 e "), (FIELD, "Nome")]
+
+
+def test_error_position_is_line_and_column_of_the_opening():
+    content = "Olá\nlinha $X?a $Nome$"
+    [error] = check(content)
+    assert isinstance(error, ScanError)
+    assert error.message == "Condicional não fechada"
+    assert (error.line, error.column, error.offset) == (2, 7, content.index("$X"))
+    assert "linha 2, coluna 7" in str(error)
+
+
+def test_errors_are_sorted_by_position():
+    content = "$Agora[%d$\n\n  $[radio:$"
+    errors = check(content)
+    assert [(e.line, e.column) for e in errors] == [(1, 1), (3, 3)]
+    assert [e.offset for e in errors] == [0, content.index("$[radio")]
+
+
+def test_unclosed_conditional_becomes_text_at_line_end():
+    content = "$A?x $B$ | y\n$C$"
+    tokens, errors = tokenize(content)
+    assert [e.message for e in errors] == ["Condicional não fechada"]
+    # A abertura e o '|' voltam a ser texto; os campos continuam campos
+    assert _kinds(tokens) == [TEXT, FIELD, TEXT, FIELD]
+    assert COND_OPEN not in _kinds(tokens) and COND_ELSE not in _kinds(tokens)
+    assert _text(tokens, content) == content
+
+
+def test_conditional_without_alternative_becomes_text():
+    content = "$A?x $B$ y$"
+    tokens, errors = tokenize(content)
+    assert [(e.message, e.offset) for e in errors] == [("Condicional sem '|' (alternativa)", 0)]
+    assert _kinds(tokens) == [TEXT, FIELD, TEXT]
+    assert _text(tokens, content) == content
+
+
+def test_outer_conditional_left_open_keeps_the_inner_one():
+    content = "$X?$Y?a $B$|c$"
+    tokens, errors = tokenize(content)
+    # O '$' final fecha a interna; a externa, sem fechamento, vira texto
+    assert [(e.message, e.offset) for e in errors] == [("Condicional não fechada", 0)]
+    assert (tokens[0].kind, tokens[0].value) == (TEXT, "$X?")
+    assert [t.value for t in tokens if t.kind is COND_OPEN] == ["Y"]
+    assert _text(tokens, content) == content
+
+
+def test_nested_conditional_is_balanced():
+    tokens, errors = tokenize("$X?$Y?a|b$|c$")
+    assert errors == []
+    kinds = _kinds(tokens)
+    assert kinds.count(COND_OPEN) == kinds.count(COND_CLOSE) == 2
+    assert kinds.count(COND_ELSE) == 2
+
+
+def test_depth_limit_is_reported():
+    # MAX_DEPTH abrem, a seguinte passa do limite; o último '$' não tem par
+    content = "$X?" * (MAX_DEPTH + 2) + "a"
+    errors = check(content)
+    [too_deep] = [e for e in errors if e.message == "Aninhamento máximo de condicionais excedido"]
+    assert too_deep.offset == 3 * MAX_DEPTH
+    assert too_deep.column == too_deep.offset + 1
@@ -0,0 +1,75 @@
+"""
+SQLiteStorage compartilha uma conexão entre a thread da interface e a do
+write-behind do meta: nada de outra thread pode entrar numa transação aberta.
+"""
+
+import threading
+
+import pytest
+
+from linxfast.core import SQLiteStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "templates.db"))
+    yield storage
+    storage.close()
+
+
+def test_delete_from_other_thread_waits_for_open_transaction(storage):
+    storage.write("Geral / Manter", "a")
+    storage.write("Geral / Apagar", "b")
+    inside = threading.Event()
+    release = threading.Event()
+
+    def writer():
+        try:
+            with storage.transaction():
+                storage.write("Geral / Novo", "c")
+                inside.set()
+                release.wait(5)
+                raise RuntimeError("desfaz")
+        except RuntimeError:
+            pass
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    assert inside.wait(5)
+
+    deleter = threading.Thread(target=storage.delete, args=("Geral / Apagar",))
+    deleter.start()
+    deleter.join(0.2)
+    # Espera o lock em vez de entrar na transação da outra thread
+    assert deleter.is_alive()
+
+    release.set()
+    thread.join(5)
+    deleter.join(5)
+
+    # O rollback desfez só a gravação da transação; o delete veio depois
+    assert set(storage.scan()) == {"Geral / Manter"}
+
+
+def test_reads_do_not_see_uncommitted_writes_of_other_thread(storage):
+    inside = threading.Event()
+    release = threading.Event()
+    seen = []
+
+    def writer():
+        with storage.transaction():
+            storage.write("Geral / Novo", "c")
+            inside.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    assert inside.wait(5)
+    reader = threading.Thread(target=lambda: seen.append(storage.exists("Geral / Novo")))
+    reader.start()
+    reader.join(0.2)
+    assert reader.is_alive()
+    release.set()
+    thread.join(5)
+    reader.join(5)
+    assert seen == [True]
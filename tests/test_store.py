@@ -0,0 +1,84 @@
+"""
+TemplateStore: conteúdo lido sob demanda num LRU limitado por caracteres.
+"""
+
+from linxfast.core import FileStorage, TemplateStore
+
+
+class CountingStorage(FileStorage):
+    def __init__(self, base_dir):
+        super().__init__(base_dir)
+        self.reads = []
+
+    def read(self, full_name):
+        self.reads.append(full_name)
+        return super().read(full_name)
+
+
+def _store(tmp_path, max_size=1000, **templates):
+    storage = CountingStorage(str(tmp_path / "templates"))
+    for name, content in templates.items():
+        storage.write(f"Geral / {name}", content)
+    store = TemplateStore(storage, max_size=max_size)
+    store.scan()
+    return store
+
+
+def test_scan_only_indexes_names(tmp_path):
+    store = _store(tmp_path, A="aaa", B="bbb")
+    assert set(store) == {"Geral / A", "Geral / B"}
+    assert "Geral / A" in store and len(store) == 2
+    assert store.storage.reads == []
+
+
+def test_content_is_read_once_then_served_from_cache(tmp_path):
+    store = _store(tmp_path, A="aaa")
+    assert store["Geral / A"] == "aaa"
+    assert store.get("Geral / A") == "aaa"
+    assert store.storage.reads == ["Geral / A"]
+    assert (store.hits, store.misses) == (1, 1)
+
+
+def test_missing_name_returns_default(tmp_path):
+    store = _store(tmp_path, A="aaa")
+    assert store.get("Geral / Z", "padrão") == "padrão"
+    assert store.misses == 0
+
+
+def test_least_recently_used_is_evicted_by_size(tmp_path):
+    store = _store(tmp_path, max_size=10, A="aaaa", B="bbbb", C="cccc")
+    store.get("Geral / A")
+    store.get("Geral / B")
+    store.get("Geral / A")  # B passa a ser o menos recente
+    store.get("Geral / C")
+    stats = store.stats()
+    assert stats["cached"] == 2 and stats["cache_size"] == 8
+    assert store.get("Geral / B") == "bbbb"
+    assert store.storage.reads == ["Geral / A", "Geral / B", "Geral / C", "Geral / B"]
+
+
+def test_content_larger_than_cache_is_not_kept(tmp_path):
+    store = _store(tmp_path, max_size=3, A="aaaa")
+    assert store.get("Geral / A") == "aaaa"
+    assert store.get("Geral / A") == "aaaa"
+    assert store.stats()["cached"] == 0
+    assert store.storage.reads == ["Geral / A", "Geral / A"]
+
+
+def test_load_does_not_touch_the_lru(tmp_path):
+    store = _store(tmp_path, max_size=4, A="aaaa", B="bbbb")
+    store.get("Geral / A")
+    assert store.load("Geral / B") == "bbbb"
+    # A continua em cache e load() não conta hit/miss
+    assert store.load("Geral / A") == "aaaa"
+    assert store.storage.reads == ["Geral / A", "Geral / B"]
+    assert (store.hits, store.misses) == (0, 1)
+    assert store.load("Geral / Z") is None
+
+
+def test_forget_rereads_from_backend(tmp_path):
+    store = _store(tmp_path, A="aaa")
+    store.get("Geral / A")
+    store.forget("Geral / A")
+    store.get("Geral / A")
+    assert store.storage.reads == ["Geral / A", "Geral / A"]
@@ -0,0 +1,88 @@
+"""
+TemplateChanges devolvido por TemplateStore.scan(): o que mudou no disco e o
+que foi gravado pelo próprio app desde o scan anterior.
+"""
+
+import os
+
+from linxfast.core import FileStorage, TemplateChanges, TemplateStore
+
+
+def _store(tmp_path):
+    storage = FileStorage(str(tmp_path / "templates"))
+    storage.write("Geral / Fica", "igual")
+    storage.write("Geral / Muda", "antes")
+    storage.write("Geral / Sai", "tchau")
+    store = TemplateStore(storage)
+    store.scan()
+    return store
+
+
+def _diff(changes):
+    return sorted(changes.added), sorted(changes.removed), sorted(changes.modified)
+
+
+def test_first_scan_adds_everything(tmp_path):
+    storage = FileStorage(str(tmp_path / "templates"))
+    storage.write("Geral / A", "a")
+    changes = TemplateStore(storage).scan()
+    assert _diff(changes) == (["Geral / A"], [], [])
+
+
+def test_scan_without_changes_is_empty(tmp_path):
+    store = _store(tmp_path)
+    changes = store.scan()
+    assert not changes
+    assert _diff(changes) == ([], [], [])
+
+
+def test_changes_made_outside_the_app(tmp_path):
+    store = _store(tmp_path)
+    store.get("Geral / Muda")
+    store.get("Geral / Fica")
+    storage = store.storage
+    with open(storage.path("Geral / Muda"), "w", encoding="utf-8") as f:
+        f.write("depois, maior")
+    os.remove(storage.path("Geral / Sai"))
+    storage.write("Outra / Nova", "nova")
+
+    changes = store.scan()
+    assert _diff(changes) == (["Outra / Nova"], ["Geral / Sai"], ["Geral / Muda"])
+    # Só o alterado sai do cache
+    assert store.stats()["cached"] == 1
+    assert store.get("Geral / Muda") == "depois, maior"
+
+
+def test_pending_writes_are_reported_once(tmp_path):
+    store = _store(tmp_path)
+    storage = store.storage
+    store.set("Geral / Nova", storage.write("Geral / Nova", "n"), "n")
+    store.set("Geral / Muda", storage.write("Geral / Muda", "depois"), "depois")
+    storage.delete("Geral / Sai")
+    store.remove("Geral / Sai")
+
+    assert _diff(store.scan()) == (["Geral / Nova"], ["Geral / Sai"], ["Geral / Muda"])
+    assert not store.scan()
+
+
+def test_added_then_removed_before_scan_is_not_reported(tmp_path):
+    store = _store(tmp_path)
+    storage = store.storage
+    store.set("Geral / Rascunho", storage.write("Geral / Rascunho", "r"), "r")
+    storage.delete("Geral / Rascunho")
+    store.remove("Geral / Rascunho")
+    assert not store.scan()
+
+
+def test_removed_then_recreated_is_modified(tmp_path):
+    store = _store(tmp_path)
+    storage = store.storage
+    storage.delete("Geral / Sai")
+    store.remove("Geral / Sai")
+    store.set("Geral / Sai", storage.write("Geral / Sai", "volta"), "volta")
+    assert _diff(store.scan()) == ([], [], ["Geral / Sai"])
+
+
+def test_select_alone_is_truthy():
+    assert TemplateChanges(select="Geral / A")
+    assert not TemplateChanges()
@@ -0,0 +1,54 @@
+"""
+Datas do template local mostradas na comparação da importação do NocoDB
+(main_window.importar_template), lidas por TemplateManager.template_times.
+"""
+
+import datetime
+import os
+
+import pytest
+
+from linxfast.core import SQLiteStorage, TemplateManager
+
+NOME = "Geral / Saudação"
+
+
+def _file_manager(tmp_path):
+    return TemplateManager(str(tmp_path / "templates"))
+
+
+def _sqlite_manager(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "templates.db"))
+    return TemplateManager(str(tmp_path / "templates"), storage=storage)
+
+
+@pytest.mark.parametrize("make_manager", [_file_manager, _sqlite_manager])
+def test_conflicting_name_has_local_dates(tmp_path, make_manager):
+    manager = make_manager(tmp_path)
+    manager.add_template(NOME, "Olá {nome}, versão local")
+    before = datetime.datetime.now() - datetime.timedelta(minutes=1)
+
+    # A importação vê o nome em conflito e pede as datas do local
+    assert manager.template_exists(NOME)
+    created, modified = manager.template_times(NOME)
+
+    assert isinstance(created, datetime.datetime)
+    assert isinstance(modified, datetime.datetime)
+    assert created >= before and modified >= before
+    assert modified.strftime("%d/%m/%Y %H:%M") != "-"
+
+
+def test_file_dates_follow_the_file(tmp_path):
+    manager = _file_manager(tmp_path)
+    manager.add_template(NOME, "conteúdo")
+    path = manager.storage.path(NOME)
+    stamp = datetime.datetime(2024, 3, 5, 14, 30).timestamp()
+    os.utime(path, (stamp, stamp))
+
+    _, modified = manager.template_times(NOME)
+    assert modified.strftime("%d/%m/%Y %H:%M") == "05/03/2024 14:30"
+
+
+def test_missing_template_has_no_dates(tmp_path):
+    manager = _file_manager(tmp_path)
+    assert manager.template_times("Geral / Inexistente") == (None, None)
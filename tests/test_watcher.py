@@ -0,0 +1,61 @@
+"""
+LibraryWatcher sem inotify (Windows/OneDrive): o scan por stat roda numa
+thread e o poll() seguinte aplica o resultado, sem o scan na thread do Tk.
+"""
+
+from linxfast.core import LibraryWatcher, TemplateManager
+
+
+def _watcher(tmp_path):
+    manager = TemplateManager(str(tmp_path / "templates"))
+    manager.add_template("Geral / Oi", "oi")
+    manager.load_templates()
+    return manager, LibraryWatcher(manager, use_inotify=False)
+
+
+def _finish_scan(watcher):
+    watcher._scan_thread.join(5)
+    assert not watcher._scan_thread.is_alive()
+
+
+def test_stat_scan_runs_in_a_thread_and_next_poll_applies_it(tmp_path):
+    manager, watcher = _watcher(tmp_path)
+    assert watcher.mode == "stat"
+    seen = []
+    manager.add_listener(seen.append)
+
+    assert not watcher.poll()  # só começa o scan
+    _finish_scan(watcher)
+    assert not watcher.poll()  # nada mudou
+    _finish_scan(watcher)
+
+    (tmp_path / "templates" / "Geral" / "Novo.txt").write_text("novo", encoding="utf-8")
+    # O scan pronto é de antes do arquivo: este poll aplica ele e começa outro
+    assert not watcher.poll()
+    _finish_scan(watcher)
+    changes = watcher.poll()
+    assert changes.added == {"Geral / Novo"}
+    assert seen == [changes]
+    assert manager.get_template("Geral / Novo") == "novo"
+
+
+def test_snapshot_older_than_an_app_write_is_discarded(tmp_path):
+    manager, watcher = _watcher(tmp_path)
+    watcher.poll()
+    _finish_scan(watcher)
+    # Gravado pelo app depois do scan: o snapshot não tem o template novo
+    manager.add_template("Geral / Salvo agora", "texto")
+    changes = watcher.poll()
+    assert not changes.removed
+    assert "Geral / Salvo agora" in manager.templates
+    _finish_scan(watcher)
+    assert not watcher.poll().removed
+    assert "Geral / Salvo agora" in manager.templates
+
+
+def test_foreground_scan_when_disabled(tmp_path):
+    manager = TemplateManager(str(tmp_path / "templates"))
+    watcher = LibraryWatcher(manager, use_inotify=False, background_scan=False)
+    (tmp_path / "templates" / "Outro.txt").write_text("x", encoding="utf-8")
+    assert watcher.poll().added == {"Outro"}
+    assert watcher._scan_thread is None